@@ -0,0 +1,100 @@
+# Generated by Django 5.2.18 on 2026-10-18 10:17
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0008_add_kaprodi_and_jurusan'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='mahasiswa',
+            options={'ordering': ['-created_at'], 'verbose_name': 'Mahasiswa', 'verbose_name_plural': 'Mahasiswa'},
+        ),
+        migrations.AddField(
+            model_name='mahasiswa',
+            name='created_at',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+        migrations.AddField(
+            model_name='mahasiswa',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddField(
+            model_name='user',
+            name='must_change_password',
+            field=models.BooleanField(default=False, verbose_name='Harus Ganti Password'),
+        ),
+        migrations.AlterField(
+            model_name='mahasiswa',
+            name='angkatan',
+            field=models.IntegerField(verbose_name='Tahun Angkatan'),
+        ),
+        migrations.AlterField(
+            model_name='mahasiswa',
+            name='cv',
+            field=models.URLField(blank=True, max_length=500, null=True, verbose_name='CV (URL)'),
+        ),
+        migrations.AlterField(
+            model_name='mahasiswa',
+            name='email',
+            field=models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL, verbose_name='User Account'),
+        ),
+        migrations.AlterField(
+            model_name='mahasiswa',
+            name='jenis_kelamin',
+            field=models.CharField(choices=[('L', 'Laki-laki'), ('P', 'Perempuan')], max_length=10, verbose_name='Jenis Kelamin'),
+        ),
+        migrations.AlterField(
+            model_name='mahasiswa',
+            name='konsultasi',
+            field=models.URLField(blank=True, max_length=500, null=True, verbose_name='Bukti Konsultasi Mentor (URL)'),
+        ),
+        migrations.AlterField(
+            model_name='mahasiswa',
+            name='magang',
+            field=models.BooleanField(default=False, verbose_name='Sudah Magang'),
+        ),
+        migrations.AlterField(
+            model_name='mahasiswa',
+            name='nama',
+            field=models.CharField(max_length=100, verbose_name='Nama Lengkap'),
+        ),
+        migrations.AlterField(
+            model_name='mahasiswa',
+            name='nim',
+            field=models.CharField(max_length=20, unique=True, verbose_name='NIM'),
+        ),
+        migrations.AlterField(
+            model_name='mahasiswa',
+            name='no_hp',
+            field=models.CharField(max_length=15, verbose_name='Nomor HP'),
+        ),
+        migrations.AlterField(
+            model_name='mahasiswa',
+            name='porto',
+            field=models.URLField(blank=True, max_length=500, null=True, verbose_name='Portofolio (URL)'),
+        ),
+        migrations.AlterField(
+            model_name='mahasiswa',
+            name='prodi',
+            field=models.CharField(max_length=100, verbose_name='Program Studi'),
+        ),
+        migrations.AlterField(
+            model_name='mahasiswa',
+            name='sptjm',
+            field=models.URLField(blank=True, max_length=500, null=True, verbose_name='Bukti SPTJM (URL)'),
+        ),
+        migrations.AlterField(
+            model_name='user',
+            name='role',
+            field=models.CharField(choices=[('mahasiswa', 'Mahasiswa'), ('supervisor', 'Supervisor'), ('admin', 'Admin'), ('kaprodi', 'Kaprodi')], max_length=20),
+        ),
+    ]
@@ -11,6 +11,15 @@ class User(AbstractUser):
     )
     role = models.CharField(max_length=20, choices=ROLE_CHOICES)
     must_change_password = models.BooleanField(default=False, verbose_name="Harus Ganti Password")
+
+    def save(self, *args, **kwargs):
+        from coops.utils.notifications import invalidate_audience
+
+        super().save(*args, **kwargs)
+        # Role dan tanggal daftar menentukan pengumuman yang terlihat; login (last_login saja) tidak
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None or {'role', 'date_joined'} & set(update_fields):
+            invalidate_audience(self.pk)
     
     @property
     def supervisor(self):
@@ -55,6 +64,19 @@ class Kaprodi(models.Model):
     def __str__(self):
         return f"{self.nama} - {self.get_jurusan_display()}"
 
+    def save(self, *args, **kwargs):
+        from coops.utils.notifications import invalidate_audience
+
+        super().save(*args, **kwargs)
+        # Jurusan menentukan pengumuman yang terlihat user ini
+        invalidate_audience(self.user_id)
+
+    def delete(self, *args, **kwargs):
+        from coops.utils.notifications import invalidate_audience
+
+        invalidate_audience(self.user_id)
+        return super().delete(*args, **kwargs)
+
 
 class Mahasiswa(models.Model):
     JURUSAN_CHOICES = (
@@ -92,6 +114,19 @@ class Mahasiswa(models.Model):
     def __str__(self):
         return f"{self.nama} - {self.nim}"
 
+    def save(self, *args, **kwargs):
+        from coops.utils.notifications import invalidate_audience
+
+        super().save(*args, **kwargs)
+        # Jurusan dan angkatan menentukan pengumuman yang terlihat user ini
+        invalidate_audience(self.email_id)
+
+    def delete(self, *args, **kwargs):
+        from coops.utils.notifications import invalidate_audience
+
+        invalidate_audience(self.email_id)
+        return super().delete(*args, **kwargs)
+
     @property
     def profile_completion(self):
         """Calculate profile completion percentage"""
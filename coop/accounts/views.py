@@ -122,20 +122,34 @@ def register(request):
                         user.save()
 
                     # Create Mahasiswa record linking to the created user
-                    Mahasiswa.objects.create(
+                    mahasiswa = Mahasiswa.objects.create(
                         nama=nama_lengkap,
                         nim=request.POST.get("nim"),
                         prodi=request.POST.get("prodi"),
                         angkatan=int(request.POST.get("angkatan")) if request.POST.get("angkatan") else None,
                         jenis_kelamin=request.POST.get("jenis_kelamin"),
-                        konsultasi=request.POST.get("konsultasi", ""),
-                        sptjm=request.POST.get("sptjm", ""),
+                        konsultasi="",
+                        sptjm="",
                         email=user,
                         no_hp=request.POST.get("no_hp"),
-                        porto=request.POST.get("porto", ""),
-                        cv=request.POST.get("cv", "")
+                        porto="",
+                        cv=""
                     )
 
+                    # Dokumen diupload ke Firebase di belakang layar; field URL diisi setelah selesai
+                    from coop.firebase import storage_helper
+                    from coops.utils.uploads import enqueue_upload
+                    documents = (
+                        ("konsul", "konsultasi", storage_helper.konsultasi_path),
+                        ("sptjm", "sptjm", storage_helper.sptjm_path),
+                        ("cv", "cv", storage_helper.cv_path),
+                        ("porto", "porto", storage_helper.portfolio_path),
+                    )
+                    for input_name, field, path in documents:
+                        file = request.FILES.get(input_name)
+                        if file:
+                            enqueue_upload(file, mahasiswa, field, *path(file.name, mahasiswa.nim), uploaded_by=user)
+
                 messages.success(request, "Registrasi berhasil! Silakan masuk.")
                 return redirect("accounts:login")
             except IntegrityError:
@@ -244,78 +258,55 @@ def force_password_change(request):
 def kaprodi_dashboard(request):
     """Dashboard monitoring untuk Kaprodi"""
     from coops.models import KonfirmasiMagang
-    from django.db.models import Q, Count
+    from coops.utils.roster import roster_queryset, roster_status_counts, roster_page, roster_filters
 
     kaprodi = request.user.kaprodi_profile
 
     # Get all mahasiswa from the same jurusan
     mahasiswa_jurusan = Mahasiswa.objects.filter(jurusan=kaprodi.jurusan)
 
-    # Get all konfirmasi magang for mahasiswa in this jurusan
-    konfirmasi_jurusan = KonfirmasiMagang.objects.filter(
-        mahasiswa__mahasiswa__jurusan=kaprodi.jurusan
-    ).select_related('mahasiswa', 'mahasiswa__mahasiswa', 'approved_by')
-
-    # Statistics
-    total_mahasiswa = mahasiswa_jurusan.count()
-
-    # Count by status
-    pending_count = konfirmasi_jurusan.filter(status='pending').count()
-    accepted_count = konfirmasi_jurusan.filter(status='accepted').count()
-    rejected_count = konfirmasi_jurusan.filter(status='rejected').count()
-    completed_count = konfirmasi_jurusan.filter(status='completed').count()
+    # Statistics: semua status dihitung dengan satu grouped aggregate
+    stats = roster_status_counts(mahasiswa_jurusan)
+    total_mahasiswa = stats['total']
+    pending_count = stats['pending']
+    accepted_count = stats['accepted']
+    rejected_count = stats['rejected']
+    completed_count = stats['completed']
 
     # Mahasiswa yang belum ada konfirmasi magang
-    mahasiswa_with_konfirmasi = konfirmasi_jurusan.values_list('mahasiswa__id', flat=True)
-    mahasiswa_tanpa_magang = mahasiswa_jurusan.exclude(email__id__in=mahasiswa_with_konfirmasi).count()
+    mahasiswa_tanpa_magang = stats['none']
 
     # Recent activities (last 10 status changes)
-    recent_konfirmasi = konfirmasi_jurusan.order_by('-updated_at')[:10]
-
-    # Filter parameters
-    filter_status = request.GET.get('status', '')
-    filter_angkatan = request.GET.get('angkatan', '')
-    search_query = request.GET.get('search', '')
-
-    # Build filtered mahasiswa list
-    mahasiswa_list = mahasiswa_jurusan
+    recent_konfirmasi = KonfirmasiMagang.objects.filter(
+        mahasiswa__mahasiswa__jurusan=kaprodi.jurusan
+    ).select_related('mahasiswa', 'mahasiswa__mahasiswa', 'approved_by').order_by('-updated_at')[:10]
 
-    if filter_angkatan:
-        mahasiswa_list = mahasiswa_list.filter(angkatan=filter_angkatan)
+    # Filter parameters (status, angkatan dan search diterapkan di database)
+    filters = roster_filters(request.GET)
+    filter_status = filters['status']
+    filter_angkatan = filters['angkatan']
+    search_query = filters['search']
 
-    if search_query:
-        mahasiswa_list = mahasiswa_list.filter(
-            Q(nama__icontains=search_query) |
-            Q(nim__icontains=search_query)
-        )
+    mahasiswa_list = roster_queryset(mahasiswa_jurusan, **filters)
+    page_obj, rows = roster_page(
+        mahasiswa_list,
+        page_number=request.GET.get('page'),
+        per_page=request.GET.get('per_page', 50),
+    )
 
     # Prepare mahasiswa data with their konfirmasi status
-    mahasiswa_data = []
-    for mhs in mahasiswa_list:
-        try:
-            konfirmasi = KonfirmasiMagang.objects.filter(mahasiswa=mhs.email).first()
-
-            # Apply status filter
-            if filter_status:
-                if not konfirmasi or konfirmasi.status != filter_status:
-                    if filter_status != 'none' or konfirmasi:
-                        continue
-
-            mahasiswa_data.append({
-                'mahasiswa': mhs,
-                'konfirmasi': konfirmasi
-            })
-        except Exception:
-            # If no konfirmasi, add if filter is 'none' or no filter
-            if not filter_status or filter_status == 'none':
-                mahasiswa_data.append({
-                    'mahasiswa': mhs,
-                    'konfirmasi': None
-                })
+    mahasiswa_data = [
+        {'mahasiswa': mhs, 'konfirmasi': konfirmasi}
+        for mhs, konfirmasi in rows
+    ]
 
     # Get unique angkatan for filter dropdown
     angkatan_list = mahasiswa_jurusan.values_list('angkatan', flat=True).distinct().order_by('-angkatan')
 
+    # Query string tanpa 'page' untuk link paginasi
+    querystring = request.GET.copy()
+    querystring.pop('page', None)
+
     context = {
         'kaprodi': kaprodi,
         'title': 'Dashboard Kaprodi',
@@ -331,5 +322,7 @@ def kaprodi_dashboard(request):
         'filter_status': filter_status,
         'filter_angkatan': filter_angkatan,
         'search_query': search_query,
+        'page_obj': page_obj,
+        'filter_querystring': querystring.urlencode(),
     }
     return render(request, 'accounts/kaprodi_dashboard.html', context)
@@ -0,0 +1,16 @@
+"""
+Celery app for coop project.
+
+Worker: celery -A coop worker -l info
+Scheduler (periodic tasks in CELERY_BEAT_SCHEDULE): celery -A coop beat -l info
+"""
+
+import os
+
+from celery import Celery
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'coop.settings')
+
+app = Celery('coop')
+app.config_from_object('django.conf:settings', namespace='CELERY')
+app.autodiscover_tasks()
@@ -0,0 +1,187 @@
+"""
+Process-wide Firebase Storage client
+One SDK app, storage client, pooled HTTP session and bucket handle per process,
+shared by config.FirebaseStorage and the storage_helper functions
+"""
+import os
+import threading
+import time
+from contextlib import contextmanager
+from django.conf import settings
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Koneksi HTTPS yang disimpan untuk dipakai ulang (per host); naikkan jika banyak thread upload bersamaan
+DEFAULT_HTTP_POOL_SIZE = 10
+
+
+class FirebaseMetrics:
+    """Thread-safe timing counters per operation (init, upload, delete, ...)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stats = {}
+
+    def record(self, operation, seconds, error=False):
+        with self._lock:
+            stats = self._stats.setdefault(operation, {'count': 0, 'errors': 0, 'total': 0.0, 'max': 0.0})
+            stats['count'] += 1
+            stats['errors'] += int(error)
+            stats['total'] += seconds
+            stats['max'] = max(stats['max'], seconds)
+
+    @contextmanager
+    def timed(self, operation):
+        start = time.perf_counter()
+        error = False
+        try:
+            yield
+        except Exception:
+            error = True
+            raise
+        finally:
+            elapsed = time.perf_counter() - start
+            self.record(operation, elapsed, error)
+            logger.debug(f"Firebase {operation}: {elapsed * 1000:.1f} ms{' (error)' if error else ''}")
+
+    def snapshot(self):
+        """
+        Returns:
+            dict: {operation: {'count', 'errors', 'total_ms', 'avg_ms', 'max_ms'}}
+        """
+        with self._lock:
+            return {
+                operation: {
+                    'count': stats['count'],
+                    'errors': stats['errors'],
+                    'total_ms': round(stats['total'] * 1000, 2),
+                    'avg_ms': round(stats['total'] * 1000 / stats['count'], 2),
+                    'max_ms': round(stats['max'] * 1000, 2),
+                }
+                for operation, stats in self._stats.items()
+            }
+
+    def reset(self):
+        with self._lock:
+            self._stats.clear()
+
+
+metrics = FirebaseMetrics()
+timed = metrics.timed
+
+
+def get_firebase_metrics():
+    return metrics.snapshot()
+
+
+def service_account_info():
+    """Service account credentials from settings"""
+    return {
+        "type": "service_account",
+        "project_id": settings.FIREBASE_PROJECT_ID,
+        "private_key_id": settings.FIREBASE_PRIVATE_KEY_ID,
+        "private_key": settings.FIREBASE_PRIVATE_KEY.replace('\\n', '\n'),
+        "client_email": settings.FIREBASE_CLIENT_EMAIL,
+        "client_id": settings.FIREBASE_CLIENT_ID,
+        "auth_uri": "https://accounts.google.com/o/oauth2/auth",
+        "token_uri": "https://oauth2.googleapis.com/token",
+        "auth_provider_x509_cert_url": "https://www.googleapis.com/oauth2/v1/certs",
+        "client_x509_cert_url": getattr(settings, 'FIREBASE_CERT_URL', ""),
+    }
+
+
+class FirebaseClient:
+    """
+    Firebase app, Cloud Storage client and default bucket.
+
+    All requests go through one AuthorizedSession whose connection pool
+    keeps TLS connections open between calls, so only the first request
+    of a process pays for the handshake (and the OAuth token fetch).
+    """
+
+    def __init__(self, pool_size=DEFAULT_HTTP_POOL_SIZE):
+        import firebase_admin
+        from firebase_admin import credentials
+        from google.auth.transport.requests import AuthorizedSession
+        from google.cloud import storage
+        from requests.adapters import HTTPAdapter
+
+        with timed('init'):
+            if not firebase_admin._apps:
+                firebase_admin.initialize_app(credentials.Certificate(service_account_info()), {
+                    'storageBucket': settings.FIREBASE_STORAGE_BUCKET
+                })
+            app = firebase_admin.get_app()
+            credential = app.credential.get_credential()
+
+            self.session = AuthorizedSession(credential)
+            adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+            self.session.mount('https://', adapter)
+
+            self.storage_client = storage.Client(
+                project=app.project_id, credentials=credential, _http=self.session
+            )
+            self.bucket = self.storage_client.bucket(
+                app.options.get('storageBucket') or settings.FIREBASE_STORAGE_BUCKET
+            )
+
+    def close(self):
+        self.session.close()
+
+
+# Setelah inisialisasi gagal, percobaan berikutnya ditunda selama ini (detik)
+INIT_RETRY_SECONDS = 60
+
+
+class FirebaseUnavailable(Exception):
+    """Firebase is not configured, or its initialization failed less than INIT_RETRY_SECONDS ago"""
+
+
+def firebase_configured():
+    """Whether service account credentials are set"""
+    return bool(settings.FIREBASE_PRIVATE_KEY and settings.FIREBASE_CLIENT_EMAIL)
+
+
+_client = None
+_client_lock = threading.Lock()
+_init_failed_at = None
+
+
+def get_firebase_client():
+    """
+    Shared FirebaseClient of this process, created on first use.
+
+    Raises:
+        FirebaseUnavailable: Without credentials, or while a failed initialization
+            is remembered (so every request does not retry it)
+    """
+    global _client, _init_failed_at
+    if _client is None:
+        if not firebase_configured():
+            raise FirebaseUnavailable("Firebase credentials are not configured")
+        with _client_lock:
+            if _client is None:
+                if _init_failed_at is not None and time.monotonic() - _init_failed_at < INIT_RETRY_SECONDS:
+                    raise FirebaseUnavailable("Firebase initialization failed recently")
+                try:
+                    _client = FirebaseClient(getattr(settings, 'FIREBASE_HTTP_POOL_SIZE', DEFAULT_HTTP_POOL_SIZE))
+                except Exception as e:
+                    _init_failed_at = time.monotonic()
+                    logger.error(f"Firebase initialization failed, retrying in {INIT_RETRY_SECONDS} s: {str(e)}")
+                    raise FirebaseUnavailable(str(e)) from e
+                _init_failed_at = None
+    return _client
+
+
+def reset_firebase_client():
+    """Forget the shared client and any remembered failure (next call creates a new one)"""
+    global _client, _client_lock, _init_failed_at
+    _client = None
+    _client_lock = threading.Lock()
+    _init_failed_at = None
+
+
+# Proses anak (Celery prefork, gunicorn --preload) tidak boleh memakai socket milik induk
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=reset_firebase_client)
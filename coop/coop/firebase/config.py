@@ -2,40 +2,29 @@
 Firebase Configuration for COOP-STEM
 Handles Firebase initialization and storage operations
 """
-import firebase_admin
-from firebase_admin import credentials, storage
 from django.conf import settings
 import os
 import uuid
-from datetime import timedelta
+from . import signed_urls
+from .client import FirebaseUnavailable, get_firebase_client, timed
+import logging
+
+logger = logging.getLogger(__name__)
+
 
-# Initialize Firebase
 def initialize_firebase():
-    """Initialize Firebase Admin SDK"""
-    if not firebase_admin._apps:
-        # Firebase config from settings
-        firebase_config = {
-            "type": "service_account",
-            "project_id": settings.FIREBASE_PROJECT_ID,
-            "private_key_id": settings.FIREBASE_PRIVATE_KEY_ID,
-            "private_key": settings.FIREBASE_PRIVATE_KEY.replace('\\n', '\n') if hasattr(settings, 'FIREBASE_PRIVATE_KEY') else None,
-            "client_email": settings.FIREBASE_CLIENT_EMAIL,
-            "client_id": settings.FIREBASE_CLIENT_ID,
-            "auth_uri": "https://accounts.google.com/o/oauth2/auth",
-            "token_uri": "https://oauth2.googleapis.com/token",
-            "auth_provider_x509_cert_url": "https://www.googleapis.com/oauth2/v1/certs",
-            "client_x509_cert_url": settings.FIREBASE_CERT_URL if hasattr(settings, 'FIREBASE_CERT_URL') else ""
-        }
-
-        cred = credentials.Certificate(firebase_config)
-        firebase_admin.initialize_app(cred, {
-            'storageBucket': settings.FIREBASE_STORAGE_BUCKET
-        })
+    """Initialize Firebase Admin SDK (once per process, see client.get_firebase_client)"""
+    get_firebase_client()
+
 
 def get_storage_bucket():
-    """Get Firebase storage bucket"""
-    initialize_firebase()
-    return storage.bucket()
+    """Get the shared Firebase storage bucket"""
+    return get_firebase_client().bucket
+
+
+def blob_path_from_url(file_url):
+    """Blob path of a file URL (https://storage.googleapis.com/bucket-name/path/to/file[?...])"""
+    return file_url.split(f"{settings.FIREBASE_STORAGE_BUCKET}/")[-1].split("?")[0]
 
 
 class FirebaseStorage:
@@ -75,11 +64,12 @@ class FirebaseStorage:
             blob_path = f"{folder}/{filename}"
             blob = bucket.blob(blob_path)
 
-            # Upload file
-            blob.upload_from_file(file, content_type=file.content_type)
+            with timed('upload'):
+                # Upload file
+                blob.upload_from_file(file, content_type=file.content_type)
 
-            # Make publicly accessible
-            blob.make_public()
+                # Make publicly accessible
+                blob.make_public()
 
             return blob.public_url
 
@@ -101,12 +91,9 @@ class FirebaseStorage:
         try:
             bucket = get_storage_bucket()
 
-            # Extract blob path from URL
-            # URL format: https://storage.googleapis.com/bucket-name/path/to/file
-            blob_path = file_url.split(f"{settings.FIREBASE_STORAGE_BUCKET}/")[-1].split("?")[0]
-
-            blob = bucket.blob(blob_path)
-            blob.delete()
+            blob = bucket.blob(blob_path_from_url(file_url))
+            with timed('delete'):
+                blob.delete()
 
             return True
 
@@ -117,7 +104,7 @@ class FirebaseStorage:
     @staticmethod
     def get_signed_url(file_url, expiration_minutes=60):
         """
-        Generate signed URL for private file access
+        Generate signed URL for private file access (cached, see signed_urls)
 
         Args:
             file_url: Public URL of the file
@@ -127,24 +114,42 @@ class FirebaseStorage:
             Signed URL string
         """
         try:
-            bucket = get_storage_bucket()
+            return signed_urls.get_signed_url(blob_path_from_url(file_url), expiration_minutes * 60)
 
-            # Extract blob path from URL
-            blob_path = file_url.split(f"{settings.FIREBASE_STORAGE_BUCKET}/")[-1].split("?")[0]
+        except FirebaseUnavailable:
+            # Sudah di-log saat inisialisasi gagal; tanpa Firebase URL publik dipakai apa adanya
+            return file_url
 
-            blob = bucket.blob(blob_path)
+        except Exception as e:
+            logger.warning(f"Error generating signed URL: {str(e)}")
+            return file_url
 
-            # Generate signed URL
-            url = blob.generate_signed_url(
-                expiration=timedelta(minutes=expiration_minutes),
-                method='GET'
+    @staticmethod
+    def get_signed_urls(file_urls, expiration_minutes=60):
+        """
+        Generate signed URLs for many files at once, for list views
+
+        Args:
+            file_urls: Public URLs of the files (empty values are skipped)
+            expiration_minutes: URL expiration time in minutes
+
+        Returns:
+            Dict of public URL to signed URL (public URL if signing fails)
+        """
+        file_urls = [file_url for file_url in file_urls if file_url]
+        try:
+            signed = signed_urls.get_signed_urls(
+                [blob_path_from_url(file_url) for file_url in file_urls], expiration_minutes * 60
             )
+            return {file_url: signed[blob_path_from_url(file_url)] for file_url in file_urls}
 
-            return url
+        except FirebaseUnavailable:
+            # Sudah di-log saat inisialisasi gagal; tanpa Firebase URL publik dipakai apa adanya
+            return {file_url: file_url for file_url in file_urls}
 
         except Exception as e:
-            print(f"Error generating signed URL: {str(e)}")
-            return file_url
+            logger.warning(f"Error generating signed URLs: {str(e)}")
+            return {file_url: file_url for file_url in file_urls}
 
     @staticmethod
     def file_exists(file_url):
@@ -160,10 +165,9 @@ class FirebaseStorage:
         try:
             bucket = get_storage_bucket()
 
-            blob_path = file_url.split(f"{settings.FIREBASE_STORAGE_BUCKET}/")[-1].split("?")[0]
-            blob = bucket.blob(blob_path)
-
-            return blob.exists()
+            blob = bucket.blob(blob_path_from_url(file_url))
+            with timed('exists'):
+                return blob.exists()
 
         except Exception as e:
             print(f"Error checking file existence: {str(e)}")
@@ -0,0 +1,131 @@
+"""
+Signed URL cache
+Signed GET URLs are reused until a safety margin before they expire:
+first from a per-process LRU, then from the shared Django cache, and
+only then signed again (one RSA signature per URL)
+"""
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from datetime import timedelta
+from django.conf import settings
+from django.core.cache import cache
+from .client import get_firebase_client, timed
+
+DEFAULT_SIGNED_URL_CACHE = {
+    'MAX_ENTRIES': 2048,
+    'SAFETY_MARGIN': 60 * 60,
+}
+
+
+def get_signed_url_settings():
+    return {**DEFAULT_SIGNED_URL_CACHE, **getattr(settings, 'FIREBASE_SIGNED_URL_CACHE', {})}
+
+
+class SignedURLCache:
+    """Thread-safe LRU of {key: (signed URL, reusable until)}"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+
+    def get(self, key, now):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[1] <= now:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry[0]
+
+    def set(self, key, url, reusable_until):
+        max_entries = get_signed_url_settings()['MAX_ENTRIES']
+        with self._lock:
+            self._entries[key] = (url, reusable_until)
+            self._entries.move_to_end(key)
+            while len(self._entries) > max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+_local = SignedURLCache()
+
+
+def clear_signed_url_cache():
+    """Forget the signed URLs of this process (the shared cache expires on its own)"""
+    _local.clear()
+
+
+def signed_url_cache_key(blob_path, lifetime):
+    # Per masa berlaku: permintaan URL berumur pendek tidak boleh mendapat URL berumur panjang
+    digest = hashlib.sha256(f"{settings.FIREBASE_STORAGE_BUCKET}/{blob_path}:{lifetime}".encode()).hexdigest()
+    return f'firebase:signed:{digest}'
+
+
+def reusable_seconds(lifetime):
+    """How long a URL valid for lifetime seconds is handed out (the rest is the safety margin)"""
+    return lifetime - min(get_signed_url_settings()['SAFETY_MARGIN'], lifetime // 2)
+
+
+def get_signed_urls(blob_paths, lifetime):
+    """
+    Signed GET URLs for many objects, e.g. all documents on a list page.
+
+    Cached URLs are looked up in one round trip to the shared cache; only
+    the missing ones are signed, and stored with one set_many.
+
+    Args:
+        blob_paths: Object names
+        lifetime: Validity of newly signed URLs in seconds
+
+    Returns:
+        dict: {blob_path: signed URL}
+    """
+    now = time.time()
+    urls = {}
+    missing = {}
+    for blob_path in dict.fromkeys(blob_paths):
+        key = signed_url_cache_key(blob_path, lifetime)
+        url = _local.get(key, now)
+        if url is None:
+            missing[key] = blob_path
+        else:
+            urls[blob_path] = url
+
+    if missing:
+        for key, (url, reusable_until) in cache.get_many(list(missing)).items():
+            if reusable_until > now:
+                urls[missing.pop(key)] = url
+                _local.set(key, url, reusable_until)
+
+    if missing:
+        bucket = get_firebase_client().bucket
+        reusable_until = now + reusable_seconds(lifetime)
+        signed = {}
+        for key, blob_path in missing.items():
+            with timed('sign'):
+                url = bucket.blob(blob_path).generate_signed_url(
+                    version='v4',
+                    expiration=timedelta(seconds=lifetime),
+                    method='GET'
+                )
+            urls[blob_path] = url
+            signed[key] = (url, reusable_until)
+            _local.set(key, url, reusable_until)
+        cache.set_many(signed, timeout=int(reusable_until - now))
+
+    return urls
+
+
+def get_signed_url(blob_path, lifetime):
+    """Signed GET URL for one object, valid for lifetime seconds (see get_signed_urls)"""
+    return get_signed_urls([blob_path], lifetime)[blob_path]
@@ -3,34 +3,16 @@ Firebase Storage Helper Functions
 Handles file upload, download, and management with Firebase Storage
 """
 
-import firebase_admin
-from firebase_admin import credentials, storage
-from django.conf import settings
 import os
 import uuid
 from datetime import timedelta
+from . import signed_urls
+from .client import FirebaseUnavailable, timed
+# initialize_firebase tetap bisa diimpor dari modul ini seperti sebelumnya
+from .config import initialize_firebase, get_storage_bucket, blob_path_from_url
+import logging
 
-
-def initialize_firebase():
-    """Initialize Firebase Admin SDK if not already initialized"""
-    if not firebase_admin._apps:
-        cred_dict = {
-            "type": "service_account",
-            "project_id": settings.FIREBASE_PROJECT_ID,
-            "private_key_id": settings.FIREBASE_PRIVATE_KEY_ID,
-            "private_key": settings.FIREBASE_PRIVATE_KEY.replace('\\n', '\n'),
-            "client_email": settings.FIREBASE_CLIENT_EMAIL,
-            "client_id": settings.FIREBASE_CLIENT_ID,
-            "auth_uri": "https://accounts.google.com/o/oauth2/auth",
-            "token_uri": "https://oauth2.googleapis.com/token",
-            "auth_provider_x509_cert_url": "https://www.googleapis.com/oauth2/v1/certs",
-            "client_x509_cert_url": settings.FIREBASE_CERT_URL
-        }
-
-        cred = credentials.Certificate(cred_dict)
-        firebase_admin.initialize_app(cred, {
-            'storageBucket': settings.FIREBASE_STORAGE_BUCKET
-        })
+logger = logging.getLogger(__name__)
 
 
 def upload_file_to_firebase(file, folder='uploads', filename=None):
@@ -46,9 +28,7 @@ def upload_file_to_firebase(file, folder='uploads', filename=None):
         str: Public URL of the uploaded file
     """
     try:
-        initialize_firebase()
-
-        bucket = storage.bucket()
+        bucket = get_storage_bucket()
 
         if filename is None:
             ext = os.path.splitext(file.name)[1]
@@ -57,9 +37,10 @@ def upload_file_to_firebase(file, folder='uploads', filename=None):
         blob_path = f"{folder}/{filename}"
         blob = bucket.blob(blob_path)
 
-        blob.upload_from_file(file, content_type=file.content_type)
+        with timed('upload'):
+            blob.upload_from_file(file, content_type=file.content_type)
 
-        blob.make_public()
+            blob.make_public()
 
         return blob.public_url
 
@@ -68,6 +49,111 @@ def upload_file_to_firebase(file, folder='uploads', filename=None):
         return None
 
 
+def upload_local_file(path, blob_path, content_type=None):
+    """
+    Upload a file from local disk (e.g. the upload spool) to Firebase Storage
+
+    Unlike upload_file_to_firebase, errors are raised so the caller can retry.
+
+    Args:
+        path: Local file path
+        blob_path: Target object name ('folder/filename')
+        content_type: MIME type of the file
+
+    Returns:
+        str: Public URL of the uploaded file
+    """
+    blob = get_storage_bucket().blob(blob_path)
+    with timed('upload'):
+        blob.upload_from_filename(path, content_type=content_type)
+        blob.make_public()
+    return blob.public_url
+
+
+def generate_upload_url(blob_path, content_type, size, expiration_minutes=15):
+    """
+    Generate a signed URL the browser can PUT one file to directly
+
+    The signature covers the Content-Type and an exact Content-Length, so
+    Cloud Storage rejects a request with a different type or size. The
+    client must send both headers returned by this function.
+
+    Args:
+        blob_path: Target object name ('folder/filename')
+        content_type: MIME type the file must be uploaded with
+        size: Exact file size in bytes
+        expiration_minutes: Number of minutes until the URL expires (default: 15)
+
+    Returns:
+        tuple: (signed URL, dict of headers the PUT request must carry)
+    """
+    headers = {'Content-Type': content_type, 'x-goog-content-length-range': f'{size},{size}'}
+    blob = get_storage_bucket().blob(blob_path)
+    with timed('sign'):
+        url = blob.generate_signed_url(
+            version='v4',
+            expiration=timedelta(minutes=expiration_minutes),
+            method='PUT',
+            content_type=content_type,
+            headers={'x-goog-content-length-range': headers['x-goog-content-length-range']},
+        )
+    return url, headers
+
+
+def get_blob(blob_path):
+    """
+    Fetch an object's metadata; errors other than "not found" are raised
+
+    Returns:
+        Blob: With size and content_type loaded, or None if the object does not exist
+    """
+    with timed('exists'):
+        return get_storage_bucket().get_blob(blob_path)
+
+
+def publish_blob(blob):
+    """Make an uploaded object public; returns its public URL"""
+    with timed('publish'):
+        blob.make_public()
+    return blob.public_url
+
+
+# Folder dan nama objek per jenis dokumen, dipakai oleh upload_* di bawah dan oleh antrian upload.
+# Semua mengembalikan (folder, filename).
+
+def _safe_name(value):
+    return value.replace(' ', '_').replace('/', '_')
+
+
+def cv_path(original_name, mahasiswa_nim):
+    return 'cvs', f"cv_{mahasiswa_nim}{os.path.splitext(original_name)[1]}"
+
+
+def portfolio_path(original_name, mahasiswa_nim):
+    return 'portfolios', f"portfolio_{mahasiswa_nim}{os.path.splitext(original_name)[1]}"
+
+
+def sptjm_path(original_name, mahasiswa_nim):
+    return 'sptjm', f"sptjm_{mahasiswa_nim}{os.path.splitext(original_name)[1]}"
+
+
+def konsultasi_path(original_name, mahasiswa_nim):
+    return 'konsultasi', f"konsultasi_{mahasiswa_nim}{os.path.splitext(original_name)[1]}"
+
+
+def surat_penerimaan_path(original_name, mahasiswa_nim, company_name):
+    return 'surat_penerimaan', f"surat_{mahasiswa_nim}_{_safe_name(company_name)}{os.path.splitext(original_name)[1]}"
+
+
+def laporan_path(original_name, mahasiswa_nim, laporan_type='kemajuan'):
+    timestamp = uuid.uuid4().hex[:8]
+    return 'laporan', f"laporan_{laporan_type}_{mahasiswa_nim}_{timestamp}{os.path.splitext(original_name)[1]}"
+
+
+def company_logo_path(original_name, company_name):
+    return 'company_logos', f"logo_{_safe_name(company_name)}{os.path.splitext(original_name)[1]}"
+
+
 def upload_cv(file, mahasiswa_nim):
     """
     Upload CV file to Firebase Storage
@@ -79,8 +165,7 @@ def upload_cv(file, mahasiswa_nim):
     Returns:
         str: Public URL of the uploaded CV
     """
-    filename = f"cv_{mahasiswa_nim}{os.path.splitext(file.name)[1]}"
-    return upload_file_to_firebase(file, folder='cvs', filename=filename)
+    return upload_file_to_firebase(file, *cv_path(file.name, mahasiswa_nim))
 
 
 def upload_portfolio(file, mahasiswa_nim):
@@ -94,8 +179,7 @@ def upload_portfolio(file, mahasiswa_nim):
     Returns:
         str: Public URL of the uploaded portfolio
     """
-    filename = f"portfolio_{mahasiswa_nim}{os.path.splitext(file.name)[1]}"
-    return upload_file_to_firebase(file, folder='portfolios', filename=filename)
+    return upload_file_to_firebase(file, *portfolio_path(file.name, mahasiswa_nim))
 
 
 def upload_surat_penerimaan(file, mahasiswa_nim, company_name):
@@ -110,9 +194,7 @@ def upload_surat_penerimaan(file, mahasiswa_nim, company_name):
     Returns:
         str: Public URL of the uploaded letter
     """
-    safe_company = company_name.replace(' ', '_').replace('/', '_')
-    filename = f"surat_{mahasiswa_nim}_{safe_company}{os.path.splitext(file.name)[1]}"
-    return upload_file_to_firebase(file, folder='surat_penerimaan', filename=filename)
+    return upload_file_to_firebase(file, *surat_penerimaan_path(file.name, mahasiswa_nim, company_name))
 
 
 def upload_laporan(file, mahasiswa_nim, laporan_type='kemajuan'):
@@ -127,9 +209,7 @@ def upload_laporan(file, mahasiswa_nim, laporan_type='kemajuan'):
     Returns:
         str: Public URL of the uploaded report
     """
-    timestamp = uuid.uuid4().hex[:8]
-    filename = f"laporan_{laporan_type}_{mahasiswa_nim}_{timestamp}{os.path.splitext(file.name)[1]}"
-    return upload_file_to_firebase(file, folder='laporan', filename=filename)
+    return upload_file_to_firebase(file, *laporan_path(file.name, mahasiswa_nim, laporan_type))
 
 
 def upload_company_logo(file, company_name):
@@ -143,9 +223,7 @@ def upload_company_logo(file, company_name):
     Returns:
         str: Public URL of the uploaded logo
     """
-    safe_company = company_name.replace(' ', '_').replace('/', '_')
-    filename = f"logo_{safe_company}{os.path.splitext(file.name)[1]}"
-    return upload_file_to_firebase(file, folder='company_logos', filename=filename)
+    return upload_file_to_firebase(file, *company_logo_path(file.name, company_name))
 
 
 def delete_file_from_firebase(file_url):
@@ -159,14 +237,9 @@ def delete_file_from_firebase(file_url):
         bool: True if deletion successful, False otherwise
     """
     try:
-        initialize_firebase()
-
-        bucket = storage.bucket()
-
-        blob_path = file_url.split(f'{bucket.name}/')[-1].split('?')[0]
-
-        blob = bucket.blob(blob_path)
-        blob.delete()
+        blob = get_storage_bucket().blob(blob_path_from_url(file_url))
+        with timed('delete'):
+            blob.delete()
 
         return True
 
@@ -179,6 +252,8 @@ def get_signed_url(file_url, expiration_hours=24):
     """
     Generate a signed URL for private file access
 
+    URLs are cached and reused until shortly before they expire (see signed_urls).
+
     Args:
         file_url: Public URL of the file
         expiration_hours: Number of hours until URL expires (default: 24)
@@ -187,25 +262,42 @@ def get_signed_url(file_url, expiration_hours=24):
         str: Signed URL with expiration
     """
     try:
-        initialize_firebase()
+        return signed_urls.get_signed_url(blob_path_from_url(file_url), int(expiration_hours * 3600))
 
-        bucket = storage.bucket()
+    except FirebaseUnavailable:
+        # Sudah di-log saat inisialisasi gagal; tanpa Firebase URL publik dipakai apa adanya
+        return file_url
 
-        blob_path = file_url.split(f'{bucket.name}/')[-1].split('?')[0]
+    except Exception as e:
+        logger.warning(f"Error generating signed URL: {str(e)}")
+        return file_url
 
-        blob = bucket.blob(blob_path)
 
-        url = blob.generate_signed_url(
-            version='v4',
-            expiration=timedelta(hours=expiration_hours),
-            method='GET'
+def get_signed_urls(file_urls, expiration_hours=24):
+    """
+    Generate signed URLs for many files at once (e.g. a list of submitted documents)
+
+    Args:
+        file_urls: Public URLs of the files (empty values are skipped)
+        expiration_hours: Number of hours until URLs expire (default: 24)
+
+    Returns:
+        dict: {file_url: signed URL}; the public URLs themselves if signing fails
+    """
+    file_urls = [file_url for file_url in file_urls if file_url]
+    try:
+        signed = signed_urls.get_signed_urls(
+            [blob_path_from_url(file_url) for file_url in file_urls], int(expiration_hours * 3600)
         )
+        return {file_url: signed[blob_path_from_url(file_url)] for file_url in file_urls}
 
-        return url
+    except FirebaseUnavailable:
+        # Sudah di-log saat inisialisasi gagal; tanpa Firebase URL publik dipakai apa adanya
+        return {file_url: file_url for file_url in file_urls}
 
     except Exception as e:
-        print(f"Error generating signed URL: {str(e)}")
-        return file_url
+        logger.warning(f"Error generating signed URLs: {str(e)}")
+        return {file_url: file_url for file_url in file_urls}
 
 
 def get_file_metadata(file_url):
@@ -219,14 +311,9 @@ def get_file_metadata(file_url):
         dict: File metadata including size, content type, created time
     """
     try:
-        initialize_firebase()
-
-        bucket = storage.bucket()
-
-        blob_path = file_url.split(f'{bucket.name}/')[-1].split('?')[0]
-
-        blob = bucket.blob(blob_path)
-        blob.reload()
+        blob = get_storage_bucket().blob(blob_path_from_url(file_url))
+        with timed('metadata'):
+            blob.reload()
 
         return {
             'name': blob.name,
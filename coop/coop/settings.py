@@ -56,6 +56,7 @@ MIDDLEWARE = [
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
     'accounts.middleware.ForcePasswordChangeMiddleware',
+    'coops.middleware.QueryBudgetMiddleware',
 ]
 
 ROOT_URLCONF = 'coop.urls'
@@ -155,6 +156,22 @@ USE_TZ = True
 # Use absolute URL path for static files so templates generate '/static/...' URLs
 STATIC_URL = '/static/'
 
+STORAGES = {
+    'default': {
+        'BACKEND': 'django.core.files.storage.FileSystemStorage',
+    },
+    'staticfiles': {
+        'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage',
+    },
+    # Cache PDF sertifikat yang sudah dirender (bisa diganti storage lain, mis. S3)
+    'certificates': {
+        'BACKEND': 'django.core.files.storage.FileSystemStorage',
+        'OPTIONS': {
+            'location': os.getenv('CERTIFICATE_CACHE_DIR', BASE_DIR / 'cache' / 'certificates'),
+        },
+    },
+}
+
 # Email Configuration (Microsoft Outlook)
 EMAIL_BACKEND = os.getenv('EMAIL_BACKEND', 'django.core.mail.backends.smtp.EmailBackend')
 EMAIL_HOST = os.getenv('EMAIL_HOST', 'smtp-mail.outlook.com')
@@ -178,6 +195,13 @@ FIREBASE_PRIVATE_KEY = os.getenv('FIREBASE_PRIVATE_KEY', '')
 FIREBASE_CLIENT_EMAIL = os.getenv('FIREBASE_CLIENT_EMAIL', '')
 FIREBASE_CLIENT_ID = os.getenv('FIREBASE_CLIENT_ID', '')
 FIREBASE_CERT_URL = os.getenv('FIREBASE_CERT_URL', '')
+# Koneksi HTTPS ke Cloud Storage yang disimpan per proses (coop/firebase/client.py)
+FIREBASE_HTTP_POOL_SIZE = int(os.getenv('FIREBASE_HTTP_POOL_SIZE', '10'))
+# Signed URL dipakai ulang (LRU per proses + cache bersama) sampai SAFETY_MARGIN detik sebelum kedaluwarsa
+FIREBASE_SIGNED_URL_CACHE = {
+    'MAX_ENTRIES': 2048,
+    'SAFETY_MARGIN': 60 * 60,
+}
 
 # Brand Colors - STEM Universitas Prasetiya Mulya
 BRAND_PRIMARY_COLOR = '#002D72'  # Pantone 288 C - Deep Blue
@@ -193,6 +217,85 @@ FEATURES = {
     'KAPRODI_DASHBOARD': os.getenv('FEATURE_KAPRODI_DASHBOARD', 'False') == 'True',
 }
 
+# Cache (counter notifikasi, dll). Set REDIS_URL di production agar semua worker berbagi cache;
+# tanpa itu dipakai LocMemCache per proses dan entri yang di-invalidate hanya disimpan
+# LOCAL_CACHE_MAX_TTL detik (lihat coops/utils/shared_cache.py, check --deploy coops.W001).
+if os.getenv('REDIS_URL'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.getenv('REDIS_URL'),
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+
+# Channel untuk stream notifikasi (SSE, /coops/notifications/stream/, butuh server ASGI).
+# InProcessChannel hanya benar untuk satu proses; dengan REDIS_URL event dibagikan lewat Redis pub/sub.
+if os.getenv('REDIS_URL'):
+    NOTIFICATION_CHANNEL = {
+        'BACKEND': 'coops.utils.notification_channel.RedisChannel',
+        'LOCATION': os.getenv('REDIS_URL'),
+    }
+else:
+    NOTIFICATION_CHANNEL = {
+        'BACKEND': 'coops.utils.notification_channel.InProcessChannel',
+    }
+
+# Retensi notifikasi: python manage.py purge_notifications atau task Celery terjadwal
+NOTIFICATION_RETENTION = {
+    'DAYS': int(os.getenv('NOTIFICATION_RETENTION_DAYS', 90)),
+    'KEEP_LATEST': int(os.getenv('NOTIFICATION_KEEP_LATEST')) if os.getenv('NOTIFICATION_KEEP_LATEST') else None,
+    'BATCH_SIZE': 1000,
+}
+
+# Antrian upload ke Firebase (coops/utils/uploads.py). SPOOL_DIR harus bisa dibaca web dan worker.
+UPLOAD_QUEUE = {
+    'SPOOL_DIR': os.getenv('UPLOAD_SPOOL_DIR', str(BASE_DIR / 'cache' / 'uploads')),
+    'MAX_ATTEMPTS': 5,
+    'RETRY_BACKOFF': 30,
+    'STALE_AFTER': 15 * 60,
+    # Batas waktu satu upload (time limit task); upload yang lebih lama dianggap hilang
+    'UPLOAD_TIMEOUT': 60 * 60,
+    # Umur signed URL untuk upload langsung dari browser (detik)
+    'DIRECT_URL_TTL': 15 * 60,
+}
+
+# Celery. Tanpa broker task dijalankan langsung (eager) di proses yang memanggilnya;
+# upload yang gagal lalu diulang oleh `python manage.py requeue_uploads` (cron), bukan di request.
+CELERY_BROKER_URL = os.getenv('CELERY_BROKER_URL') or os.getenv('REDIS_URL') or 'memory://'
+CELERY_TASK_ALWAYS_EAGER = os.getenv('CELERY_TASK_ALWAYS_EAGER', str(CELERY_BROKER_URL == 'memory://')) == 'True'
+CELERY_TIMEZONE = TIME_ZONE
+CELERY_BEAT_SCHEDULE = {
+    'purge-notifications': {
+        'task': 'coops.tasks.purge_notifications_task',
+        'schedule': 24 * 60 * 60,
+    },
+    'requeue-stale-uploads': {
+        'task': 'coops.tasks.requeue_stale_uploads_task',
+        'schedule': 5 * 60,
+    },
+}
+
+# Query budget middleware (opt-in): log views that exceed their query budget
+# Ringkasan per URL: /coops/admin/query-budget/
+QUERY_BUDGET = {
+    'ENABLED': os.getenv('QUERY_BUDGET_ENABLED', 'False') == 'True',
+    'DEFAULT_BUDGET': int(os.getenv('QUERY_BUDGET_DEFAULT', 50)),
+    'SLOW_MS': int(os.getenv('QUERY_BUDGET_SLOW_MS', 1000)),
+    'VIEWS': {
+        'coops:status_magang': 10,
+        'coops:tracking_evaluasi': 10,
+        'coops:admin_weekly_reports': 12,
+        'jobs:supervisor_dashboard': 12,
+        'accounts:kaprodi_dashboard': 12,
+    },
+}
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
@@ -16,6 +16,7 @@ Including another URLconf
 """
 from django.contrib import admin
 from django.urls import include, path
+from coops import views as coops_views
 from . import views
 
 urlpatterns = [
@@ -24,4 +25,6 @@ urlpatterns = [
     path("accounts/", include("accounts.urls", namespace="accounts")),
     path("coops/", include("coops.urls")),
     path("jobs/", include("jobs.urls")),
+    # URL publik di QR code sertifikat; nomor sertifikat mengandung '/'
+    path("verify/<path:nomor_sertifikat>/", coops_views.verify_sertifikat, name="verify_sertifikat"),
 ]
\ No newline at end of file
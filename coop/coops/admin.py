@@ -1,7 +1,7 @@
 from django.contrib import admin
 from .models import (
     KonfirmasiMagang, WeeklyReport, DeadlineReminder, EvaluasiTemplate,
-    EvaluasiSupervisor, LaporanKemajuan, LaporanAkhir, SertifikatCoop
+    EvaluasiSupervisor, LaporanKemajuan, LaporanAkhir, SertifikatCoop, BroadcastNotification, FileUpload
 )
 from django.conf import settings
 from django.utils import timezone
@@ -9,16 +9,52 @@ from django.utils.html import format_html
 from django.http import HttpResponse
 from django.contrib import messages
 import csv
+from .utils.evaluations import provision_evaluations
+from .utils.certificate_cache import invalidate_certificate_cache
+from .utils.certificate_numbers import issue_certificates
+from .utils.certificate_verification import invalidate_verification
+from .utils.uploads import retry_uploads
+
+
+class SignedDocumentsMixin:
+    """
+    Links to private Firebase documents on the changelist.
+
+    All URLs in signed_document_fields on one page are signed with a single
+    get_signed_urls call (cached), instead of one signature per row.
+    """
+    signed_document_fields = ()
+
+    def get_changelist(self, request, **kwargs):
+        fields = self.signed_document_fields
+
+        class SignedDocumentsChangeList(super().get_changelist(request, **kwargs)):
+            def get_results(self, request):
+                super().get_results(request)
+                from coop.firebase.storage_helper import get_signed_urls
+                signed = get_signed_urls([getattr(obj, field) for obj in self.result_list for field in fields])
+                for obj in self.result_list:
+                    obj.signed_documents = signed
+
+        return SignedDocumentsChangeList
+
+    def document_link(self, obj, field):
+        url = getattr(obj, field)
+        if not url:
+            return "-"
+        return format_html('<a href="{}" target="_blank">Lihat</a>', getattr(obj, 'signed_documents', {}).get(url, url))
 
 
 @admin.register(KonfirmasiMagang)
-class KonfirmasiMagangAdmin(admin.ModelAdmin):
+class KonfirmasiMagangAdmin(SignedDocumentsMixin, admin.ModelAdmin):
     # Use only actual KonfirmasiMagang model fields to avoid admin errors
     # show a combined periode column (periode_awal - periode_akhir)
-    list_display = ('mahasiswa', 'get_periode', 'posisi', 'nama_perusahaan', 'status')
+    list_display = ('mahasiswa', 'get_periode', 'posisi', 'nama_perusahaan', 'status', 'get_surat_penerimaan')
+    signed_document_fields = ('surat_penerimaan',)
     list_filter = ('status',)
     search_fields = ('mahasiswa__username', 'nama_perusahaan')
     ordering = ('-id',)
+    actions = ['issue_missing_certificates']
     fieldsets = (
         (None, {
             'fields': (
@@ -33,6 +69,11 @@ class KonfirmasiMagangAdmin(admin.ModelAdmin):
         qs = super().get_queryset(request)
         return qs.select_related('mahasiswa')
 
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        if obj.status == 'accepted' and 'status' in form.changed_data:
+            provision_evaluations(KonfirmasiMagang.objects.filter(id=obj.id))
+
     def get_periode(self, obj):
         if obj.periode_awal and obj.periode_akhir:
             return f"{obj.periode_awal} — {obj.periode_akhir}"
@@ -40,6 +81,16 @@ class KonfirmasiMagangAdmin(admin.ModelAdmin):
     get_periode.short_description = 'Periode'
     get_periode.admin_order_field = 'periode_awal'
 
+    def get_surat_penerimaan(self, obj):
+        return self.document_link(obj, 'surat_penerimaan')
+    get_surat_penerimaan.short_description = 'Surat Penerimaan'
+
+    def issue_missing_certificates(self, request, queryset):
+        """Terbitkan sertifikat untuk magang completed terpilih yang belum punya sertifikat"""
+        created = issue_certificates(queryset, issued_by=request.user)
+        self.message_user(request, f"{created} sertifikat berhasil diterbitkan.")
+    issue_missing_certificates.short_description = "Terbitkan sertifikat (yang belum ada)"
+
 
 @admin.register(WeeklyReport)
 class WeeklyReportAdmin(admin.ModelAdmin):
@@ -77,6 +128,14 @@ class EvaluasiTemplateAdmin(admin.ModelAdmin):
         }),
     )
 
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        # Template baru atau baru diaktifkan: buat evaluasi untuk semua mahasiswa aktif
+        if obj.aktif and (not change or 'aktif' in form.changed_data):
+            created = provision_evaluations(templates=[obj])
+            if created:
+                self.message_user(request, f"{created} evaluasi dibuat untuk supervisor.")
+
     def get_period_status(self, obj):
         """Display period status with color coding"""
         status = obj.period_status()
@@ -106,52 +165,48 @@ class EvaluasiTemplateAdmin(admin.ModelAdmin):
 
     def send_evaluations_to_supervisors(self, request, queryset):
         """Kirim evaluasi ke semua supervisor yang memiliki mahasiswa magang aktif"""
+        active_templates = queryset.filter(aktif=True)
+        created = provision_evaluations(templates=active_templates)
+
+        pending_evaluations = EvaluasiSupervisor.objects.filter(
+            template__in=active_templates,
+            konfirmasi__status='accepted',
+            status='pending'
+        ).select_related('template', 'konfirmasi__mahasiswa')
+
         total_sent = 0
-        for template in queryset:
-            if not template.aktif:
-                continue
+        for evaluasi in pending_evaluations:
+            template = evaluasi.template
+            konfirmasi = evaluasi.konfirmasi
+            # Kirim email ke supervisor (stub implementation)
+            try:
+                subject = f"Evaluasi {template.get_jenis_display()} - {konfirmasi.mahasiswa.get_full_name()}"
+                message = f"""
+                Kepada Yth. {konfirmasi.nama_supervisor},
                 
-            # Ambil semua konfirmasi magang yang accepted
-            konfirmasi_list = KonfirmasiMagang.objects.filter(status='accepted')
-            
-            for konfirmasi in konfirmasi_list:
-                # Buat atau update EvaluasiSupervisor
-                evaluasi, created = EvaluasiSupervisor.objects.get_or_create(
-                    konfirmasi=konfirmasi,
-                    template=template,
-                    defaults={'status': 'pending'}
-                )
+                Anda diminta untuk mengisi evaluasi {template.nama} untuk mahasiswa magang:
+                Nama: {konfirmasi.mahasiswa.get_full_name()}
+                Posisi: {konfirmasi.posisi}
+                
+                Silakan login ke sistem untuk mengisi evaluasi:
+                [Link akan ditambahkan]
                 
-                if created or evaluasi.status == 'pending':
-                    # Kirim email ke supervisor (stub implementation)
-                    try:
-                        subject = f"Evaluasi {template.get_jenis_display()} - {konfirmasi.mahasiswa.get_full_name()}"
-                        message = f"""
-                        Kepada Yth. {konfirmasi.nama_supervisor},
-                        
-                        Anda diminta untuk mengisi evaluasi {template.nama} untuk mahasiswa magang:
-                        Nama: {konfirmasi.mahasiswa.get_full_name()}
-                        Posisi: {konfirmasi.posisi}
-                        
-                        Silakan login ke sistem untuk mengisi evaluasi:
-                        [Link akan ditambahkan]
-                        
-                        Terima kasih atas kerjasamanya.
-                        """
-                        
-                        # Uncomment when email settings are configured
-                        # send_mail(
-                        #     subject,
-                        #     message,
-                        #     settings.DEFAULT_FROM_EMAIL,
-                        #     [konfirmasi.email_supervisor],
-                        #     fail_silently=False
-                        # )
-                        total_sent += 1
-                    except Exception as e:
-                        pass  # Continue processing other evaluations
+                Terima kasih atas kerjasamanya.
+                """
+                
+                # Uncomment when email settings are configured
+                # send_mail(
+                #     subject,
+                #     message,
+                #     settings.DEFAULT_FROM_EMAIL,
+                #     [konfirmasi.email_supervisor],
+                #     fail_silently=False
+                # )
+                total_sent += 1
+            except Exception as e:
+                pass  # Continue processing other evaluations
         
-        self.message_user(request, f"Evaluasi berhasil dikirim ke {total_sent} supervisor.")
+        self.message_user(request, f"{created} evaluasi baru dibuat. Evaluasi berhasil dikirim ke {total_sent} supervisor.")
     send_evaluations_to_supervisors.short_description = "Kirim evaluasi ke supervisor"
 
     def download_evaluation_results(self, request, queryset):
@@ -273,11 +328,19 @@ class LaporanKemajuanAdmin(admin.ModelAdmin):
 
 
 @admin.register(LaporanAkhir)
-class LaporanAkhirAdmin(admin.ModelAdmin):
-    list_display = ('konfirmasi', 'status', 'submitted_at', 'approved_at')
+class LaporanAkhirAdmin(SignedDocumentsMixin, admin.ModelAdmin):
+    list_display = ('konfirmasi', 'status', 'submitted_at', 'approved_at', 'get_file_laporan')
     list_filter = ('status',)
     search_fields = ('konfirmasi__mahasiswa__username',)
     readonly_fields = ('submitted_at', 'approved_at', 'created_at', 'updated_at')
+    signed_document_fields = ('file_laporan',)
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related('konfirmasi__mahasiswa')
+
+    def get_file_laporan(self, obj):
+        return self.document_link(obj, 'file_laporan')
+    get_file_laporan.short_description = 'File Laporan'
 
 
 @admin.register(SertifikatCoop)
@@ -291,7 +354,7 @@ class SertifikatCoopAdmin(admin.ModelAdmin):
         'konfirmasi__mahasiswa__last_name'
     )
     readonly_fields = ('nomor_sertifikat', 'tanggal_kelulusan', 'created_at', 'updated_at')
-    actions = ['issue_certificates', 'revoke_certificates', 'download_certificate_report']
+    actions = ['issue_certificates', 'revoke_certificates', 'download_certificate_report', 'download_certificates_zip']
     
     fieldsets = (
         ('Informasi Sertifikat', {
@@ -320,18 +383,42 @@ class SertifikatCoopAdmin(admin.ModelAdmin):
             return '-'
     get_nim.short_description = 'NIM'
 
+    def _invalidate_caches(self, selected):
+        """selected: [(konfirmasi_id, nomor_sertifikat)] captured before the update"""
+        invalidate_certificate_cache([konfirmasi_id for konfirmasi_id, _ in selected])
+        invalidate_verification([nomor for _, nomor in selected])
+
     def issue_certificates(self, request, queryset):
         """Terbitkan sertifikat terpilih"""
+        # Diambil sebelum update(): queryset changelist bisa difilter status dan kosong setelahnya
+        selected = list(queryset.values_list('konfirmasi_id', 'nomor_sertifikat'))
         updated = queryset.update(status='issued')
+        # update() tidak memanggil save(): buang PDF dan hasil verifikasi di cache secara eksplisit
+        self._invalidate_caches(selected)
         self.message_user(request, f"{updated} sertifikat berhasil diterbitkan.")
     issue_certificates.short_description = "Terbitkan sertifikat"
 
     def revoke_certificates(self, request, queryset):
         """Cabut sertifikat terpilih"""
+        selected = list(queryset.values_list('konfirmasi_id', 'nomor_sertifikat'))
         updated = queryset.update(status='revoked')
+        self._invalidate_caches(selected)
         self.message_user(request, f"{updated} sertifikat berhasil dicabut.")
     revoke_certificates.short_description = "Cabut sertifikat"
 
+    def download_certificates_zip(self, request, queryset):
+        """Unduh PDF sertifikat terpilih sebagai satu ZIP (dirender paralel, dikirim bertahap)"""
+        from django.http import StreamingHttpResponse
+        from .utils.certificate_batch import CertificateBatch
+
+        batch = CertificateBatch(queryset)
+        response = StreamingHttpResponse(batch.stream_zip(), content_type='application/zip')
+        response['Content-Disposition'] = (
+            f'attachment; filename="sertifikat_coop_{timezone.now().strftime("%Y%m%d_%H%M%S")}.zip"'
+        )
+        return response
+    download_certificates_zip.short_description = "Download PDF sertifikat (ZIP)"
+
     def download_certificate_report(self, request, queryset):
         """Download laporan sertifikat dalam format CSV"""
         response = HttpResponse(content_type='text/csv')
@@ -370,4 +457,50 @@ class SertifikatCoopAdmin(admin.ModelAdmin):
             ])
         
         return response
-    download_certificate_report.short_description = "Download laporan sertifikat"
\ No newline at end of file
+    download_certificate_report.short_description = "Download laporan sertifikat"
+
+
+@admin.register(BroadcastNotification)
+class BroadcastNotificationAdmin(admin.ModelAdmin):
+    list_display = ('title', 'get_target', 'notification_type', 'created_by', 'created_at', 'read_count')
+    list_filter = ('target_role', 'target_jurusan', 'target_angkatan', 'notification_type')
+    search_fields = ('title', 'message')
+    ordering = ('-created_at',)
+    list_select_related = ('created_by',)
+    fields = ('target_role', 'target_jurusan', 'target_angkatan', 'title', 'message', 'notification_type', 'link')
+
+    def get_queryset(self, request):
+        from django.db.models import Count
+        return super().get_queryset(request).annotate(read_total=Count('reads'))
+
+    def get_target(self, obj):
+        return obj.get_target_display()
+    get_target.short_description = 'Target'
+
+    def read_count(self, obj):
+        return obj.read_total
+    read_count.short_description = 'Dibaca'
+    read_count.admin_order_field = 'read_total'
+
+    def save_model(self, request, obj, form, change):
+        if not change:
+            obj.created_by = request.user
+        super().save_model(request, obj, form, change)
+
+
+@admin.register(FileUpload)
+class FileUploadAdmin(admin.ModelAdmin):
+    list_display = ('blob_path', 'target_model', 'target_id', 'status', 'attempts', 'uploaded_by', 'created_at', 'completed_at')
+    list_filter = ('status', 'target_model')
+    search_fields = ('blob_path', 'original_name', 'uploaded_by__username')
+    readonly_fields = [field.name for field in FileUpload._meta.fields]
+    actions = ['retry_failed_uploads']
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related('uploaded_by')
+
+    def retry_failed_uploads(self, request, queryset):
+        """Antrekan ulang upload yang gagal"""
+        queued = retry_uploads(queryset)
+        self.message_user(request, f"{queued} upload diantrekan ulang.")
+    retry_failed_uploads.short_description = "Upload ulang yang gagal"
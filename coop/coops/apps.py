@@ -4,3 +4,9 @@ from django.apps import AppConfig
 class CoopsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'coops'
+
+    def ready(self):
+        from django.core import checks
+        from .utils.shared_cache import check_shared_cache
+
+        checks.register(check_shared_cache, checks.Tags.caches, deploy=True)
@@ -3,49 +3,110 @@ Certificate PDF Generator with QR Code
 Generates professional certificates for Coop program completion
 """
 
+import threading
 from io import BytesIO
 from reportlab.lib.pagesizes import A4, landscape
 from reportlab.lib.units import inch
 from reportlab.pdfgen import canvas
 from reportlab.lib import colors
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.platypus import Paragraph
-from reportlab.lib.enums import TA_CENTER
 import qrcode
-from PIL import Image
 from django.conf import settings
+from django.urls import reverse
+
+
+class StaticLayer:
+    """
+    Static part of the certificate, compiled once per process.
+
+    The drawing operators are recorded on a throwaway canvas and spliced
+    into each certificate's page stream, so per certificate only the
+    variable text and the QR code are generated.
+    """
+
+    def __init__(self, draw, pagesize):
+        c = canvas.Canvas(BytesIO(), pagesize=pagesize)
+        start = len(c._code)
+        draw(c)
+        self.code = c._code[start:]
+        # Operator yang direkam memakai nama internal font (F1, F2, ...) canvas ini
+        self.fonts = list(c._doc.fontMapping.items())
+
+    def place(self, c):
+        """
+        Draw the recorded layer on canvas c.
+
+        Returns:
+            bool: False if the canvas assigns different font names (caller then draws directly)
+        """
+        for font, internal_name in self.fonts:
+            if c._doc.getInternalFontName(font) != internal_name:
+                return False
+        c.saveState()
+        c._code.extend(self.code)
+        c.restoreState()
+        return True
 
 
 class CertificateGenerator:
     """Generate professional certificate PDFs with QR code"""
 
-    def __init__(self, sertifikat):
+    # Naikkan jika tampilan sertifikat berubah: semua PDF di cache dirender ulang
+    LAYOUT_VERSION = 2
+
+    # StaticLayer per (layout, warna brand), dibuat sekali per proses
+    _static_layers = {}
+    _static_lock = threading.Lock()
+
+    def __init__(self, sertifikat, use_static_layer=True):
         self.sertifikat = sertifikat
         self.konfirmasi = sertifikat.konfirmasi
         self.mahasiswa = sertifikat.konfirmasi.mahasiswa
         self.width, self.height = landscape(A4)
+        self.use_static_layer = use_static_layer
 
-    def generate_qr_code(self):
-        """Generate QR code for certificate verification"""
-        qr_data = f"CERT-{self.sertifikat.nomor_sertifikat}"
-        verification_url = f"https://coop.prasetiyamulya.ac.id/verify/{self.sertifikat.nomor_sertifikat}/"
+    def verification_url(self):
+        return "https://coop.prasetiyamulya.ac.id" + reverse('verify_sertifikat', args=[self.sertifikat.nomor_sertifikat])
 
+    def generate_qr_matrix(self):
+        """QR code modules for the verification URL (True = dark), including the quiet zone"""
         qr = qrcode.QRCode(
             version=1,
             error_correction=qrcode.constants.ERROR_CORRECT_L,
-            box_size=10,
             border=4,
+            # Mask tetap: tanpa ini qrcode menilai kedelapan mask, bagian terlama dari render
+            mask_pattern=0,
         )
-        qr.add_data(verification_url)
+        qr.add_data(self.verification_url())
         qr.make(fit=True)
-
-        img = qr.make_image(fill_color="black", back_color="white")
-
-        buffer = BytesIO()
-        img.save(buffer, format='PNG')
-        buffer.seek(0)
-
-        return buffer
+        return qr.get_matrix()
+
+    def draw_qr_code(self, c, x, y, size):
+        """
+        Draw the QR code as vector graphics (no raster image).
+
+        Coordinates are scaled to one unit per module, so each horizontal run
+        of dark modules is a single integer rectangle.
+        """
+        matrix = self.generate_qr_matrix()
+        count = len(matrix)
+        ops = []
+        for row_index, row in enumerate(matrix):
+            row_y = count - row_index - 1
+            run_start = None
+            for col_index, dark in enumerate(row + [False]):
+                if dark and run_start is None:
+                    run_start = col_index
+                elif not dark and run_start is not None:
+                    ops.append(f"{run_start} {row_y} {col_index - run_start} 1 re")
+                    run_start = None
+        ops.append('f')
+
+        c.saveState()
+        c.translate(x, y)
+        c.scale(size / count, size / count)
+        c.setFillColor(colors.black)
+        c.addLiteral('\n'.join(ops))
+        c.restoreState()
 
     def draw_border(self, c):
         """Draw decorative border"""
@@ -62,11 +123,8 @@ class CertificateGenerator:
                self.width - 2 * inner_margin,
                self.height - 2 * inner_margin)
 
-    def generate_pdf(self):
-        """Generate the complete certificate PDF"""
-        buffer = BytesIO()
-        c = canvas.Canvas(buffer, pagesize=landscape(A4))
-
+    def draw_static(self, c):
+        """Everything that is identical on every certificate"""
         self.draw_border(c)
 
         c.setFont("Helvetica-Bold", 32)
@@ -82,6 +140,58 @@ class CertificateGenerator:
         c.drawCentredString(self.width / 2, self.height - 2.3 * inch,
                            "Diberikan kepada:")
 
+        c.setFont("Helvetica", 11)
+        c.drawCentredString(self.width / 2, self.height - 4.2 * inch,
+                           "Telah menyelesaikan program Cooperative Education (Coop)")
+
+        qr_x, qr_y, qr_size = self.qr_position()
+        c.setFont("Helvetica", 8)
+        c.drawCentredString(qr_x + qr_size / 2, qr_y - 0.2 * inch, "Scan untuk verifikasi")
+
+        signature_y = 1.2 * inch
+        signature_x_left = self.width / 4
+        signature_x_right = 3 * self.width / 4
+
+        c.line(signature_x_left - 1.2 * inch, signature_y,
+               signature_x_left + 1.2 * inch, signature_y)
+        c.setFont("Helvetica-Bold", 10)
+        c.drawCentredString(signature_x_left, signature_y - 0.2 * inch, "Tanggal")
+
+        c.line(signature_x_right - 1.2 * inch, signature_y,
+               signature_x_right + 1.2 * inch, signature_y)
+        c.drawCentredString(signature_x_right, signature_y - 0.2 * inch,
+                           "Koordinator Program Coop")
+
+        c.setFont("Helvetica", 7)
+        c.setFillColor(colors.grey)
+        c.drawCentredString(self.width / 2, 0.25 * inch,
+                           "STEM - Universitas Prasetiya Mulya")
+
+    def qr_position(self):
+        return self.width - 1.5 * inch, 0.8 * inch, 0.8 * inch
+
+    def get_static_layer(self):
+        key = (
+            self.LAYOUT_VERSION, self.width, self.height,
+            settings.BRAND_PRIMARY_COLOR, settings.BRAND_SECONDARY_COLOR,
+        )
+        layer = self._static_layers.get(key)
+        if layer is None:
+            with self._static_lock:
+                layer = self._static_layers.get(key)
+                if layer is None:
+                    layer = StaticLayer(self.draw_static, (self.width, self.height))
+                    self._static_layers[key] = layer
+        return layer
+
+    def generate_pdf(self):
+        """Generate the complete certificate PDF"""
+        buffer = BytesIO()
+        c = canvas.Canvas(buffer, pagesize=landscape(A4), pageCompression=1)
+
+        if not (self.use_static_layer and self.get_static_layer().place(c)):
+            self.draw_static(c)
+
         c.setFont("Helvetica-Bold", 24)
         c.setFillColor(colors.HexColor(settings.BRAND_PRIMARY_COLOR))
         c.drawCentredString(self.width / 2, self.height - 2.9 * inch,
@@ -103,8 +213,6 @@ class CertificateGenerator:
 
         c.setFont("Helvetica", 11)
         text_y = self.height - 4.2 * inch
-        c.drawCentredString(self.width / 2, text_y,
-                           f"Telah menyelesaikan program Cooperative Education (Coop)")
         c.drawCentredString(self.width / 2, text_y - 0.3 * inch,
                            f"di {self.konfirmasi.nama_perusahaan}")
         c.drawCentredString(self.width / 2, text_y - 0.6 * inch,
@@ -118,45 +226,18 @@ class CertificateGenerator:
         c.drawCentredString(self.width / 2, text_y - 1.4 * inch,
                            f"Nilai Akhir: {self.sertifikat.nilai_akhir}")
 
-        qr_buffer = self.generate_qr_code()
-        qr_img = Image.open(qr_buffer)
-
-        qr_size = 0.8 * inch
-        qr_x = self.width - 1.5 * inch
-        qr_y = 0.8 * inch
-
-        c.drawImage(qr_buffer, qr_x, qr_y, width=qr_size, height=qr_size, mask='auto')
-
-        c.setFont("Helvetica", 8)
-        c.setFillColor(colors.black)
-        c.drawCentredString(qr_x + qr_size / 2, qr_y - 0.2 * inch, "Scan untuk verifikasi")
+        qr_x, qr_y, qr_size = self.qr_position()
+        self.draw_qr_code(c, qr_x, qr_y, qr_size)
 
         c.setFont("Helvetica", 10)
-        signature_y = 1.2 * inch
-        signature_x_left = self.width / 4
-        signature_x_right = 3 * self.width / 4
-
-        c.drawCentredString(signature_x_left, signature_y + 0.7 * inch,
+        c.setFillColor(colors.black)
+        c.drawCentredString(self.width / 4, 1.2 * inch + 0.7 * inch,
                            self.sertifikat.tanggal_kelulusan.strftime('%d %B %Y'))
 
-        c.line(signature_x_left - 1.2 * inch, signature_y,
-               signature_x_left + 1.2 * inch, signature_y)
-        c.setFont("Helvetica-Bold", 10)
-        c.drawCentredString(signature_x_left, signature_y - 0.2 * inch, "Tanggal")
-
-        c.setFont("Helvetica", 10)
-        c.line(signature_x_right - 1.2 * inch, signature_y,
-               signature_x_right + 1.2 * inch, signature_y)
-        c.setFont("Helvetica-Bold", 10)
-        c.drawCentredString(signature_x_right, signature_y - 0.2 * inch,
-                           "Koordinator Program Coop")
-
         c.setFont("Helvetica", 7)
         c.setFillColor(colors.grey)
         c.drawCentredString(self.width / 2, 0.4 * inch,
                            f"Nomor Sertifikat: {self.sertifikat.nomor_sertifikat}")
-        c.drawCentredString(self.width / 2, 0.25 * inch,
-                           "STEM - Universitas Prasetiya Mulya")
 
         c.showPage()
         c.save()
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+from coops.utils.benchmark import benchmark_certificate_render
+
+
+class Command(BaseCommand):
+    help = "Micro-benchmark render PDF sertifikat (static layer vs gambar langsung), tanpa database"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repeat', type=int, default=200, help='Render terukur per mode (default: 200)')
+
+    def handle(self, *args, **options):
+        results = benchmark_certificate_render(repeat=options['repeat'])
+        for mode, result in results.items():
+            self.stdout.write(
+                f"  {mode:<14} p50 {result['p50_ms']:>8} ms  p95 {result['p95_ms']:>8} ms  "
+                f"{result['certs_per_second']:>5} sertifikat/s  {result['bytes']:>7} bytes"
+            )
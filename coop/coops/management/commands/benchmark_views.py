@@ -0,0 +1,69 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import setup_databases, setup_test_environment, teardown_databases, teardown_test_environment
+from coops.utils.benchmark import (
+    run_benchmark, compare_results, load_results, save_results, BENCHMARK_ROLES, DEFAULT_THRESHOLD
+)
+from coops.utils.synthetic import CohortGenerator
+
+
+class Command(BaseCommand):
+    help = "Benchmark latency (p50/p95), jumlah query dan peak memory semua URL coops/jobs/accounts per role"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--students', type=int, default=2000, help='Ukuran dataset sintetis (default: 2000)')
+        parser.add_argument('--seed', type=int, default=42, help='Seed dataset sintetis')
+        parser.add_argument('--repeat', type=int, default=10, help='Request terukur per URL dan role (default: 10)')
+        parser.add_argument('--roles', nargs='+', choices=BENCHMARK_ROLES, default=list(BENCHMARK_ROLES))
+        parser.add_argument('--only', help='Hanya URL yang namanya mengandung teks ini')
+        parser.add_argument('--output', default='benchmark_baseline.json', help='File JSON hasil benchmark')
+        parser.add_argument('--compare', metavar='BASELINE', help='Bandingkan dengan baseline JSON ini')
+        parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                            help='Batas regresi latency, pecahan (default: 0.2 = 20%%)')
+        parser.add_argument('--current-db', action='store_true',
+                            help='Pakai database yang sedang dikonfigurasi (tanpa test database dan data sintetis)')
+
+    def handle(self, *args, **options):
+        baseline = load_results(options['compare']) if options['compare'] else None
+
+        if options['current_db']:
+            results = self._run(options)
+        else:
+            # Database sementara: data sintetis tidak pernah menyentuh database asli
+            setup_test_environment(debug=False)
+            old_config = setup_databases(verbosity=0, interactive=False)
+            try:
+                CohortGenerator(students=options['students'], seed=options['seed']).run()
+                results = self._run(options)
+            finally:
+                teardown_databases(old_config, verbosity=0)
+                teardown_test_environment()
+
+        for role in results['meta']['skipped_roles']:
+            self.stdout.write(self.style.WARNING(f"Role {role} dilewati: tidak ada user {role} yang cocok di database."))
+
+        save_results(results, options['output'])
+        self.stdout.write(self.style.SUCCESS(f"{len(results['results'])} hasil disimpan ke {options['output']}"))
+
+        if baseline is not None:
+            regressions = compare_results(baseline, results, options['threshold'])
+            for r in regressions:
+                self.stdout.write(self.style.ERROR(
+                    f"  REGRESI {r['key']} {r['metric']}: {r['baseline']} -> {r['current']} ({r['change']})"
+                ))
+            if regressions:
+                raise CommandError(f"{len(regressions)} regresi dibanding {options['compare']}")
+            self.stdout.write(self.style.SUCCESS("Tidak ada regresi."))
+
+    def _run(self, options):
+        def progress(key, result):
+            self.stdout.write(
+                f"  {key:<55} {result['status']}  p50 {result['p50_ms']:>8} ms  "
+                f"p95 {result['p95_ms']:>8} ms  {result['queries']:>4} q  {result['peak_memory_kb']:>8} KB"
+            )
+
+        return run_benchmark(
+            repeat=options['repeat'],
+            roles=options['roles'],
+            only=options['only'],
+            progress=progress if options['verbosity'] >= 1 else None,
+        )
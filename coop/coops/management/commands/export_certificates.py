@@ -0,0 +1,42 @@
+import os
+from django.core.management.base import BaseCommand, CommandError
+from coops.models import SertifikatCoop
+from coops.utils.certificate_batch import CertificateBatch
+
+
+class Command(BaseCommand):
+    help = "Render PDF sertifikat secara paralel dan simpan sebagai satu file ZIP"
+
+    def add_arguments(self, parser):
+        parser.add_argument('output', help='Path file ZIP tujuan')
+        parser.add_argument(
+            '--status', default='issued', choices=['draft', 'issued', 'revoked', 'all'],
+            help='Status sertifikat yang diekspor (default: issued)'
+        )
+        parser.add_argument('--id', type=int, action='append', dest='ids', help='Batasi ke sertifikat tertentu (boleh diulang)')
+        parser.add_argument('--workers', type=int, help=f'Jumlah proses worker (default: {os.cpu_count()})')
+
+    def handle(self, *args, **options):
+        queryset = SertifikatCoop.objects.all()
+        if options['status'] != 'all':
+            queryset = queryset.filter(status=options['status'])
+        if options['ids']:
+            queryset = queryset.filter(id__in=options['ids'])
+        if options['workers'] is not None and options['workers'] < 1:
+            raise CommandError("--workers harus >= 1")
+
+        step = 1
+
+        def progress(done, total):
+            if done % step == 0 or done == total:
+                self.stdout.write(f"  {done}/{total} sertifikat")
+
+        batch = CertificateBatch(queryset, workers=options['workers'], progress=progress)
+        if not len(batch):
+            raise CommandError("Tidak ada sertifikat yang cocok.")
+        step = max(len(batch) // 20, 1)
+
+        batch.write_zip(options['output'])
+        self.stdout.write(self.style.SUCCESS(
+            f"{len(batch)} sertifikat ditulis ke {options['output']} ({batch.workers} worker)."
+        ))
@@ -0,0 +1,56 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from coops.utils.synthetic import CohortGenerator, clear_synthetic_data, synthetic_users, SYNTHETIC_PASSWORD
+
+
+class Command(BaseCommand):
+    help = "Generate dataset sintetis berskala besar (semua role, magang, evaluasi, laporan, notifikasi, lowongan)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--students', type=int, default=1000, help='Jumlah mahasiswa (default: 1000)')
+        parser.add_argument('--seed', type=int, default=42, help='Seed random agar hasil bisa direproduksi')
+        parser.add_argument('--supervisors', type=int, help='Jumlah supervisor (default: students / 20)')
+        parser.add_argument('--admins', type=int, default=2, help='Jumlah admin (default: 2)')
+        parser.add_argument('--job-postings', type=int, help='Jumlah lowongan (default: students / 50)')
+        parser.add_argument('--weeks', type=int, default=4, help='Minggu laporan mingguan per mahasiswa (default: 4)')
+        parser.add_argument('--notifications', type=int, default=3, help='Notifikasi per mahasiswa (default: 3)')
+        parser.add_argument('--applications', type=int, default=2, help='Lamaran lowongan per mahasiswa (default: 2)')
+        parser.add_argument('--chunk-size', type=int, default=5000, help='Mahasiswa per transaksi (default: 5000)')
+        parser.add_argument('--clear', action='store_true', help='Hapus data sintetis sebelumnya terlebih dahulu')
+        parser.add_argument('--force', action='store_true', help='Izinkan berjalan saat DEBUG=False')
+
+    def handle(self, *args, **options):
+        if not settings.DEBUG and not options['force']:
+            raise CommandError("DEBUG=False: jangan isi database produksi dengan data sintetis (gunakan --force).")
+
+        if options['clear']:
+            deleted = clear_synthetic_data()
+            self.stdout.write(f"{deleted} baris data sintetis lama dihapus.")
+        elif synthetic_users().exists():
+            raise CommandError("Data sintetis sudah ada. Jalankan dengan --clear untuk membuat ulang.")
+
+        generator = CohortGenerator(
+            students=options['students'],
+            seed=options['seed'],
+            supervisors=options['supervisors'],
+            admins=options['admins'],
+            job_postings=options['job_postings'],
+            weeks=options['weeks'],
+            notifications=options['notifications'],
+            applications=options['applications'],
+            chunk_size=options['chunk_size'],
+        )
+
+        def progress(done, total):
+            if options['verbosity'] >= 2:
+                self.stdout.write(f"  {done}/{total} mahasiswa")
+
+        stats = generator.run(progress=progress)
+
+        for model, count in stats.items():
+            if model != 'seconds':
+                self.stdout.write(f"  {model}: {count}")
+        self.stdout.write(self.style.SUCCESS(
+            f"{options['students']} mahasiswa dibuat dalam {stats['seconds']} detik "
+            f"(password semua akun: '{SYNTHETIC_PASSWORD}')."
+        ))
@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+from coops.models import KonfirmasiMagang
+from coops.utils.certificate_numbers import issue_certificates
+
+
+class Command(BaseCommand):
+    help = "Terbitkan sertifikat untuk semua magang completed yang belum punya sertifikat (aman dijalankan paralel)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--angkatan', type=int, help='Batasi ke angkatan ini')
+        parser.add_argument('--jurusan', help='Batasi ke jurusan ini (mis. BBA)')
+        parser.add_argument('--nilai', default='A', choices=['A', 'B', 'C', 'D'], help='Nilai akhir (default: A)')
+
+    def handle(self, *args, **options):
+        konfirmasi_qs = KonfirmasiMagang.objects.all()
+        if options['angkatan']:
+            konfirmasi_qs = konfirmasi_qs.filter(mahasiswa__mahasiswa__angkatan=options['angkatan'])
+        if options['jurusan']:
+            konfirmasi_qs = konfirmasi_qs.filter(mahasiswa__mahasiswa__jurusan=options['jurusan'])
+
+        created = issue_certificates(konfirmasi_qs, nilai_akhir=options['nilai'])
+        self.stdout.write(self.style.SUCCESS(f"{created} sertifikat diterbitkan."))
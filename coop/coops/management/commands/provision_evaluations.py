@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+from coops.models import EvaluasiTemplate
+from coops.utils.evaluations import provision_evaluations
+
+
+class Command(BaseCommand):
+    help = "Buat EvaluasiSupervisor yang belum ada untuk semua mahasiswa accepted x template aktif"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--template', type=int, action='append', dest='template_ids',
+            help='Batasi ke template tertentu (id, boleh diulang)'
+        )
+
+    def handle(self, *args, **options):
+        templates = EvaluasiTemplate.objects.filter(aktif=True)
+        if options['template_ids']:
+            templates = templates.filter(id__in=options['template_ids'])
+
+        created = provision_evaluations(templates=templates)
+        self.stdout.write(self.style.SUCCESS(f"{created} evaluasi dibuat."))
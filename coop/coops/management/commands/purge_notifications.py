@@ -0,0 +1,68 @@
+import gzip
+from django.core.management.base import BaseCommand, CommandError
+from coops.utils.retention import get_retention_settings, purge_notifications
+
+
+class Command(BaseCommand):
+    help = "Hapus (dan opsional arsipkan) notifikasi lama secara bertahap per batch"
+
+    def add_arguments(self, parser):
+        config = get_retention_settings()
+        parser.add_argument(
+            '--days', type=int, default=config['DAYS'],
+            help=f"Hapus notifikasi yang sudah dibaca dan lebih tua dari N hari (default: {config['DAYS']})"
+        )
+        parser.add_argument('--no-age', action='store_true', help='Lewati aturan umur')
+        parser.add_argument(
+            '--keep-latest', type=int, default=config['KEEP_LATEST'],
+            help='Simpan hanya N notifikasi terbaru per user'
+        )
+        parser.add_argument(
+            '--include-unread', action='store_true',
+            help='--keep-latest juga menghapus notifikasi yang belum dibaca'
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=config['BATCH_SIZE'],
+            help=f"Baris per transaksi delete (default: {config['BATCH_SIZE']})"
+        )
+        parser.add_argument('--pause', type=float, default=0, help='Jeda (detik) antar batch')
+        parser.add_argument('--archive', help='Tulis baris yang dihapus ke file JSON Lines (.gz untuk kompresi)')
+        parser.add_argument('--dry-run', action='store_true', help='Hanya hitung baris yang akan dihapus')
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1:
+            raise CommandError("--batch-size harus >= 1")
+        if options['keep_latest'] is not None and options['keep_latest'] < 1:
+            raise CommandError("--keep-latest harus >= 1")
+
+        def progress(rule, stats):
+            if options['verbosity'] >= 2:
+                self.stdout.write(f"  [{rule}] {stats['deleted']} dihapus ({stats['rows_per_second']} baris/detik)")
+
+        archive = None
+        if options['archive']:
+            opener = gzip.open if options['archive'].endswith('.gz') else open
+            archive = opener(options['archive'], 'at', encoding='utf-8')
+        try:
+            stats = purge_notifications(
+                older_than_days=None if options['no_age'] else options['days'],
+                keep_latest=options['keep_latest'],
+                include_unread=options['include_unread'],
+                batch_size=options['batch_size'],
+                pause=options['pause'],
+                archive=archive,
+                dry_run=options['dry_run'],
+                progress=progress,
+            )
+        finally:
+            if archive is not None:
+                archive.close()
+
+        verb = "akan dihapus" if options['dry_run'] else "dihapus"
+        for rule, rule_stats in stats.items():
+            self.stdout.write(
+                f"  {rule}: {rule_stats['deleted']} {verb}, {rule_stats['batches']} batch, "
+                f"{rule_stats['seconds']} detik ({rule_stats['rows_per_second']} baris/detik)"
+            )
+        total = sum(rule_stats['deleted'] for rule_stats in stats.values())
+        self.stdout.write(self.style.SUCCESS(f"{total} notifikasi {verb}."))
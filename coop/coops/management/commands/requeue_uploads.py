@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+from coops.utils.uploads import expire_direct_uploads, requeue_stale_uploads
+
+
+class Command(BaseCommand):
+    help = "Ulangi upload yang macet atau gagal sementara (untuk cron jika Celery beat tidak berjalan)"
+
+    def handle(self, *args, **options):
+        requeued = requeue_stale_uploads()
+        completed = expire_direct_uploads()
+        self.stdout.write(self.style.SUCCESS(
+            f"{requeued} upload diantrikan ulang, {completed} upload langsung diselesaikan."
+        ))
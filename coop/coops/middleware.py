@@ -0,0 +1,79 @@
+import logging
+import time
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from .utils.query_budget import UNRESOLVED, QueryRecorder, summary
+
+logger = logging.getLogger('coops.query_budget')
+
+
+DEFAULT_QUERY_BUDGET = {
+    'ENABLED': False,
+    'DEFAULT_BUDGET': 50,      # max queries per request
+    'VIEWS': {},               # {'coops:status_magang': 10, ...}
+    'SLOW_MS': 1000,           # log requests slower than this
+    'DUPLICATE_THRESHOLD': 5,  # log fingerprints repeated this often
+    'WINDOW': 200,             # samples kept per URL name
+    'IGNORE_PATHS': ['/static/', '/media/'],
+}
+
+
+def get_query_budget_settings():
+    config = dict(DEFAULT_QUERY_BUDGET)
+    config.update(getattr(settings, 'QUERY_BUDGET', {}))
+    return config
+
+
+class QueryBudgetMiddleware:
+    """
+    Opt-in middleware that measures the database work done by each request.
+
+    Records query count, total DB time, duplicate query fingerprints and
+    wall time per request, logs a warning when a view exceeds its query
+    budget or is slow, and feeds the rolling per-URL summary shown on the
+    admin 'Query Budget' page.
+
+    Enable with settings.QUERY_BUDGET['ENABLED'] = True
+    (env: QUERY_BUDGET_ENABLED=True).
+    """
+
+    def __init__(self, get_response):
+        self.config = get_query_budget_settings()
+        if not self.config['ENABLED']:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        summary.window = self.config['WINDOW']
+
+    def __call__(self, request):
+        if any(request.path.startswith(path) for path in self.config['IGNORE_PATHS']):
+            return self.get_response(request)
+
+        start = time.perf_counter()
+        with QueryRecorder() as recorder:
+            response = self.get_response(request)
+        wall_time = time.perf_counter() - start
+
+        match = getattr(request, 'resolver_match', None)
+        # Path yang tidak ter-resolve (404, scanner) dikumpulkan di satu key agar summary tetap terbatas
+        url_name = match.view_name if match else UNRESOLVED
+        label = url_name if match else request.path
+        budget = self.config['VIEWS'].get(url_name, self.config['DEFAULT_BUDGET'])
+        duplicates = recorder.duplicates(min_count=self.config['DUPLICATE_THRESHOLD'])
+        over_budget = recorder.count > budget
+
+        summary.record(url_name, recorder.count, recorder.db_time, wall_time, duplicates[:5], over_budget)
+
+        if over_budget:
+            logger.warning(
+                f"Query budget exceeded for {label}: {recorder.count} queries (budget {budget}), "
+                f"db {recorder.db_time * 1000:.1f} ms, wall {wall_time * 1000:.1f} ms"
+            )
+            for sql, n in duplicates[:5]:
+                logger.warning(f"  {n}x {sql[:300]}")
+        elif wall_time * 1000 > self.config['SLOW_MS']:
+            logger.warning(
+                f"Slow view {label}: wall {wall_time * 1000:.1f} ms, "
+                f"{recorder.count} queries, db {recorder.db_time * 1000:.1f} ms"
+            )
+
+        return response
@@ -0,0 +1,91 @@
+# Generated by Django 5.2.18 on 2026-10-18 10:17
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('coops', '0010_add_evaluation_period_control'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='konfirmasimagang',
+            name='approval_notes',
+            field=models.TextField(blank=True, null=True, verbose_name='Catatan Persetujuan'),
+        ),
+        migrations.AddField(
+            model_name='konfirmasimagang',
+            name='approved_at',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='Tanggal Disetujui'),
+        ),
+        migrations.AddField(
+            model_name='konfirmasimagang',
+            name='approved_by',
+            field=models.ForeignKey(blank=True, limit_choices_to={'role': 'supervisor'}, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='approved_magang', to=settings.AUTH_USER_MODEL, verbose_name='Disetujui oleh'),
+        ),
+        migrations.AddField(
+            model_name='konfirmasimagang',
+            name='created_at',
+            field=models.DateTimeField(auto_now_add=True, default=django.utils.timezone.now, verbose_name='Tanggal Dibuat'),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='konfirmasimagang',
+            name='rejected_at',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='Tanggal Ditolak'),
+        ),
+        migrations.AddField(
+            model_name='konfirmasimagang',
+            name='rejection_reason',
+            field=models.TextField(blank=True, null=True, verbose_name='Alasan Penolakan'),
+        ),
+        migrations.AddField(
+            model_name='konfirmasimagang',
+            name='supervisor_user',
+            field=models.ForeignKey(blank=True, limit_choices_to={'role': 'supervisor'}, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='supervised_magang', to=settings.AUTH_USER_MODEL, verbose_name='Supervisor Account'),
+        ),
+        migrations.AddField(
+            model_name='konfirmasimagang',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, verbose_name='Tanggal Diubah'),
+        ),
+        migrations.AlterField(
+            model_name='evaluasisupervisor',
+            name='status',
+            field=models.CharField(choices=[('pending', 'Belum Diisi'), ('completed', 'Sudah Diisi'), ('finished', 'Selesai')], default='pending', max_length=20),
+        ),
+        migrations.AlterField(
+            model_name='konfirmasimagang',
+            name='surat_penerimaan',
+            field=models.URLField(max_length=500, verbose_name='Surat Penerimaan (Firebase URL)'),
+        ),
+        migrations.AlterField(
+            model_name='laporanakhir',
+            name='file_laporan',
+            field=models.URLField(blank=True, max_length=500, null=True, verbose_name='File Laporan (Firebase URL)'),
+        ),
+        migrations.CreateModel(
+            name='Notification',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('title', models.CharField(max_length=200, verbose_name='Judul')),
+                ('message', models.TextField(verbose_name='Pesan')),
+                ('notification_type', models.CharField(choices=[('info', 'Information'), ('warning', 'Warning'), ('success', 'Success'), ('danger', 'Urgent')], default='info', max_length=20, verbose_name='Tipe')),
+                ('is_read', models.BooleanField(default=False, verbose_name='Sudah Dibaca')),
+                ('link', models.CharField(blank=True, max_length=200, null=True, verbose_name='Link URL')),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Waktu Dibuat')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='notifications', to=settings.AUTH_USER_MODEL, verbose_name='User')),
+            ],
+            options={
+                'verbose_name': 'Notifikasi',
+                'verbose_name_plural': 'Notifikasi',
+                'ordering': ['-created_at'],
+            },
+        ),
+    ]
@@ -0,0 +1,51 @@
+# Generated by Django 5.2.18 on 2026-10-18 10:35
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('coops', '0011_catch_up_models'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BroadcastNotification',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('target_role', models.CharField(blank=True, choices=[('mahasiswa', 'Mahasiswa'), ('supervisor', 'Supervisor'), ('admin', 'Admin'), ('kaprodi', 'Kaprodi')], max_length=20, null=True, verbose_name='Target Role')),
+                ('target_jurusan', models.CharField(blank=True, choices=[('BBA', 'Bachelor of Business Administration'), ('BSBA', 'Bachelor of Science in Business Analytics'), ('BSSE', 'Bachelor of Science in Software Engineering'), ('BIE', 'Bachelor of Industrial Engineering')], max_length=10, null=True, verbose_name='Target Jurusan')),
+                ('target_angkatan', models.IntegerField(blank=True, null=True, verbose_name='Target Angkatan')),
+                ('title', models.CharField(max_length=200, verbose_name='Judul')),
+                ('message', models.TextField(verbose_name='Pesan')),
+                ('notification_type', models.CharField(choices=[('info', 'Information'), ('warning', 'Warning'), ('success', 'Success'), ('danger', 'Urgent')], default='info', max_length=20, verbose_name='Tipe')),
+                ('link', models.CharField(blank=True, max_length=200, null=True, verbose_name='Link URL')),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Waktu Dibuat')),
+                ('created_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='broadcasts_created', to=settings.AUTH_USER_MODEL, verbose_name='Dibuat Oleh')),
+            ],
+            options={
+                'verbose_name': 'Pengumuman',
+                'verbose_name_plural': 'Pengumuman',
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='BroadcastRead',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('read_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('broadcast', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='reads', to='coops.broadcastnotification')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='broadcast_reads', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Pengumuman Dibaca',
+                'verbose_name_plural': 'Pengumuman Dibaca',
+                'constraints': [models.UniqueConstraint(fields=('broadcast', 'user'), name='unique_broadcast_read')],
+            },
+        ),
+    ]
@@ -1,5 +1,5 @@
 from django.db import models
-from accounts.models import User
+from accounts.models import User, Mahasiswa
 from django.utils import timezone
 
 class KonfirmasiMagang(models.Model):
@@ -54,6 +54,15 @@ class KonfirmasiMagang(models.Model):
     def __str__(self):
         return f"{self.mahasiswa.username} - {self.nama_perusahaan}"
 
+    def save(self, *args, **kwargs):
+        from .utils.certificate_cache import invalidate_certificate_cache
+
+        adding = self._state.adding
+        super().save(*args, **kwargs)
+        # Data magang tercetak di sertifikat: buang PDF yang sudah dirender
+        if not adding:
+            invalidate_certificate_cache([self.id])
+
     def get_status_badge_class(self):
         """Return Bootstrap badge class based on status"""
         status_classes = {
@@ -253,19 +262,46 @@ class SertifikatCoop(models.Model):
     
     def generate_nomor_sertifikat(self):
         """Generate unique certificate number"""
-        from datetime import datetime
-        year = datetime.now().year
-        # Count existing certificates this year
-        count = SertifikatCoop.objects.filter(
-            created_at__year=year
-        ).count() + 1
-        
-        return f"COOP/{year}/{count:04d}/UTS"
+        from .utils.certificate_numbers import allocate_nomor_sertifikat
+        return allocate_nomor_sertifikat()[0]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Nomor saat dimuat: jika diubah (mis. di admin), cache verifikasi nomor lama juga dihapus
+        instance._loaded_nomor_sertifikat = instance.__dict__.get('nomor_sertifikat')
+        return instance
 
     def save(self, *args, **kwargs):
+        from .utils.certificate_cache import invalidate_certificate_cache
+        from .utils.certificate_verification import invalidate_verification
+
         if not self.nomor_sertifikat:
             self.nomor_sertifikat = self.generate_nomor_sertifikat()
+        adding = self._state.adding
         super().save(*args, **kwargs)
+        if not adding:
+            invalidate_certificate_cache([self.konfirmasi_id])
+        # Juga saat ditambahkan: nomor ini mungkin sudah di-cache sebagai "tidak ditemukan"
+        invalidate_verification({self.nomor_sertifikat, getattr(self, '_loaded_nomor_sertifikat', None)})
+        self._loaded_nomor_sertifikat = self.nomor_sertifikat
+
+    def delete(self, *args, **kwargs):
+        from .utils.certificate_cache import invalidate_certificate_cache
+        from .utils.certificate_verification import invalidate_verification
+
+        invalidate_certificate_cache([self.konfirmasi_id])
+        invalidate_verification([self.nomor_sertifikat])
+        return super().delete(*args, **kwargs)
+
+
+class NomorSertifikatCounter(models.Model):
+    """Nomor sertifikat terakhir yang sudah dipakai per tahun (lihat utils.certificate_numbers)"""
+    year = models.PositiveIntegerField(unique=True)
+    last_number = models.PositiveIntegerField(default=0)
+
+    def __str__(self):
+        return f"Nomor sertifikat {self.year}: {self.last_number}"
 
 
 class WeeklyReport(models.Model):
@@ -415,6 +451,149 @@ class Notification(models.Model):
         ordering = ['-created_at']
         verbose_name = "Notifikasi"
         verbose_name_plural = "Notifikasi"
+        indexes = [
+            # Riwayat per user (keyset pagination atas created_at, id)
+            models.Index(fields=['user', '-created_at', '-id'], name='notification_user_history'),
+            # Filter is_read (riwayat belum dibaca dan hitungan unread)
+            models.Index(fields=['user', 'is_read', '-created_at', '-id'], name='notification_user_unread'),
+        ]
 
     def __str__(self):
         return f"{self.title} - {self.user.username}"
+
+    def save(self, *args, **kwargs):
+        from .utils.notifications import notifications_created, invalidate_notification_cache
+
+        adding = self._state.adding
+        super().save(*args, **kwargs)
+        # Jaga counter unread di cache tetap sinkron dan kirim ke stream yang terbuka
+        if adding:
+            notifications_created([self])
+        else:
+            invalidate_notification_cache(self.user_id)
+
+    def delete(self, *args, **kwargs):
+        from .utils.notifications import invalidate_notification_cache
+
+        invalidate_notification_cache(self.user_id)
+        return super().delete(*args, **kwargs)
+
+
+class BroadcastNotification(models.Model):
+    """
+    Pengumuman untuk sekelompok user, disimpan sekali.
+
+    Target kosong berarti semua; misalnya role='mahasiswa' dan angkatan=2023
+    menjangkau seluruh mahasiswa angkatan 2023 tanpa satu baris per mahasiswa.
+    Status baca per user disimpan di BroadcastRead.
+    """
+    target_role = models.CharField(max_length=20, choices=User.ROLE_CHOICES, blank=True, null=True, verbose_name="Target Role")
+    target_jurusan = models.CharField(max_length=10, choices=Mahasiswa.JURUSAN_CHOICES, blank=True, null=True, verbose_name="Target Jurusan")
+    target_angkatan = models.IntegerField(blank=True, null=True, verbose_name="Target Angkatan")
+    title = models.CharField(max_length=200, verbose_name="Judul")
+    message = models.TextField(verbose_name="Pesan")
+    notification_type = models.CharField(max_length=20, choices=Notification.NOTIFICATION_TYPES, default='info', verbose_name="Tipe")
+    link = models.CharField(max_length=200, blank=True, null=True, verbose_name="Link URL")
+    created_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='broadcasts_created', verbose_name="Dibuat Oleh")
+    created_at = models.DateTimeField(default=timezone.now, verbose_name="Waktu Dibuat")
+
+    class Meta:
+        ordering = ['-created_at']
+        verbose_name = "Pengumuman"
+        verbose_name_plural = "Pengumuman"
+
+    def __str__(self):
+        return f"{self.title} - {self.get_target_display()}"
+
+    def get_target_display(self):
+        parts = [
+            self.get_target_role_display() if self.target_role else None,
+            self.target_jurusan,
+            str(self.target_angkatan) if self.target_angkatan else None,
+        ]
+        return ' / '.join(part for part in parts if part) or 'Semua'
+
+    def save(self, *args, **kwargs):
+        from .utils.notifications import broadcast_created, broadcasts_changed
+
+        adding = self._state.adding
+        super().save(*args, **kwargs)
+        if adding:
+            broadcast_created(self)
+        else:
+            broadcasts_changed()
+
+    def delete(self, *args, **kwargs):
+        from .utils.notifications import broadcasts_changed
+
+        broadcasts_changed()
+        return super().delete(*args, **kwargs)
+
+
+class BroadcastRead(models.Model):
+    """Penanda bahwa user sudah membaca sebuah pengumuman"""
+    broadcast = models.ForeignKey(BroadcastNotification, on_delete=models.CASCADE, related_name='reads')
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='broadcast_reads')
+    read_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['broadcast', 'user'], name='unique_broadcast_read'),
+        ]
+        verbose_name = "Pengumuman Dibaca"
+        verbose_name_plural = "Pengumuman Dibaca"
+
+    def __str__(self):
+        return f"{self.user.username} - {self.broadcast.title}"
+
+
+class FileUpload(models.Model):
+    """
+    File yang di-upload ke Firebase oleh worker di belakang layar (lihat utils.uploads).
+
+    File disimpan dulu di spool lokal; setelah upload selesai URL-nya
+    ditulis ke field target (mis. KonfirmasiMagang.surat_penerimaan).
+    Upload langsung dari browser (signed URL) tidak punya spool_path dan
+    menunggu di status 'awaiting' sampai diverifikasi.
+    """
+    STATUS_CHOICES = (
+        ('pending', 'Menunggu'),
+        ('awaiting', 'Menunggu Upload Browser'),
+        ('uploading', 'Sedang Diupload'),
+        ('done', 'Selesai'),
+        ('failed', 'Gagal'),
+        ('cancelled', 'Dibatalkan'),
+    )
+
+    uploaded_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='file_uploads')
+    # Field yang diisi URL setelah upload: '<app_label>.<model>', primary key, nama field
+    target_model = models.CharField(max_length=100)
+    target_id = models.PositiveIntegerField()
+    target_field = models.CharField(max_length=50)
+
+    blob_path = models.CharField(max_length=500, verbose_name="Path di Firebase")
+    original_name = models.CharField(max_length=255)
+    content_type = models.CharField(max_length=100, blank=True)
+    size = models.PositiveBigIntegerField(default=0)
+    spool_path = models.CharField(max_length=500, blank=True)
+
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
+    attempts = models.PositiveSmallIntegerField(default=0)
+    last_error = models.TextField(blank=True)
+    url = models.URLField(max_length=500, blank=True)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    completed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', 'updated_at'], name='fileupload_status'),
+            models.Index(fields=['target_model', 'target_id', 'target_field'], name='fileupload_target'),
+        ]
+        verbose_name = "Upload File"
+        verbose_name_plural = "Upload File"
+
+    def __str__(self):
+        return f"{self.blob_path} ({self.get_status_display()})"
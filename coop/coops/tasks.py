@@ -0,0 +1,29 @@
+from celery import shared_task
+from .utils.retention import purge_notifications
+from .utils.uploads import (
+    expire_direct_uploads, get_upload_settings, process_upload, requeue_stale_uploads, retry_countdown
+)
+
+
+@shared_task
+def purge_notifications_task():
+    """Periodic notification retention (see NOTIFICATION_RETENTION and CELERY_BEAT_SCHEDULE)"""
+    return purge_notifications()
+
+
+# Hard time limit: requeue_stale_uploads mengandalkan tidak ada upload yang berjalan lebih lama dari ini
+@shared_task(bind=True, max_retries=None, time_limit=get_upload_settings()['UPLOAD_TIMEOUT'])
+def process_upload_task(self, upload_id):
+    """Upload one spooled file to Firebase; failed attempts are retried with exponential backoff (UPLOAD_QUEUE)"""
+    upload = process_upload(upload_id)
+    # Eager (tanpa broker): retry() akan langsung berjalan di request tanpa backoff.
+    # Baris dibiarkan 'pending' untuk requeue_stale_uploads (beat atau command requeue_uploads).
+    if upload.status == 'pending' and not self.request.is_eager:
+        raise self.retry(countdown=retry_countdown(upload.attempts))
+    return upload.status
+
+
+@shared_task
+def requeue_stale_uploads_task():
+    """Periodic safety net for uploads whose task was lost and browser uploads never completed"""
+    return {'requeued': requeue_stale_uploads(), 'direct_completed': expire_direct_uploads()}
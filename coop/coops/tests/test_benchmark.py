@@ -0,0 +1,39 @@
+import io
+import json
+import os
+import shutil
+import tempfile
+from django.core.management import call_command
+from django.test import TestCase
+from accounts.models import Kaprodi
+from coops.utils.benchmark import MUTATING_URL_NAMES, iter_url_patterns
+from .utils import Cohort
+
+
+class BenchmarkViewsTests(TestCase):
+    """benchmark_views on an existing database"""
+
+    def test_role_without_user_is_skipped(self):
+        Cohort().grow_to(10)
+        Kaprodi.objects.all().delete()
+
+        output_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, output_dir, ignore_errors=True)
+        output = os.path.join(output_dir, 'benchmark.json')
+        stdout = io.StringIO()
+        call_command(
+            'benchmark_views', '--current-db', '--only', 'notification_history', '--repeat', '1',
+            '--output', output, stdout=stdout
+        )
+
+        self.assertIn('Role kaprodi dilewati', stdout.getvalue())
+        with open(output) as f:
+            results = json.load(f)
+        self.assertEqual(results['meta']['skipped_roles'], ['kaprodi'])
+        self.assertEqual(
+            sorted(results['results']),
+            [f'coops:notification_history [{role}]' for role in ('admin', 'mahasiswa', 'supervisor')]
+        )
+
+    def test_mutating_endpoints_not_requested(self):
+        self.assertFalse(MUTATING_URL_NAMES & {view_name for view_name, _ in iter_url_patterns()})
@@ -0,0 +1,343 @@
+import datetime
+import io
+import os
+import shutil
+import tempfile
+import zipfile
+from unittest import mock
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from reportlab.pdfgen import canvas
+from accounts.models import User, Mahasiswa
+from coops.certificate_generator import CertificateGenerator
+from coops.models import KonfirmasiMagang, NomorSertifikatCounter, SertifikatCoop
+from coops.utils.benchmark import sample_certificate
+from coops.utils.certificate_batch import certificate_filename
+from coops.utils.certificate_cache import get_cached_certificate, get_certificate_storage
+from coops.utils.certificate_numbers import issue_certificates, reserve_certificate_numbers
+
+
+class CertificateTestMixin:
+    """Temporary certificate storage and one completed internship with a certificate"""
+
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.cache_dir, ignore_errors=True)
+        storages = {**settings.STORAGES, 'certificates': {
+            'BACKEND': 'django.core.files.storage.FileSystemStorage',
+            'OPTIONS': {'location': self.cache_dir},
+        }}
+        storage_override = override_settings(STORAGES=storages)
+        storage_override.enable()
+        self.addCleanup(storage_override.disable)
+
+        self.user = User.objects.create_user(
+            'mhs', 'mhs@example.com', 'password', role='mahasiswa', first_name='Budi', last_name='Santoso'
+        )
+        Mahasiswa.objects.create(
+            email=self.user, nama='Budi Santoso', nim='NIM001', prodi='Business', angkatan=2022,
+            jenis_kelamin='L', no_hp='0800', jurusan='BBA'
+        )
+        self.konfirmasi = KonfirmasiMagang.objects.create(
+            mahasiswa=self.user, status='completed', posisi='Intern', nama_perusahaan='PT Maju',
+            alamat_perusahaan='Jakarta', bidang_usaha='Teknologi', nama_supervisor='Supervisor',
+            email_supervisor='supervisor@example.com', surat_penerimaan='https://example.com/surat.pdf',
+            periode_awal=datetime.date(2025, 1, 1), periode_akhir=datetime.date(2025, 6, 30),
+        )
+        self.sertifikat = SertifikatCoop.objects.create(konfirmasi=self.konfirmasi, nilai_akhir='A', status='issued')
+
+
+class CertificateRenderTests(SimpleTestCase):
+    """Static layer and vector QR code"""
+
+    def setUp(self):
+        self.generator = CertificateGenerator(sample_certificate())
+
+    def test_qr_code_drawn_as_vector(self):
+        c = canvas.Canvas(io.BytesIO())
+        start = len(c._code)
+        self.generator.draw_qr_code(c, 0, 0, 100)
+        ops = ' '.join(c._code[start:]).split()
+
+        matrix = self.generator.generate_qr_matrix()
+        drawn = [[False] * len(matrix) for _ in matrix]
+        for i, op in enumerate(ops):
+            if op == 're':
+                x, y, width, _ = map(int, ops[i - 4:i])
+                for col in range(x, x + width):
+                    drawn[len(matrix) - y - 1][col] = True
+        self.assertEqual(drawn, matrix)
+
+        pdf = self.generator.generate_pdf().getvalue()
+        self.assertTrue(pdf.startswith(b'%PDF'))
+        self.assertNotIn(b'/XObject', pdf)
+
+    def test_static_layer_falls_back_on_font_mismatch(self):
+        layer = self.generator.get_static_layer()
+        self.assertIs(layer, CertificateGenerator(sample_certificate()).get_static_layer())
+        self.assertTrue(layer.place(canvas.Canvas(io.BytesIO())))
+
+        c = canvas.Canvas(io.BytesIO())
+        c.setFont('Courier', 10)
+        self.assertFalse(layer.place(c))
+
+
+class CertificateDownloadCacheTests(CertificateTestMixin, TestCase):
+    """Downloads are served from the rendered-PDF cache with validators"""
+
+    def setUp(self):
+        super().setUp()
+        self.client.force_login(self.user)
+        self.url = reverse('coops:download_sertifikat', args=[self.sertifikat.id])
+
+    def download(self, **headers):
+        with mock.patch.object(CertificateGenerator, 'generate_pdf', autospec=True,
+                               side_effect=CertificateGenerator.generate_pdf) as render:
+            response = self.client.get(self.url, headers=headers)
+        return response, render.call_count
+
+    def test_rendered_once_and_conditional_get(self):
+        response, renders = self.download()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(renders, 1)
+        self.assertTrue(b''.join(response.streaming_content).startswith(b'%PDF'))
+        etag = response['ETag']
+
+        response, renders = self.download()
+        self.assertEqual(renders, 0)
+        self.assertEqual(response['ETag'], etag)
+
+        last_modified = response['Last-Modified']
+
+        response, renders = self.download(**{'If-None-Match': etag})
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+
+        response, _ = self.download(**{'If-Modified-Since': last_modified})
+        self.assertEqual(response.status_code, 304)
+
+    def test_field_changes_invalidate(self):
+        etag = self.download()[0]['ETag']
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.sertifikat.nilai_akhir = 'B'
+            self.sertifikat.save()
+        # File lama sudah dibuang; ETag baru karena isi berubah
+        self.assertEqual(get_certificate_storage().listdir(str(self.konfirmasi.id))[1], [])
+        response, renders = self.download(**{'If-None-Match': etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(renders, 1)
+        self.assertNotEqual(response['ETag'], etag)
+
+        etag = response['ETag']
+        with self.captureOnCommitCallbacks(execute=True):
+            self.konfirmasi.nama_perusahaan = 'PT Jaya'
+            self.konfirmasi.save()
+        self.assertNotEqual(self.download()[0]['ETag'], etag)
+
+    def test_unrelated_save_keeps_current_pdf(self):
+        etag = self.download()[0]['ETag']
+        with self.captureOnCommitCallbacks(execute=True):
+            self.konfirmasi.save()
+        response, renders = self.download()
+        self.assertEqual((response['ETag'], renders), (etag, 0))
+
+    def test_file_removed_during_download_is_rendered_again(self):
+        from coops.utils import certificate_cache
+
+        get_cached = certificate_cache.get_cached_certificate
+
+        def removed_after_check(sertifikat):
+            # Invalidation di request lain menghapus file di antara exists() dan open()
+            name, fingerprint = get_cached(sertifikat)
+            if removed_after_check.first:
+                removed_after_check.first = False
+                get_certificate_storage().delete(name)
+            return name, fingerprint
+        removed_after_check.first = True
+
+        with mock.patch.object(certificate_cache, 'get_cached_certificate', side_effect=removed_after_check):
+            response, renders = self.download()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(renders, 2)
+        self.assertTrue(b''.join(response.streaming_content).startswith(b'%PDF'))
+
+    def test_other_mahasiswa_denied(self):
+        other = User.objects.create_user('lain', 'lain@example.com', 'password', role='mahasiswa')
+        self.client.force_login(other)
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 302)
+
+
+class CertificateBatchTests(CertificateTestMixin, TestCase):
+    """Batch export renders every selected certificate into one ZIP"""
+
+    def setUp(self):
+        super().setUp()
+        for i in range(2):
+            user = User.objects.create_user(f'mhs{i}', f'mhs{i}@example.com', 'password', role='mahasiswa')
+            konfirmasi = KonfirmasiMagang.objects.create(
+                mahasiswa=user, status='completed', posisi='Intern', nama_perusahaan=f'PT {i}',
+                alamat_perusahaan='Jakarta', bidang_usaha='Teknologi', nama_supervisor='Supervisor',
+                email_supervisor='supervisor@example.com', surat_penerimaan='https://example.com/surat.pdf',
+                periode_awal=datetime.date(2025, 1, 1), periode_akhir=datetime.date(2025, 6, 30),
+            )
+            SertifikatCoop.objects.create(konfirmasi=konfirmasi, nilai_akhir='B', status='issued')
+        self.expected = sorted(certificate_filename(s) for s in SertifikatCoop.objects.all())
+
+    def test_command_with_worker_processes(self):
+        output = os.path.join(self.cache_dir, 'out.zip')
+        call_command('export_certificates', output, '--workers', '2', stdout=io.StringIO())
+        with zipfile.ZipFile(output) as archive:
+            self.assertEqual(sorted(archive.namelist()), self.expected)
+            self.assertIsNone(archive.testzip())
+            self.assertTrue(all(archive.read(name).startswith(b'%PDF') for name in archive.namelist()))
+        # PDF yang dirender ikut disimpan di cache
+        self.assertEqual(len(os.listdir(self.cache_dir)), 4)
+
+    def test_admin_action_streams_zip(self):
+        admin_user = User.objects.create_superuser('admin', 'admin@example.com', 'password', role='admin')
+        self.client.force_login(admin_user)
+        with mock.patch('coops.utils.certificate_batch.os.cpu_count', return_value=1):
+            response = self.client.post(reverse('admin:coops_sertifikatcoop_changelist'), {
+                'action': 'download_certificates_zip',
+                '_selected_action': list(SertifikatCoop.objects.values_list('id', flat=True)),
+            })
+            self.assertTrue(response.streaming)
+            chunks = list(response.streaming_content)
+        self.assertGreater(len(chunks), 3)  # satu potongan per sertifikat
+        with zipfile.ZipFile(io.BytesIO(b''.join(chunks))) as archive:
+            self.assertEqual(sorted(archive.namelist()), self.expected)
+
+
+class CertificateNumberTests(CertificateTestMixin, TestCase):
+    """Certificate numbers come from the per-year counter"""
+
+    def create_konfirmasi(self, username, status='completed'):
+        user = User.objects.create_user(username, f'{username}@example.com', 'password', role='mahasiswa')
+        return KonfirmasiMagang.objects.create(
+            mahasiswa=user, status=status, posisi='Intern', nama_perusahaan='PT Maju',
+            alamat_perusahaan='Jakarta', bidang_usaha='Teknologi', nama_supervisor='Supervisor',
+            email_supervisor='supervisor@example.com', surat_penerimaan='https://example.com/surat.pdf',
+        )
+
+    def test_counter_seeded_from_existing_numbers(self):
+        year = datetime.date.today().year
+        self.assertEqual(self.sertifikat.nomor_sertifikat, f'COOP/{year}/0001/UTS')
+        NomorSertifikatCounter.objects.all().delete()
+        SertifikatCoop.objects.create(
+            konfirmasi=self.create_konfirmasi('legacy'), nilai_akhir='A', nomor_sertifikat=f'COOP/{year}/0041/UTS'
+        )
+
+        sertifikat = SertifikatCoop.objects.create(konfirmasi=self.create_konfirmasi('new'), nilai_akhir='A')
+        self.assertEqual(sertifikat.nomor_sertifikat, f'COOP/{year}/0042/UTS')
+        self.assertEqual(NomorSertifikatCounter.objects.get(year=year).last_number, 42)
+
+    def test_blocks_are_disjoint(self):
+        first = reserve_certificate_numbers(10, year=2030)
+        second = reserve_certificate_numbers(5, year=2030)
+        self.assertEqual(list(first), list(range(1, 11)))
+        self.assertEqual(list(second), list(range(11, 16)))
+        self.assertEqual(NomorSertifikatCounter.objects.get(year=2030).last_number, 15)
+
+    def test_issue_certificates_for_completed_without_certificate(self):
+        for i in range(3):
+            self.create_konfirmasi(f'done{i}')
+        self.create_konfirmasi('ongoing', status='accepted')
+
+        self.assertEqual(issue_certificates(KonfirmasiMagang.objects.all(), nilai_akhir='B'), 3)
+        self.assertEqual(issue_certificates(KonfirmasiMagang.objects.all()), 0)
+        numbers = sorted(SertifikatCoop.objects.values_list('nomor_sertifikat', flat=True))
+        self.assertEqual([n.split('/')[2] for n in numbers], ['0001', '0002', '0003', '0004'])
+
+
+class CertificateVerificationTests(CertificateTestMixin, TestCase):
+    """Public /verify/<nomor>/ endpoint behind the certificate QR code"""
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.url = reverse('verify_sertifikat', args=[self.sertifikat.nomor_sertifikat])
+
+    def test_qr_code_points_to_endpoint(self):
+        self.assertTrue(CertificateGenerator(self.sertifikat).verification_url().endswith(self.url))
+
+    def test_cached_json_and_html(self):
+        response = self.client.get(self.url, {'format': 'json'})
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.json()['valid'])
+        self.assertEqual(response.json()['nama'], 'Budi Santoso')
+        self.assertIn('public', response['Cache-Control'])
+        self.assertIn('max-age=60', response['Cache-Control'])
+
+        with self.assertNumQueries(0):
+            response = self.client.get(self.url)
+        self.assertContains(response, 'PT Maju')
+        self.assertEqual(self.client.get(self.url, headers={'If-None-Match': response['ETag']}).status_code, 304)
+
+    def test_not_found_is_cached_until_issued(self):
+        url = reverse('verify_sertifikat', args=['COOP/2030/0001/UTS'])
+        self.assertEqual(self.client.get(url, {'format': 'json'}).status_code, 404)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get(url).status_code, 404)
+
+        konfirmasi = KonfirmasiMagang.objects.create(
+            mahasiswa=User.objects.create_user('other', 'other@example.com', 'password', role='mahasiswa'),
+            status='completed', posisi='Intern', nama_perusahaan='PT Lain', alamat_perusahaan='Jakarta',
+            bidang_usaha='Teknologi', nama_supervisor='Supervisor', email_supervisor='supervisor@example.com',
+            surat_penerimaan='https://example.com/surat.pdf',
+        )
+        with self.captureOnCommitCallbacks(execute=True):
+            SertifikatCoop.objects.create(
+                konfirmasi=konfirmasi, nilai_akhir='A', status='issued', nomor_sertifikat='COOP/2030/0001/UTS'
+            )
+        self.assertTrue(self.client.get(url, {'format': 'json'}).json()['valid'])
+
+    def test_revoke_invalidates_immediately(self):
+        self.assertTrue(self.client.get(self.url, {'format': 'json'}).json()['valid'])
+
+        admin_user = User.objects.create_superuser('admin', 'admin@example.com', 'password', role='admin')
+        self.client.force_login(admin_user)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(reverse('admin:coops_sertifikatcoop_changelist'), {
+                'action': 'revoke_certificates', '_selected_action': [self.sertifikat.id],
+            })
+        self.client.logout()
+
+        data = self.client.get(self.url, {'format': 'json'}).json()
+        self.assertFalse(data['valid'])
+        self.assertEqual(data['status'], 'revoked')
+        self.assertContains(self.client.get(self.url), 'dicabut')
+
+    def test_revoke_from_status_filtered_changelist(self):
+        self.assertTrue(self.client.get(self.url, {'format': 'json'}).json()['valid'])
+        name, _ = get_cached_certificate(self.sertifikat)
+
+        admin_user = User.objects.create_superuser('admin', 'admin@example.com', 'password', role='admin')
+        self.client.force_login(admin_user)
+        # Setelah update() baris tidak lagi cocok dengan filter changelist
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(reverse('admin:coops_sertifikatcoop_changelist') + '?status__exact=issued', {
+                'action': 'revoke_certificates', '_selected_action': [self.sertifikat.id],
+            })
+        self.client.logout()
+
+        self.assertEqual(SertifikatCoop.objects.get(id=self.sertifikat.id).status, 'revoked')
+        self.assertFalse(self.client.get(self.url, {'format': 'json'}).json()['valid'])
+        self.assertFalse(get_certificate_storage().exists(name))
+
+    def test_renumbering_invalidates_old_number(self):
+        self.assertTrue(self.client.get(self.url, {'format': 'json'}).json()['valid'])
+
+        sertifikat = SertifikatCoop.objects.get(id=self.sertifikat.id)
+        sertifikat.nomor_sertifikat = 'COOP/2030/0099/UTS'
+        with self.captureOnCommitCallbacks(execute=True):
+            sertifikat.save()
+
+        self.assertEqual(self.client.get(self.url, {'format': 'json'}).status_code, 404)
+        new_url = reverse('verify_sertifikat', args=['COOP/2030/0099/UTS'])
+        self.assertTrue(self.client.get(new_url, {'format': 'json'}).json()['valid'])
@@ -0,0 +1,209 @@
+import threading
+import time
+from unittest import mock
+import firebase_admin
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from accounts.models import User
+from coop.firebase import client, config, signed_urls, storage_helper
+from coops.models import KonfirmasiMagang
+
+
+def generate_private_key():
+    key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    return key.private_bytes(
+        serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption()
+    ).decode()
+
+
+class FirebaseTestMixin:
+    """Firebase settings with a generated service account key; no request leaves the process"""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.settings_override = override_settings(
+            FIREBASE_PRIVATE_KEY=generate_private_key(),
+            FIREBASE_PRIVATE_KEY_ID='test-key',
+            FIREBASE_CLIENT_EMAIL='storage@coop-stem.iam.gserviceaccount.com',
+            FIREBASE_CLIENT_ID='1',
+            FIREBASE_STORAGE_BUCKET='coop-stem-test',
+            FIREBASE_HTTP_POOL_SIZE=4,
+        )
+        cls.settings_override.enable()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.settings_override.disable()
+        super().tearDownClass()
+
+    def setUp(self):
+        self.addCleanup(self.reset)
+        self.reset()
+
+    def reset(self):
+        if client._client is not None:
+            client._client.close()
+        client.reset_firebase_client()
+        for app in list(firebase_admin._apps.values()):
+            firebase_admin.delete_app(app)
+        client.metrics.reset()
+        signed_urls.clear_signed_url_cache()
+        cache.clear()
+
+
+class FirebaseClientTests(FirebaseTestMixin, SimpleTestCase):
+    """One lazily created Firebase client per process, shared by both storage modules"""
+
+    def test_created_once_across_threads(self):
+        clients = []
+        threads = [threading.Thread(target=lambda: clients.append(client.get_firebase_client())) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len({id(c) for c in clients}), 1)
+        self.assertEqual(client.get_firebase_metrics()['init']['count'], 1)
+
+        shared = clients[0]
+        self.assertIs(shared.storage_client._http, shared.session)
+        self.assertEqual(shared.session.get_adapter('https://storage.googleapis.com')._pool_maxsize, 4)
+        self.assertEqual(shared.bucket.name, 'coop-stem-test')
+
+    def test_modules_share_bucket_and_record_timings(self):
+        bucket = client.get_firebase_client().bucket
+        self.assertIs(config.get_storage_bucket(), bucket)
+        self.assertIs(storage_helper.get_storage_bucket(), bucket)
+
+        file_url = 'https://storage.googleapis.com/coop-stem-test/laporan/a.pdf'
+        signed = config.FirebaseStorage.get_signed_url(file_url)
+        self.assertIn('/laporan/a.pdf?', signed)
+        signed = storage_helper.get_signed_url(file_url)
+        self.assertIn('X-Goog-Signature=', signed)
+
+        stats = client.get_firebase_metrics()
+        self.assertEqual(stats['init']['count'], 1)
+        self.assertEqual(stats['sign']['count'], 2)
+        self.assertEqual(stats['sign']['errors'], 0)
+
+    def test_upload_url_signs_type_and_size(self):
+        url, headers = storage_helper.generate_upload_url('cvs/cv_NIM001.pdf', 'application/pdf', 2048)
+        self.assertIn('/coop-stem-test/cvs/cv_NIM001.pdf?', url)
+        self.assertIn('X-Goog-SignedHeaders=content-type%3Bhost%3Bx-goog-content-length-range', url)
+        self.assertIn('X-Goog-Expires=900', url)
+        self.assertEqual(headers, {'Content-Type': 'application/pdf', 'x-goog-content-length-range': '2048,2048'})
+
+    def test_reset_creates_new_client(self):
+        first = client.get_firebase_client()
+        client.reset_firebase_client()
+        self.assertIsNot(client.get_firebase_client(), first)
+
+
+    def test_failed_initialization_is_remembered(self):
+        file_url = 'https://storage.googleapis.com/coop-stem-test/cvs/a.pdf'
+        with mock.patch.object(client, 'FirebaseClient', side_effect=ValueError('bad key')) as firebase_client, \
+                self.assertLogs('coop.firebase.client', 'ERROR'):
+            self.assertEqual(storage_helper.get_signed_urls([file_url]), {file_url: file_url})
+            self.assertEqual(config.FirebaseStorage.get_signed_url(file_url), file_url)
+        firebase_client.assert_called_once()
+
+        # Percobaan berikutnya setelah INIT_RETRY_SECONDS
+        with mock.patch('coop.firebase.client.time.monotonic', return_value=time.monotonic() + client.INIT_RETRY_SECONDS):
+            self.assertIn('X-Goog-Signature', storage_helper.get_signed_url(file_url))
+
+    def test_unconfigured_firebase_skips_signing(self):
+        file_url = 'https://storage.googleapis.com/coop-stem-test/cvs/a.pdf'
+        with override_settings(FIREBASE_PRIVATE_KEY=''), mock.patch.object(client, 'FirebaseClient') as firebase_client:
+            self.assertEqual(storage_helper.get_signed_urls([file_url]), {file_url: file_url})
+        firebase_client.assert_not_called()
+
+class SignedURLCacheTests(FirebaseTestMixin, SimpleTestCase):
+    """Signed URLs are reused from the process LRU or the shared cache until shortly before expiry"""
+
+    file_url = 'https://storage.googleapis.com/coop-stem-test/laporan/a.pdf'
+
+    def signs(self):
+        return client.get_firebase_metrics().get('sign', {}).get('count', 0)
+
+    def test_reused_from_local_then_shared_cache(self):
+        first = storage_helper.get_signed_url(self.file_url)
+        self.assertEqual(storage_helper.get_signed_url(self.file_url), first)
+        self.assertEqual(self.signs(), 1)
+
+        # Proses lain: LRU kosong, cache bersama masih berisi URL
+        signed_urls.clear_signed_url_cache()
+        self.assertEqual(storage_helper.get_signed_url(self.file_url), first)
+        self.assertEqual(self.signs(), 1)
+
+        # Masa berlaku berbeda tidak memakai URL yang sama
+        self.assertNotEqual(config.FirebaseStorage.get_signed_url(self.file_url), first)
+        self.assertEqual(self.signs(), 2)
+
+    def test_refreshed_before_expiry(self):
+        now = time.time()
+        first = storage_helper.get_signed_url(self.file_url, expiration_hours=2)
+        # SAFETY_MARGIN 1 jam: URL 2 jam dipakai ulang selama 1 jam
+        with mock.patch('coop.firebase.signed_urls.time.time', return_value=now + 59 * 60):
+            self.assertEqual(storage_helper.get_signed_url(self.file_url, expiration_hours=2), first)
+        self.assertEqual(self.signs(), 1)
+        with mock.patch('coop.firebase.signed_urls.time.time', return_value=now + 61 * 60):
+            storage_helper.get_signed_url(self.file_url, expiration_hours=2)
+        self.assertEqual(self.signs(), 2)
+
+        # URL berumur pendek: margin paling banyak separuh masa berlaku
+        self.assertEqual(signed_urls.reusable_seconds(10 * 60), 5 * 60)
+
+    def test_batch_signs_only_missing(self):
+        cached = storage_helper.get_signed_url(self.file_url)
+        file_urls = [
+            self.file_url,
+            'https://storage.googleapis.com/coop-stem-test/cvs/cv_1.pdf',
+            'https://storage.googleapis.com/coop-stem-test/cvs/cv_2.pdf',
+            'https://storage.googleapis.com/coop-stem-test/cvs/cv_2.pdf',
+            None,
+        ]
+        with mock.patch.object(cache, 'get_many', wraps=cache.get_many) as get_many, \
+                mock.patch.object(cache, 'set_many', wraps=cache.set_many) as set_many:
+            signed = storage_helper.get_signed_urls(file_urls)
+        self.assertEqual((get_many.call_count, set_many.call_count), (1, 1))
+
+        self.assertEqual(set(signed), set(file_urls[:3]))
+        self.assertEqual(signed[self.file_url], cached)
+        self.assertIn('/cvs/cv_2.pdf?', signed[file_urls[2]])
+        self.assertEqual(self.signs(), 3)
+
+        self.assertEqual(config.FirebaseStorage.get_signed_urls(file_urls[1:3], expiration_minutes=24 * 60), {
+            file_urls[1]: signed[file_urls[1]], file_urls[2]: signed[file_urls[2]],
+        })
+        self.assertEqual(self.signs(), 3)
+
+    @override_settings(FIREBASE_SIGNED_URL_CACHE={'MAX_ENTRIES': 2})
+    def test_local_cache_bounded(self):
+        storage_helper.get_signed_urls([f'https://storage.googleapis.com/coop-stem-test/cvs/{i}.pdf' for i in range(5)])
+        self.assertEqual(len(signed_urls._local), 2)
+
+
+class SignedDocumentsAdminTests(FirebaseTestMixin, TestCase):
+    """The changelist signs all document links of a page at once"""
+
+    def test_changelist_signs_page_in_one_call(self):
+        admin_user = User.objects.create_superuser('admin', 'admin@example.com', 'password', role='admin')
+        for i in range(3):
+            KonfirmasiMagang.objects.create(
+                mahasiswa=User.objects.create_user(f'mhs{i}', f'mhs{i}@example.com', 'password', role='mahasiswa'),
+                posisi='Intern', nama_perusahaan='PT Maju', alamat_perusahaan='Jakarta', bidang_usaha='Teknologi',
+                nama_supervisor='Supervisor', email_supervisor='supervisor@example.com',
+                surat_penerimaan=f'https://storage.googleapis.com/coop-stem-test/surat_penerimaan/surat_{i}.pdf',
+            )
+        self.client.force_login(admin_user)
+
+        with mock.patch('coop.firebase.storage_helper.get_signed_urls', wraps=storage_helper.get_signed_urls) as get_signed_urls:
+            response = self.client.get(reverse('admin:coops_konfirmasimagang_changelist'))
+        self.assertEqual(response.status_code, 200)
+        get_signed_urls.assert_called_once()
+        self.assertEqual(client.get_firebase_metrics()['sign']['count'], 3)
+        self.assertContains(response, 'surat_penerimaan/surat_2.pdf?X-Goog-Algorithm=GOOG4-RSA-SHA256')
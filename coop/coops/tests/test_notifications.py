@@ -0,0 +1,304 @@
+import asyncio
+import datetime
+from unittest import mock
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from accounts.models import User, Mahasiswa
+from coops.models import Notification, BroadcastNotification, BroadcastRead
+from coops.utils.notification_channel import publish_notification_event
+from coops.utils.notifications import get_unread_count, notify, unread_cache_key
+
+
+class UnreadCounterTests(TestCase):
+    """The cached unread counter follows creates and mark-as-read updates"""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user('mhs', 'mhs@example.com', 'password', role='mahasiswa')
+        self.client.force_login(self.user)
+
+    def notify(self, **kwargs):
+        with self.captureOnCommitCallbacks(execute=True):
+            return Notification.objects.create(user=self.user, title='Info', message='-', **kwargs)
+
+    def test_poll_is_served_from_cache(self):
+        self.notify()
+        self.client.get(reverse('coops:get_notifications'))
+
+        with self.assertNumQueries(2):  # session + user only
+            data = self.client.get(reverse('coops:get_notifications')).json()
+        self.assertEqual(data['unread_count'], 1)
+        self.assertEqual(len(data['notifications']), 1)
+
+    def test_create_increments_cached_counter(self):
+        self.assertEqual(get_unread_count(self.user.id), 0)
+        self.notify()
+        self.notify(is_read=True)
+        self.assertEqual(cache.get(unread_cache_key(self.user.id)), 1)
+
+    def test_mark_read_decrements_once(self):
+        notification = self.notify()
+        self.assertEqual(get_unread_count(self.user.id), 1)
+
+        url = reverse('coops:mark_notification_read', args=[notification.id])
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.get(url)
+            self.client.get(url)
+        self.assertEqual(get_unread_count(self.user.id), 0)
+
+    def test_mark_all_read(self):
+        for _ in range(3):
+            self.notify()
+        self.assertEqual(get_unread_count(self.user.id), 3)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(reverse('coops:mark_all_notifications_read'))
+        self.assertEqual(get_unread_count(self.user.id), 0)
+        self.assertFalse(Notification.objects.filter(user=self.user, is_read=False).exists())
+
+
+    def test_pushed_unread_event_carries_count_or_delta(self):
+        # Stream memperbarui badge dari payload; client hanya memuat ulang jika keduanya kosong
+        with mock.patch('coops.utils.notifications.publish_notification_event') as publish:
+            self.notify()
+        self.assertEqual(publish.call_args_list[0].args, (self.user.id, 'unread', {'unread_count': None, 'delta': 1}))
+        self.assertEqual(publish.call_args_list[1].args[1:], ('notification', mock.ANY))
+
+        get_unread_count(self.user.id)
+        with mock.patch('coops.utils.notifications.publish_notification_event') as publish:
+            self.notify()
+        self.assertEqual(publish.call_args_list[0].args, (self.user.id, 'unread', {'unread_count': 2, 'delta': 1}))
+
+class NotificationStreamTests(TestCase):
+    """The SSE stream replays missed notifications and pushes new ones"""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user('mhs', 'mhs@example.com', 'password', role='mahasiswa')
+
+    async def read_events(self, stream, count):
+        events = []
+        while len(events) < count:
+            chunk = (await asyncio.wait_for(anext(stream), timeout=5)).decode()
+            if 'event:' in chunk:
+                events.append(chunk)
+        return events
+
+    async def test_replay_and_push(self):
+        first = await Notification.objects.acreate(user=self.user, title='Satu', message='-')
+        second = await Notification.objects.acreate(user=self.user, title='Dua', message='-')
+        await self.async_client.aforce_login(self.user)
+
+        response = await self.async_client.get(
+            reverse('coops:notifications_stream'), headers={'Last-Event-ID': str(first.id)}
+        )
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        stream = aiter(response.streaming_content)
+        try:
+            replayed, unread = await self.read_events(stream, 2)
+            self.assertIn(f'id: {second.id}', replayed)
+            self.assertNotIn('"Satu"', replayed)
+            self.assertIn('event: unread', unread)
+
+            # Event diterbitkan setelah commit oleh view sync; di sini langsung lewat channel
+            await sync_to_async(publish_notification_event)(
+                self.user.id, 'notification', {'title': 'Tiga'}, event_id=second.id + 1
+            )
+            (pushed,) = await self.read_events(stream, 1)
+            self.assertIn('"Tiga"', pushed)
+        finally:
+            await stream.aclose()
+
+    def test_wsgi_request_falls_back_to_polling(self):
+        self.client.force_login(self.user)
+        response = self.client.get(reverse('coops:notifications_stream'))
+        self.assertEqual(response.status_code, 204)
+
+
+class NotifyFanOutTests(TestCase):
+    """notify() writes every recipient's row in a fixed number of queries"""
+
+    def setUp(self):
+        cache.clear()
+        self.admins = User.objects.bulk_create([
+            User(username=f'admin{i}', email=f'admin{i}@example.com', role='admin') for i in range(40)
+        ])
+
+    def test_fan_out_to_queryset(self):
+        # Counter sebagian admin sudah ada di cache, sebagian belum
+        for admin in self.admins[:10]:
+            get_unread_count(admin.id)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            with self.assertNumQueries(4):  # SELECT ids, SAVEPOINT, INSERT, RELEASE
+                created = notify(User.objects.filter(role='admin'), 'Akun Supervisor Baru', '-')
+
+        self.assertEqual(len(created), 40)
+        self.assertEqual(Notification.objects.filter(user__role='admin').count(), 40)
+        self.assertEqual(cache.get(unread_cache_key(self.admins[0].id)), 1)
+        self.assertIsNone(cache.get(unread_cache_key(self.admins[20].id)))
+        self.assertEqual(get_unread_count(self.admins[20].id), 1)
+
+    def test_ids_are_deduplicated(self):
+        admin = self.admins[0]
+        with self.captureOnCommitCallbacks(execute=True):
+            notify([admin, admin.id], 'Info', '-', batch_size=1)
+        self.assertEqual(Notification.objects.filter(user=admin).count(), 1)
+        self.assertEqual(get_unread_count(admin.id), 1)
+
+    @override_settings(CACHES={'default': {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache', 'LOCATION': 'redis://localhost:6379',
+    }})
+    def test_redis_counters_updated_in_one_call(self):
+        from django.core.cache import caches
+        from coops.utils.notifications import _incr_many
+
+        with mock.patch.object(type(caches['default']._cache), 'get_client') as get_client:
+            get_client.return_value.eval.return_value = [3, None]
+            self.assertEqual(_incr_many({1: 1, 2: 1}), {1: 3, 2: None})
+        get_client.return_value.eval.assert_called_once()
+
+    def test_no_recipients(self):
+        with self.assertNumQueries(1):
+            self.assertEqual(notify(User.objects.filter(role='kaprodi'), 'Info', '-'), [])
+
+
+class BroadcastNotificationTests(TestCase):
+    """Broadcasts are stored once and merged into each matching user's notifications"""
+
+    def setUp(self):
+        cache.clear()
+        self.mhs_2023 = self.make_mahasiswa('mhs2023', 2023)
+        self.mhs_2024 = self.make_mahasiswa('mhs2024', 2024)
+        self.kaprodi = User.objects.create_user('kaprodi', 'kaprodi@example.com', 'password', role='kaprodi')
+
+    def make_mahasiswa(self, username, angkatan):
+        user = User.objects.create_user(username, f'{username}@example.com', 'password', role='mahasiswa')
+        Mahasiswa.objects.create(
+            email=user, nama=username, nim=username, prodi='Business', angkatan=angkatan,
+            jenis_kelamin='L', no_hp='0800', jurusan='BBA'
+        )
+        return user
+
+    def announce(self, **targets):
+        with self.captureOnCommitCallbacks(execute=True):
+            return BroadcastNotification.objects.create(title='Pengumuman', message='-', **targets)
+
+    def test_targeting_and_merge(self):
+        # Cache counter sudah terisi sebelum pengumuman dibuat
+        self.assertEqual(get_unread_count(self.mhs_2023.id), 0)
+        with self.captureOnCommitCallbacks(execute=True):
+            Notification.objects.create(user=self.mhs_2023, title='Pribadi', message='-')
+        broadcast = self.announce(target_role='mahasiswa', target_angkatan=2023)
+
+        self.assertEqual(Notification.objects.count(), 1)
+        self.assertEqual(get_unread_count(self.mhs_2023.id), 2)
+        self.assertEqual(get_unread_count(self.mhs_2024.id), 0)
+        self.assertEqual(get_unread_count(self.kaprodi.id), 0)
+
+        self.client.force_login(self.mhs_2023)
+        data = self.client.get(reverse('coops:get_notifications')).json()
+        self.assertEqual(data['unread_count'], 2)
+        kinds = {item['kind']: item for item in data['notifications']}
+        self.assertEqual(kinds['broadcast']['id'], broadcast.id)
+        self.assertEqual(kinds['broadcast']['read_url'], reverse('coops:mark_broadcast_read', args=[broadcast.id]))
+
+    def test_mark_broadcast_read(self):
+        broadcast = self.announce(target_jurusan='BBA')
+        self.client.force_login(self.mhs_2024)
+        self.assertEqual(get_unread_count(self.mhs_2024.id), 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(reverse('coops:mark_broadcast_read', args=[broadcast.id]))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(get_unread_count(self.mhs_2024.id), 0)
+        # Mahasiswa lain tetap belum membaca
+        self.assertEqual(get_unread_count(self.mhs_2023.id), 1)
+
+        self.client.force_login(self.kaprodi)
+        response = self.client.post(reverse('coops:mark_broadcast_read', args=[broadcast.id]))
+        self.assertEqual(response.status_code, 404)
+
+    def test_profile_change_updates_audience(self):
+        self.announce(target_angkatan=2024)
+        self.announce(target_role='kaprodi')
+        self.assertEqual(get_unread_count(self.mhs_2023.id), 0)
+
+        mahasiswa = Mahasiswa.objects.get(email=self.mhs_2023)
+        mahasiswa.angkatan = 2024
+        with self.captureOnCommitCallbacks(execute=True):
+            mahasiswa.save()
+        self.assertEqual(get_unread_count(self.mhs_2023.id), 1)
+
+        # Login hanya menyimpan last_login: cache audience tetap dipakai
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            self.client.force_login(self.mhs_2023)
+        self.assertEqual(callbacks, [])
+
+        self.mhs_2023.role = 'kaprodi'
+        with self.captureOnCommitCallbacks(execute=True):
+            self.mhs_2023.save()
+        self.assertEqual(get_unread_count(self.mhs_2023.id), 2)
+
+    def test_mark_all_read_includes_broadcasts(self):
+        self.announce()
+        self.announce(target_role='mahasiswa')
+        self.client.force_login(self.mhs_2023)
+        self.assertEqual(get_unread_count(self.mhs_2023.id), 2)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(reverse('coops:mark_all_notifications_read'))
+        self.assertEqual(get_unread_count(self.mhs_2023.id), 0)
+        self.assertEqual(BroadcastRead.objects.filter(user=self.mhs_2023).count(), 2)
+
+
+class NotificationHistoryTests(TestCase):
+    """The history endpoint pages with a cursor and filters by type and is_read"""
+
+    def setUp(self):
+        self.user = User.objects.create_user('mhs', 'mhs@example.com', 'password', role='mahasiswa')
+        now = timezone.now()
+        Notification.objects.bulk_create([
+            Notification(
+                user=self.user, title=f'N{i}', message='-', is_read=i % 2 == 0,
+                notification_type='warning' if i % 3 == 0 else 'info',
+                # Beberapa notifikasi berbagi created_at: id menjadi pemutus urutan
+                created_at=now - datetime.timedelta(minutes=i // 2)
+            )
+            for i in range(25)
+        ])
+        self.client.force_login(self.user)
+        self.url = reverse('coops:notification_history')
+
+    def fetch_all(self, **params):
+        ids, cursor, pages = [], None, 0
+        while True:
+            data = self.client.get(self.url, {**params, **({'cursor': cursor} if cursor else {})}).json()
+            ids += [item['id'] for item in data['notifications']]
+            pages += 1
+            cursor = data['next_cursor']
+            if not cursor:
+                return ids, pages
+
+    def test_pages_cover_history_once(self):
+        ids, pages = self.fetch_all(limit=10)
+        expected = list(Notification.objects.filter(user=self.user).order_by('-created_at', '-id').values_list('id', flat=True))
+        self.assertEqual(ids, expected)
+        self.assertEqual(pages, 3)
+
+    def test_filters(self):
+        ids, _ = self.fetch_all(limit=4, type='warning', is_read='false')
+        expected = Notification.objects.filter(user=self.user, notification_type='warning', is_read=False)
+        self.assertEqual(sorted(ids), sorted(expected.values_list('id', flat=True)))
+
+        self.assertEqual(self.client.get(self.url, {'type': 'spam'}).status_code, 400)
+
+    def test_page_query_count(self):
+        cursor = self.client.get(self.url, {'limit': 5}).json()['next_cursor']
+        with self.assertNumQueries(3) as queries:  # session + user + page
+            self.client.get(self.url, {'limit': 5, 'cursor': cursor})
+        # Batas pada kolom pertama membuat halaman berikutnya range scan pada index (user, -created_at, -id)
+        self.assertIn('"coops_notification"."created_at" <= ', queries.captured_queries[-1]['sql'])
@@ -0,0 +1,43 @@
+import datetime
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from coops.models import WeeklyReport
+from coops.utils.pagination import keyset_filter
+from .utils import Cohort
+
+
+class KeysetPaginationTests(TestCase):
+    """Keyset pages carry a leading-column bound (index range) and visit every row once"""
+
+    def test_filter_has_leading_column_bound(self):
+        week = datetime.date(2025, 1, 6)
+        where = str(WeeklyReport.objects.filter(keyset_filter(('week_start_date', 'id'), [week, 5])).query)
+        self.assertIn('WHERE ("coops_weeklyreport"."week_start_date" <= 2025-01-06 AND (', where)
+
+        where = str(WeeklyReport.objects.filter(keyset_filter(('week_start_date', 'id'), [week, 5], False)).query)
+        self.assertIn('WHERE ("coops_weeklyreport"."week_start_date" >= 2025-01-06 AND (', where)
+
+    def test_admin_weekly_reports_pages(self):
+        cohort = Cohort()
+        cohort.grow_to(10)
+        self.client.force_login(cohort.admin)
+        url = reverse('coops:admin_weekly_reports')
+
+        seen, cursor = [], None
+        while True:
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get(url, {'per_page': 3, **({'cursor': cursor} if cursor else {})})
+            seen.extend(report.id for report in response.context['reports'])
+            if cursor:
+                self.assertTrue(any(
+                    '"coops_weeklyreport"."week_start_date" <= ' in query['sql'] for query in queries.captured_queries
+                ))
+            cursor = response.context['next_cursor']
+            if not cursor:
+                break
+
+        expected = list(WeeklyReport.objects.order_by('-week_start_date', '-id').values_list('id', flat=True))
+        self.assertGreater(len(expected), 3)
+        self.assertEqual(seen, expected)
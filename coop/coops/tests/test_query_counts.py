@@ -0,0 +1,82 @@
+from django.contrib import admin
+from django.db import transaction
+from django.http import HttpResponseNotFound
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from coops.middleware import QueryBudgetMiddleware
+from coops.utils.query_budget import UNRESOLVED, summary
+from .utils import Cohort, QueryCountMixin
+
+
+class ViewQueryCountTests(QueryCountMixin, TestCase):
+    """
+    Main pages must run a constant number of queries at 10, 100 and 1000
+    students. A failure lists the SQL fingerprints that grew with the
+    dataset, which is almost always an N+1 loop.
+    """
+
+    def setUp(self):
+        self.cohort = Cohort()
+
+    def test_status_magang(self):
+        self.assertConstantQueries(self.cohort.admin, reverse('coops:status_magang'), max_queries=10)
+
+    def test_status_magang_filtered(self):
+        self.assertConstantQueries(
+            self.cohort.admin, reverse('coops:status_magang'),
+            {'status': 'accepted', 'search': 'Mahasiswa', 'sort': 'perusahaan'}, max_queries=10
+        )
+
+    def test_tracking_evaluasi(self):
+        self.assertConstantQueries(self.cohort.admin, reverse('coops:tracking_evaluasi'), max_queries=10)
+
+    def test_tracking_evaluasi_csv(self):
+        self.assertConstantQueries(
+            self.cohort.admin, reverse('coops:tracking_evaluasi'), {'format': 'csv'}, max_queries=10
+        )
+
+    def test_supervisor_dashboard(self):
+        self.assertConstantQueries(self.cohort.supervisor, reverse('jobs:supervisor_dashboard'), max_queries=12)
+
+    def test_kaprodi_dashboard(self):
+        self.assertConstantQueries(self.cohort.kaprodi, reverse('accounts:kaprodi_dashboard'), max_queries=12)
+
+    def test_admin_weekly_reports(self):
+        self.assertConstantQueries(self.cohort.admin, reverse('coops:admin_weekly_reports'), max_queries=12)
+
+    def test_daftar_laporan_kemajuan(self):
+        self.assertConstantQueries(self.cohort.admin, reverse('coops:daftar_laporan_kemajuan'), max_queries=10)
+
+    def test_lowongan(self):
+        self.assertConstantQueries(self.cohort.admin, reverse('jobs:lowongan'), max_queries=10)
+
+    def test_get_notifications(self):
+        self.assertConstantQueries(self.cohort.admin, reverse('coops:get_notifications'), max_queries=5)
+
+
+class AdminChangelistQueryCountTests(QueryCountMixin, TestCase):
+    """Every registered admin changelist must not issue per-row queries"""
+
+    def test_changelists(self):
+        for model in admin.site._registry:
+            opts = model._meta
+            url = reverse(f'admin:{opts.app_label}_{opts.model_name}_changelist')
+            with self.subTest(model=opts.label), transaction.atomic():
+                # Fresh cohort per changelist, rolled back afterwards
+                self.cohort = Cohort()
+                self.assertConstantQueries(self.cohort.admin, url, max_queries=15)
+                transaction.set_rollback(True)
+
+
+class QueryBudgetMiddlewareTests(SimpleTestCase):
+    """Unresolved paths share one summary key, so scanners cannot grow the summary"""
+
+    @override_settings(QUERY_BUDGET={'ENABLED': True})
+    def test_unresolved_paths_bucketed(self):
+        summary.reset()
+        self.addCleanup(summary.reset)
+        middleware = QueryBudgetMiddleware(lambda request: HttpResponseNotFound())
+        for path in ('/wp-login.php', '/.env', '/admin/../etc/passwd'):
+            middleware(RequestFactory().get(path))
+
+        self.assertEqual([(row['url_name'], row['requests']) for row in summary.snapshot()], [(UNRESOLVED, 3)])
@@ -0,0 +1,70 @@
+import datetime
+import io
+import json
+import os
+import tempfile
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+from accounts.models import User
+from coops.models import Notification
+from coops.utils.notifications import get_unread_count, get_recent_notifications, recent_cache_key
+from coops.utils.retention import NotificationPurger
+
+
+class NotificationRetentionTests(TestCase):
+    """Old and excess notifications are deleted in batches and caches stay correct"""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user('mhs', 'mhs@example.com', 'password', role='mahasiswa')
+        now = timezone.now()
+        # 6 lama (3 sudah dibaca), 4 baru (2 sudah dibaca)
+        Notification.objects.bulk_create([
+            Notification(
+                user=self.user, title=f'N{i}', message='-', is_read=i % 2 == 0,
+                created_at=now - datetime.timedelta(days=200 if i < 6 else 1, minutes=i)
+            )
+            for i in range(10)
+        ])
+
+    def test_age_rule_deletes_only_old_read(self):
+        stats = NotificationPurger(older_than_days=90, batch_size=2).run()
+        self.assertEqual(stats['age']['deleted'], 3)
+        self.assertEqual(stats['age']['batches'], 2)
+        self.assertFalse(Notification.objects.filter(is_read=True, created_at__lt=timezone.now() - datetime.timedelta(days=90)).exists())
+        self.assertEqual(Notification.objects.filter(is_read=False).count(), 5)
+
+    def test_keep_latest(self):
+        NotificationPurger(older_than_days=None, keep_latest=4).run()
+        # Yang lama dan sudah dibaca dihapus; unread tetap disimpan
+        self.assertEqual(Notification.objects.count(), 7)
+
+        NotificationPurger(older_than_days=None, keep_latest=4, include_unread=True).run()
+        remaining = Notification.objects.order_by('-created_at')
+        self.assertEqual([n.title for n in remaining], ['N6', 'N7', 'N8', 'N9'])
+
+    def test_caches_are_updated(self):
+        self.assertEqual(get_unread_count(self.user.id), 5)
+        get_recent_notifications(self.user.id)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            NotificationPurger(older_than_days=None, keep_latest=2, include_unread=True).run()
+        self.assertEqual(get_unread_count(self.user.id), Notification.objects.filter(is_read=False).count())
+        self.assertIsNone(cache.get(recent_cache_key(self.user.id)))
+
+    def test_command_dry_run_and_archive(self):
+        out = io.StringIO()
+        call_command('purge_notifications', '--dry-run', stdout=out)
+        self.assertIn('3 notifikasi akan dihapus', out.getvalue())
+        self.assertEqual(Notification.objects.count(), 10)
+
+        handle, archive = tempfile.mkstemp(suffix='.jsonl')
+        os.close(handle)
+        self.addCleanup(os.remove, archive)
+        call_command('purge_notifications', '--archive', archive, stdout=io.StringIO())
+        with open(archive) as f:
+            rows = [json.loads(line) for line in f]
+        self.assertEqual(len(rows), 3)
+        self.assertTrue(all(row['is_read'] for row in rows))
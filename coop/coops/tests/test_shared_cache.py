@@ -0,0 +1,23 @@
+from django.test import SimpleTestCase, override_settings
+from coops.utils.shared_cache import check_shared_cache, cache_ttl
+
+REDIS_CACHES = {'default': {'BACKEND': 'django.core.cache.backends.redis.RedisCache', 'LOCATION': 'redis://localhost:6379'}}
+
+
+class SharedCacheTests(SimpleTestCase):
+    """Invalidated entries live only briefly in a per-process cache"""
+
+    def test_ttl_capped_for_locmem(self):
+        self.assertEqual(cache_ttl(60 * 60), 30)
+        self.assertEqual(cache_ttl(10), 10)
+        with override_settings(LOCAL_CACHE_MAX_TTL=5):
+            self.assertEqual(cache_ttl(60 * 60), 5)
+
+    @override_settings(CACHES=REDIS_CACHES)
+    def test_ttl_kept_for_shared_cache(self):
+        self.assertEqual(cache_ttl(60 * 60), 60 * 60)
+        self.assertEqual(check_shared_cache(None), [])
+
+    @override_settings(DEBUG=False)
+    def test_deploy_check_warns(self):
+        self.assertEqual([warning.id for warning in check_shared_cache(None)], ['coops.W001'])
@@ -0,0 +1,35 @@
+from django.test import TestCase
+from django.urls import reverse
+from accounts.models import User
+from coops.models import EvaluasiSupervisor, EvaluasiTemplate, KonfirmasiMagang
+from coops.utils.synthetic import QUESTIONS, CohortGenerator, clear_synthetic_data, synthetic_users
+
+
+class CohortGeneratorTests(TestCase):
+    """Generated rows read back as the ORM would have written them"""
+
+    def setUp(self):
+        self.stats = CohortGenerator(students=30, seed=7, chunk_size=8).run()
+
+    def test_rows_round_trip(self):
+        self.assertEqual(self.stats['Mahasiswa'], 30)
+        self.assertEqual(synthetic_users().filter(role='mahasiswa').count(), 30)
+
+        for template in EvaluasiTemplate.objects.all():
+            self.assertEqual(template.pertanyaan, QUESTIONS)
+
+        completed = EvaluasiSupervisor.objects.filter(status='completed').select_related('konfirmasi', 'template')
+        self.assertTrue(completed.exists())
+        self.assertTrue(all(isinstance(evaluasi.jawaban, dict) for evaluasi in completed))
+
+        evaluasi = completed.first()
+        self.client.force_login(synthetic_users().filter(role='admin').first())
+        response = self.client.get(reverse('coops:hasil_evaluasi', args=[evaluasi.konfirmasi_id, evaluasi.template_id]))
+        self.assertEqual([pair['question'] for pair in response.context['qa_pairs']], QUESTIONS)
+
+    def test_clear_removes_generated_rows(self):
+        clear_synthetic_data()
+        self.assertFalse(synthetic_users().exists())
+        self.assertFalse(KonfirmasiMagang.objects.exists())
+        self.assertFalse(EvaluasiTemplate.objects.exists())
+        self.assertFalse(User.objects.exists())
@@ -0,0 +1,366 @@
+import datetime
+import io
+import os
+import shutil
+import tempfile
+from unittest import mock
+from django.conf import settings
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from accounts.models import User, Mahasiswa
+from coops.models import FileUpload, KonfirmasiMagang, LaporanAkhir
+from coops.utils.uploads import (
+    enqueue_upload, expire_direct_uploads, process_upload, requeue_stale_uploads, retry_uploads
+)
+
+UPLOAD = 'coop.firebase.storage_helper.upload_local_file'
+
+
+def public_url(path, blob_path, content_type=None):
+    return f'https://storage.googleapis.com/coop-stem-test/{blob_path}'
+
+
+class UploadQueueTests(TestCase):
+    """Spooled uploads are sent to Firebase after commit and written to the target field"""
+
+    def setUp(self):
+        self.spool_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.spool_dir, ignore_errors=True)
+        queue_override = override_settings(UPLOAD_QUEUE={
+            'SPOOL_DIR': self.spool_dir, 'MAX_ATTEMPTS': 3, 'RETRY_BACKOFF': 0, 'STALE_AFTER': 60,
+        })
+        queue_override.enable()
+        self.addCleanup(queue_override.disable)
+
+        self.user = User.objects.create_user('mhs', 'mhs@example.com', 'password', role='mahasiswa')
+        Mahasiswa.objects.create(
+            email=self.user, nama='Budi Santoso', nim='NIM001', prodi='Business', angkatan=2022,
+            jenis_kelamin='L', no_hp='0800', jurusan='BBA'
+        )
+        self.konfirmasi = KonfirmasiMagang.objects.create(
+            mahasiswa=self.user, posisi='Intern', nama_perusahaan='PT Maju', alamat_perusahaan='Jakarta',
+            bidang_usaha='Teknologi', nama_supervisor='Supervisor', email_supervisor='supervisor@example.com',
+            periode_awal=datetime.date(2025, 1, 1), periode_akhir=datetime.date(2025, 6, 30),
+        )
+
+    def pdf(self, name='surat.pdf'):
+        return SimpleUploadedFile(name, b'%PDF-1.4 test', content_type='application/pdf')
+
+    def enqueue(self, **kwargs):
+        return enqueue_upload(self.pdf(), self.konfirmasi, 'surat_penerimaan', 'surat_penerimaan', 'surat_NIM001.pdf', **kwargs)
+
+    def test_upload_after_commit_sets_target_url(self):
+        with mock.patch(UPLOAD, side_effect=public_url) as upload_local_file:
+            with self.captureOnCommitCallbacks(execute=False) as callbacks:
+                upload = self.enqueue(uploaded_by=self.user)
+            self.assertTrue(os.path.exists(upload.spool_path))
+            upload_local_file.assert_not_called()
+
+            for callback in callbacks:
+                callback()
+
+        upload.refresh_from_db()
+        self.assertEqual(upload.status, 'done')
+        self.assertEqual(upload.attempts, 1)
+        self.assertEqual(upload.size, len(b'%PDF-1.4 test'))
+        self.assertFalse(os.path.exists(upload.spool_path))
+        self.assertRegex(upload.blob_path, r'^surat_penerimaan/surat_NIM001_[0-9a-f]{8}\.pdf$')
+        upload_local_file.assert_called_once_with(upload.spool_path, upload.blob_path, 'application/pdf')
+
+        self.konfirmasi.refresh_from_db()
+        self.assertEqual(self.konfirmasi.surat_penerimaan, f'https://storage.googleapis.com/coop-stem-test/{upload.blob_path}')
+
+    def test_retries_then_fails_after_max_attempts(self):
+        with mock.patch(UPLOAD, side_effect=ConnectionError('timeout')) as upload_local_file:
+            with self.captureOnCommitCallbacks(execute=True):
+                upload = self.enqueue()
+            # Eager: tidak ada retry di dalam request, baris menunggu requeue
+            upload.refresh_from_db()
+            self.assertEqual((upload_local_file.call_count, upload.status, upload.attempts), (1, 'pending', 1))
+
+            for _ in range(3):
+                FileUpload.objects.filter(id=upload.id).update(updated_at=timezone.now() - datetime.timedelta(minutes=5))
+                call_command('requeue_uploads', stdout=io.StringIO())
+
+        upload.refresh_from_db()
+        self.assertEqual(upload_local_file.call_count, 3)
+        self.assertEqual((upload.status, upload.attempts, upload.last_error), ('failed', 3, 'timeout'))
+        # Spool disimpan agar admin bisa mengulang
+        self.assertTrue(os.path.exists(upload.spool_path))
+
+        with mock.patch(UPLOAD, side_effect=public_url):
+            with self.captureOnCommitCallbacks(execute=True):
+                self.assertEqual(retry_uploads(FileUpload.objects.all()), 1)
+
+        upload.refresh_from_db()
+        self.assertEqual((upload.status, upload.attempts), ('done', 1))
+        self.konfirmasi.refresh_from_db()
+        self.assertTrue(self.konfirmasi.surat_penerimaan.endswith(f'/{upload.blob_path}'))
+
+    def test_new_upload_cancels_unfinished_one(self):
+        with self.captureOnCommitCallbacks(execute=False):
+            first = self.enqueue()
+            second = self.enqueue()
+        first.refresh_from_db()
+        self.assertEqual(first.status, 'cancelled')
+
+        with mock.patch(UPLOAD, side_effect=public_url) as upload_local_file:
+            self.assertEqual(process_upload(first.id).status, 'cancelled')
+            self.assertEqual(process_upload(second.id).status, 'done')
+        upload_local_file.assert_called_once()
+        self.assertFalse(os.path.exists(first.spool_path))
+
+    def test_duplicate_delivery_uploads_once(self):
+        with self.captureOnCommitCallbacks(execute=False):
+            upload = self.enqueue()
+
+        with mock.patch(UPLOAD, side_effect=public_url) as upload_local_file:
+            process_upload(upload.id)
+            self.assertEqual(process_upload(upload.id).status, 'done')
+        upload_local_file.assert_called_once()
+
+    def test_older_upload_does_not_overwrite_newer(self):
+        with self.captureOnCommitCallbacks(execute=False):
+            first = self.enqueue()
+        # Upload pertama sedang berjalan saat file baru masuk
+        FileUpload.objects.filter(id=first.id).update(status='uploading')
+        with self.captureOnCommitCallbacks(execute=False):
+            second = self.enqueue()
+        # Nama objek sama dari helper path, tetapi tiap upload menulis ke objeknya sendiri
+        self.assertNotEqual(first.blob_path, second.blob_path)
+
+        with mock.patch(UPLOAD, side_effect=public_url) as upload_local_file:
+            self.assertEqual(process_upload(second.id).status, 'done')
+            self.konfirmasi.refresh_from_db()
+            newer_url = self.konfirmasi.surat_penerimaan
+            FileUpload.objects.filter(id=first.id).update(status='pending')
+            self.assertEqual(process_upload(first.id).status, 'done')
+
+        self.assertEqual([call.args[1] for call in upload_local_file.call_args_list], [second.blob_path, first.blob_path])
+        self.konfirmasi.refresh_from_db()
+        self.assertEqual(self.konfirmasi.surat_penerimaan, newer_url)
+
+    def test_requeue_stale_uploads(self):
+        with self.captureOnCommitCallbacks(execute=False):
+            stale = self.enqueue()
+        # Masih dalam UPLOAD_TIMEOUT: bisa jadi upload besar yang masih berjalan
+        FileUpload.objects.filter(id=stale.id).update(
+            status='uploading', attempts=1, updated_at=timezone.now() - datetime.timedelta(minutes=30)
+        )
+        self.assertEqual(requeue_stale_uploads(), 0)
+
+        FileUpload.objects.filter(id=stale.id).update(updated_at=timezone.now() - datetime.timedelta(hours=2))
+        with mock.patch(UPLOAD, side_effect=public_url):
+            self.assertEqual(requeue_stale_uploads(), 1)
+            self.assertEqual(requeue_stale_uploads(), 0)
+        stale.refresh_from_db()
+        self.assertEqual((stale.status, stale.attempts), ('done', 2))
+
+    def test_requeue_skips_pending_retry_in_backoff(self):
+        with self.captureOnCommitCallbacks(execute=False):
+            upload = self.enqueue()
+        with override_settings(UPLOAD_QUEUE={
+            'SPOOL_DIR': self.spool_dir, 'RETRY_BACKOFF': 600, 'STALE_AFTER': 60,
+        }):
+            # Percobaan ke-3 dijadwalkan 20 menit setelah kegagalan kedua
+            FileUpload.objects.filter(id=upload.id).update(
+                attempts=2, updated_at=timezone.now() - datetime.timedelta(minutes=10)
+            )
+            self.assertEqual(requeue_stale_uploads(), 0)
+
+            FileUpload.objects.filter(id=upload.id).update(updated_at=timezone.now() - datetime.timedelta(minutes=30))
+            with mock.patch(UPLOAD, side_effect=public_url):
+                self.assertEqual(requeue_stale_uploads(), 1)
+        upload.refresh_from_db()
+        self.assertEqual(upload.status, 'done')
+
+    def test_konfirmasi_view_queues_surat(self):
+        self.client.force_login(self.user)
+        data = {
+            'periode_awal': '2025-01-01', 'periode_akhir': '2025-06-30', 'posisi': 'Intern',
+            'nama_perusahaan': 'PT Maju Jaya', 'alamat_perusahaan': 'Jakarta', 'bidang_usaha': 'Teknologi',
+            'surat_penerimaan': self.pdf(),
+        }
+        with mock.patch(UPLOAD, side_effect=public_url):
+            with self.captureOnCommitCallbacks(execute=True):
+                response = self.client.post(reverse('coops:konfirmasi_magang'), data)
+        self.assertEqual(response.status_code, 302)
+
+        upload = FileUpload.objects.get()
+        self.assertRegex(upload.blob_path, r'^surat_penerimaan/surat_NIM001_PT_Maju_Jaya_[0-9a-f]{8}\.pdf$')
+        self.assertEqual(upload.uploaded_by, self.user)
+        self.konfirmasi.refresh_from_db()
+        self.assertEqual(self.konfirmasi.surat_penerimaan, upload.url)
+
+        response = self.client.get(reverse('coops:upload_status', args=[upload.id]))
+        self.assertEqual(response.json()['status'], 'done')
+        self.assertEqual(response.json()['url'], upload.url)
+
+        other = User.objects.create_user('lain', 'lain@example.com', 'password', role='mahasiswa')
+        self.client.force_login(other)
+        response = self.client.get(reverse('coops:upload_status', args=[upload.id]))
+        self.assertEqual(response.status_code, 404)
+
+
+class FakeBlob:
+    def __init__(self, name, size, content_type):
+        self.name, self.size, self.content_type = name, size, content_type
+        self.deleted = False
+
+    def delete(self):
+        self.deleted = True
+
+
+def signed_put_url(blob_path, content_type, size, expiration_minutes=15):
+    return (
+        f'https://storage.googleapis.com/coop-stem-test/{blob_path}?X-Goog-Signature=abc',
+        {'Content-Type': content_type, 'x-goog-content-length-range': f'{size},{size}'},
+    )
+
+
+@mock.patch('coop.firebase.storage_helper.generate_upload_url', side_effect=signed_put_url)
+class DirectUploadTests(TestCase):
+    """Signed URLs for browser uploads and the completion callback"""
+
+    def setUp(self):
+        self.user = User.objects.create_user('mhs', 'mhs@example.com', 'password', role='mahasiswa')
+        Mahasiswa.objects.create(
+            email=self.user, nama='Budi Santoso', nim='NIM001', prodi='Business', angkatan=2022,
+            jenis_kelamin='L', no_hp='0800', jurusan='BBA'
+        )
+        self.konfirmasi = KonfirmasiMagang.objects.create(
+            mahasiswa=self.user, posisi='Intern', nama_perusahaan='PT Maju Jaya', alamat_perusahaan='Jakarta',
+            bidang_usaha='Teknologi', nama_supervisor='Supervisor', email_supervisor='supervisor@example.com',
+        )
+        self.client.force_login(self.user)
+
+    def start(self, kind='surat_penerimaan', filename='surat.pdf', content_type='application/pdf', size=2048):
+        return self.client.post(reverse('coops:direct_upload_start'), {
+            'kind': kind, 'filename': filename, 'content_type': content_type, 'size': size,
+        })
+
+    def complete(self, upload_id, blob):
+        with mock.patch('coop.firebase.storage_helper.get_blob', return_value=blob), \
+                mock.patch('coop.firebase.storage_helper.publish_blob', side_effect=lambda b: f'https://storage.googleapis.com/coop-stem-test/{b.name}'):
+            return self.client.post(reverse('coops:direct_upload_complete', args=[upload_id]))
+
+    def test_signed_url_scoped_to_helper_object(self, generate_upload_url):
+        response = self.start()
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        upload = FileUpload.objects.get(id=data['upload_id'])
+        # Folder dan nama dari surat_penerimaan_path, ditambah suffix acak
+        self.assertRegex(upload.blob_path, r'^surat_penerimaan/surat_NIM001_PT_Maju_Jaya_[0-9a-f]{8}\.pdf$')
+        generate_upload_url.assert_called_once_with(upload.blob_path, 'application/pdf', 2048, expiration_minutes=15)
+        self.assertNotEqual(FileUpload.objects.get(id=self.start().json()['upload_id']).blob_path, upload.blob_path)
+        self.assertEqual(data['method'], 'PUT')
+        self.assertEqual(data['headers']['x-goog-content-length-range'], '2048,2048')
+        self.assertEqual(data['complete_url'], reverse('coops:direct_upload_complete', args=[data['upload_id']]))
+
+        self.assertEqual((upload.status, upload.spool_path, upload.target_field), ('awaiting', '', 'surat_penerimaan'))
+
+    def test_complete_records_url(self, generate_upload_url):
+        upload_id = self.start().json()['upload_id']
+        blob_path = FileUpload.objects.get(id=upload_id).blob_path
+
+        response = self.complete(upload_id, None)
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.json()['status'], 'awaiting')
+
+        response = self.complete(upload_id, FakeBlob(blob_path, 2048, 'application/pdf'))
+        self.assertEqual(response.status_code, 200)
+        url = f'https://storage.googleapis.com/coop-stem-test/{blob_path}'
+        self.assertEqual(response.json()['url'], url)
+        self.konfirmasi.refresh_from_db()
+        self.assertEqual(self.konfirmasi.surat_penerimaan, url)
+
+        # Callback kedua tidak memverifikasi ulang
+        response = self.complete(upload_id, None)
+        self.assertEqual((response.status_code, response.json()['status']), (200, 'done'))
+
+    def test_mismatching_object_is_deleted(self, generate_upload_url):
+        upload_id = self.start(kind='cv', filename='cv.png', content_type='image/png').json()['upload_id']
+        blob = FakeBlob(FileUpload.objects.get(id=upload_id).blob_path, 2048, 'application/pdf')
+
+        response = self.complete(upload_id, blob)
+        self.assertEqual((response.status_code, response.json()['status']), (400, 'failed'))
+        self.assertTrue(blob.deleted)
+        self.assertIsNone(Mahasiswa.objects.get(email=self.user).cv)
+
+    def test_live_document_never_touched(self, generate_upload_url):
+        # Dokumen lama (ukuran lain) masih dipakai target dengan nama objek tetap dari cv_path
+        live_path = 'cvs/cv_NIM001.pdf'
+        live_url = f'https://storage.googleapis.com/{settings.FIREBASE_STORAGE_BUCKET}/{live_path}'
+        Mahasiswa.objects.filter(email=self.user).update(cv=live_url)
+        live = FakeBlob(live_path, 999, 'application/pdf')
+        blobs = {live_path: live}
+
+        upload_id = self.start(kind='cv').json()['upload_id']
+        self.assertNotEqual(FileUpload.objects.get(id=upload_id).blob_path, live_path)
+        # Complete dipanggil sebelum PUT selesai (atau PUT gagal karena CORS)
+        with mock.patch('coop.firebase.storage_helper.get_blob', side_effect=blobs.get):
+            response = self.client.post(reverse('coops:direct_upload_complete', args=[upload_id]))
+            self.assertEqual((response.status_code, response.json()['status']), (409, 'awaiting'))
+            FileUpload.objects.update(created_at=timezone.now() - datetime.timedelta(hours=1))
+            self.assertEqual(expire_direct_uploads(), 0)
+
+        self.assertEqual(FileUpload.objects.get(id=upload_id).status, 'cancelled')
+        self.assertFalse(live.deleted)
+        self.assertEqual(Mahasiswa.objects.get(email=self.user).cv, live_url)
+
+        # Objek yang sedang dipakai target tidak dihapus, walau tidak cocok
+        upload_id = self.start(kind='cv').json()['upload_id']
+        FileUpload.objects.filter(id=upload_id).update(blob_path=live_path)
+        with mock.patch('coop.firebase.storage_helper.get_blob', side_effect=blobs.get):
+            response = self.client.post(reverse('coops:direct_upload_complete', args=[upload_id]))
+        self.assertEqual(response.json()['status'], 'failed')
+        self.assertFalse(live.deleted)
+
+    def test_invalid_requests_rejected(self, generate_upload_url):
+        self.assertEqual(self.start(kind='ktp').status_code, 400)
+        self.assertEqual(self.start(filename='surat.exe').status_code, 400)
+        self.assertEqual(self.start(content_type='image/png').status_code, 400)
+        self.assertEqual(self.start(size=6 * 1024 * 1024).status_code, 400)
+        self.assertEqual(self.start(kind='laporan_akhir', filename='laporan.docx', content_type=(
+            'application/vnd.openxmlformats-officedocument.wordprocessingml.document'
+        )).json()['error'], 'Simpan laporan akhir terlebih dahulu.')
+        generate_upload_url.assert_not_called()
+
+        upload_id = self.start().json()['upload_id']
+        other = User.objects.create_user('lain', 'lain@example.com', 'password', role='mahasiswa')
+        self.client.force_login(other)
+        self.assertEqual(self.start().status_code, 400)
+        self.assertEqual(self.complete(upload_id, None).status_code, 404)
+
+    def test_laporan_akhir_and_new_request_cancels_old(self, generate_upload_url):
+        LaporanAkhir.objects.create(
+            konfirmasi=self.konfirmasi, ringkasan_kegiatan='-', pencapaian='-', kendala_solusi='-',
+            saran_perusahaan='-', saran_kampus='-'
+        )
+        first = self.start(kind='laporan_akhir', filename='laporan.pdf').json()['upload_id']
+        second = self.start(kind='laporan_akhir', filename='laporan.pdf').json()['upload_id']
+        self.assertEqual(FileUpload.objects.get(id=first).status, 'cancelled')
+        self.assertEqual(self.complete(first, None).status_code, 410)
+
+        blob_path = FileUpload.objects.get(id=second).blob_path
+        self.assertRegex(blob_path, r'^laporan/laporan_akhir_NIM001_[0-9a-f]{8}_[0-9a-f]{8}\.pdf$')
+        self.assertEqual(self.complete(second, FakeBlob(blob_path, 2048, 'application/pdf')).status_code, 200)
+        self.assertTrue(LaporanAkhir.objects.get().file_laporan.endswith(blob_path))
+
+    def test_expired_uploads_settled(self, generate_upload_url):
+        uploaded = self.start(kind='cv').json()['upload_id']
+        abandoned = self.start(kind='porto').json()['upload_id']
+        FileUpload.objects.update(created_at=timezone.now() - datetime.timedelta(hours=1))
+
+        cv_path = FileUpload.objects.get(id=uploaded).blob_path
+        blobs = {cv_path: FakeBlob(cv_path, 2048, 'application/pdf')}
+        with mock.patch('coop.firebase.storage_helper.get_blob', side_effect=blobs.get), \
+                mock.patch('coop.firebase.storage_helper.publish_blob', return_value='https://example.com/cv.pdf'):
+            self.assertEqual(expire_direct_uploads(), 1)
+
+        self.assertEqual(FileUpload.objects.get(id=uploaded).status, 'done')
+        self.assertEqual(FileUpload.objects.get(id=abandoned).status, 'cancelled')
+        self.assertEqual(Mahasiswa.objects.get(email=self.user).cv, 'https://example.com/cv.pdf')
@@ -0,0 +1,193 @@
+import datetime
+from collections import Counter
+from django.contrib.auth.hashers import make_password
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from accounts.models import User, Mahasiswa, Kaprodi
+from jobs.models import Supervisor, JobPosting
+from coops.models import (
+    KonfirmasiMagang, EvaluasiTemplate, EvaluasiSupervisor, LaporanKemajuan,
+    WeeklyReport, DeadlineReminder, Notification
+)
+from coops.utils.query_budget import fingerprint
+
+
+# Dataset sizes every view is measured at
+COHORT_SIZES = (10, 100, 1000)
+
+# Status cycle: None means the student has no KonfirmasiMagang
+KONFIRMASI_STATUS_CYCLE = ('pending', 'accepted', 'rejected', 'completed', None)
+
+SUPERVISOR_EMAIL = 'supervisor@example.com'
+JURUSAN = 'BBA'
+
+
+class Cohort:
+    """
+    Grows a realistic dataset in place with bulk inserts.
+
+    grow_to(n) adds students n_current..n-1 together with their
+    internships, evaluations, progress reports, weekly reports,
+    notifications and job postings, so a test can measure the same view
+    at 10, 100 and 1000 students without reseeding.
+    """
+
+    def __init__(self):
+        # Counter notifikasi di cache tidak ikut di-rollback antar test
+        cache.clear()
+        self.size = 0
+        self.password = make_password('password')
+        self.week_start = timezone.now().date() - datetime.timedelta(days=timezone.now().date().weekday())
+
+        self.admin = User.objects.create(
+            username='admin', email='admin@example.com', password=self.password,
+            role='admin', is_staff=True, is_superuser=True
+        )
+        self.supervisor = User.objects.create(
+            username=SUPERVISOR_EMAIL, email=SUPERVISOR_EMAIL, password=self.password, role='supervisor'
+        )
+        Supervisor.objects.create(user=self.supervisor, nama='Supervisor', email=SUPERVISOR_EMAIL)
+        self.kaprodi = User.objects.create(
+            username='kaprodi', email='kaprodi@example.com', password=self.password, role='kaprodi'
+        )
+        Kaprodi.objects.create(user=self.kaprodi, nama='Kaprodi', email='kaprodi@example.com', jurusan=JURUSAN)
+
+        self.templates = [
+            EvaluasiTemplate.objects.create(nama='UTS', jenis='uts', pertanyaan=['q1']),
+            EvaluasiTemplate.objects.create(nama='UAS', jenis='uas', pertanyaan=['q1']),
+        ]
+        DeadlineReminder.objects.create(
+            deadline_date=timezone.now().date() - datetime.timedelta(days=10), description='Deadline'
+        )
+
+    def grow_to(self, size):
+        if size <= self.size:
+            return
+        indexes = range(self.size, size)
+
+        users = User.objects.bulk_create([
+            User(
+                username=f'mhs{i}', email=f'mhs{i}@example.com', password=self.password,
+                role='mahasiswa', first_name='Mahasiswa', last_name=str(i)
+            )
+            for i in indexes
+        ])
+        Mahasiswa.objects.bulk_create([
+            Mahasiswa(
+                email=user, nama=f'Mahasiswa {i}', nim=f'NIM{i:06d}', prodi='Business',
+                angkatan=2021 + i % 3, jenis_kelamin='L', no_hp='0800', jurusan=JURUSAN
+            )
+            for i, user in zip(indexes, users)
+        ])
+
+        konfirmasi_list = KonfirmasiMagang.objects.bulk_create([
+            KonfirmasiMagang(
+                mahasiswa=user, status=KONFIRMASI_STATUS_CYCLE[i % len(KONFIRMASI_STATUS_CYCLE)],
+                periode_awal=datetime.date(2025, 1, 1), periode_akhir=datetime.date(2025, 6, 30),
+                posisi='Intern', nama_perusahaan=f'PT {i}', alamat_perusahaan='Jakarta',
+                bidang_usaha='Teknologi', nama_supervisor='Supervisor',
+                email_supervisor=SUPERVISOR_EMAIL, wa_supervisor='0800',
+                supervisor_user=self.supervisor, surat_penerimaan='https://example.com/surat.pdf'
+            )
+            for i, user in zip(indexes, users)
+            if KONFIRMASI_STATUS_CYCLE[i % len(KONFIRMASI_STATUS_CYCLE)]
+        ])
+        active = [k for k in konfirmasi_list if k.status in ('accepted', 'completed')]
+
+        EvaluasiSupervisor.objects.bulk_create([
+            EvaluasiSupervisor(
+                konfirmasi=konfirmasi, template=template, jawaban={},
+                status='completed' if konfirmasi.status == 'completed' else 'pending'
+            )
+            for konfirmasi in active
+            for template in self.templates
+        ])
+        LaporanKemajuan.objects.bulk_create([
+            LaporanKemajuan(
+                konfirmasi=konfirmasi, bulan=datetime.date(2025, 2, 1), profil_perusahaan='-',
+                jobdesk='-', suasana_lingkungan='-', manfaat_perkuliahan='-',
+                kebutuhan_pembelajaran='-', status='submitted'
+            )
+            for konfirmasi in active
+        ])
+        WeeklyReport.objects.bulk_create([
+            WeeklyReport(
+                student=user, week_number=1, week_start_date=self.week_start,
+                week_end_date=self.week_start + datetime.timedelta(days=6),
+                main_activities='-', target_achievement='-', companies_applied='-', next_week_plan='-'
+            )
+            for i, user in zip(indexes, users)
+            if i % 3 == 0
+        ])
+        Notification.objects.bulk_create(
+            [Notification(user=user, title='Info', message='-') for user in users] +
+            [Notification(user=self.admin, title=f'Info {i}', message='-') for i in indexes]
+        )
+        JobPosting.objects.bulk_create([
+            JobPosting(
+                title=f'Lowongan {i}', company_name=f'PT {i}', description='-', requirements='-',
+                location='Jakarta', application_deadline=timezone.now().date() + datetime.timedelta(days=30),
+                created_by=self.admin
+            )
+            for i in indexes
+            if i % 10 == 0
+        ])
+        self.size = size
+
+
+class QueryCountMixin:
+    """
+    Assertions that a view's query count does not grow with the dataset.
+
+    Subclasses must be django.test.TestCase and set up self.cohort.
+    """
+
+    def measure(self, client, url, data=None):
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(url, data or {})
+        self.assertEqual(
+            response.status_code, 200,
+            f"GET {url} returned {response.status_code}"
+        )
+        return Counter(fingerprint(query['sql']) for query in context.captured_queries)
+
+    def assertConstantQueries(self, user, url, data=None, max_queries=None, sizes=COHORT_SIZES):
+        """
+        Request url at every cohort size and fail if the query count changes
+        (or exceeds max_queries), reporting the SQL fingerprints that grew.
+        """
+        client = Client()
+        client.force_login(user)
+
+        # Warm-up request: session and content type caches are filled once
+        self.cohort.grow_to(sizes[0])
+        self.measure(client, url, data)
+
+        measurements = []
+        for size in sizes:
+            self.cohort.grow_to(size)
+            measurements.append((size, self.measure(client, url, data)))
+
+        base_size, base = measurements[0]
+        for size, fingerprints in measurements:
+            total = sum(fingerprints.values())
+            if max_queries is not None and total > max_queries:
+                self.fail(
+                    f"GET {url} ran {total} queries at {size} students (budget {max_queries}):\n"
+                    + format_fingerprints(fingerprints)
+                )
+            if total != sum(base.values()):
+                grown = fingerprints - base
+                self.fail(
+                    f"GET {url} ran {sum(base.values())} queries at {base_size} students "
+                    f"but {total} at {size} students. Queries that grew:\n"
+                    + format_fingerprints(grown)
+                )
+        return sum(base.values())
+
+
+def format_fingerprints(fingerprints):
+    return '\n'.join(f"  {n}x {sql}" for sql, n in fingerprints.most_common())
@@ -36,9 +36,18 @@ urlpatterns = [
     path("weekly-reports/", views.weekly_report_list, name="weekly_report_list"),
     path("admin/weekly-reports/", views.admin_weekly_reports, name="admin_weekly_reports"),
     path("admin/deadline-reminder/", views.manage_deadline_reminder, name="manage_deadline_reminder"),
+    path("admin/query-budget/", views.query_budget_report, name="query_budget_report"),
 
     # Notifications
     path("notifications/get/", views.get_notifications, name="get_notifications"),
+    path("notifications/history/", views.notification_history, name="notification_history"),
     path("notifications/<int:notification_id>/read/", views.mark_notification_read, name="mark_notification_read"),
     path("notifications/mark-all-read/", views.mark_all_notifications_read, name="mark_all_notifications_read"),
+    path("notifications/broadcast/<int:broadcast_id>/read/", views.mark_broadcast_read, name="mark_broadcast_read"),
+    path("notifications/stream/", views.notifications_stream, name="notifications_stream"),
+
+    # Upload file ke Firebase (antrian di belakang layar)
+    path("uploads/<int:upload_id>/status/", views.upload_status, name="upload_status"),
+    path("uploads/direct/", views.direct_upload_start, name="direct_upload_start"),
+    path("uploads/<int:upload_id>/complete/", views.direct_upload_complete, name="direct_upload_complete"),
 ]
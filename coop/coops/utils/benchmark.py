@@ -0,0 +1,284 @@
+import json
+import logging
+import platform
+import statistics
+import time
+import tracemalloc
+import django
+from django.db import connection
+from django.test import Client
+from django.urls import URLPattern, URLResolver, get_resolver, reverse
+from django.utils import timezone
+from accounts.models import User, Kaprodi
+from jobs.models import JobPosting, JobApplication
+from ..models import KonfirmasiMagang, EvaluasiSupervisor, SertifikatCoop
+from .query_budget import QueryRecorder
+
+
+# Namespace URL yang dibenchmark
+BENCHMARK_NAMESPACES = ('coops', 'jobs', 'accounts')
+BENCHMARK_ROLES = ('admin', 'supervisor', 'kaprodi', 'mahasiswa')
+
+# URL yang tidak diukur: mengakhiri sesi, butuh token sekali pakai, atau stream tanpa akhir
+SKIP_URL_NAMES = {'accounts:logout', 'accounts:password_reset_confirm', 'coops:notifications_stream'}
+# Endpoint yang mengubah data lewat GET: dengan --current-db benchmark akan
+# menandai notifikasi user sungguhan sebagai sudah dibaca
+MUTATING_URL_NAMES = {'coops:mark_notification_read', 'coops:mark_broadcast_read'}
+
+DEFAULT_THRESHOLD = 0.20
+# Perubahan di bawah ini dianggap noise, berapapun persentasenya
+MIN_REGRESSION_MS = 2.0
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of a non-empty list"""
+    ordered = sorted(values)
+    index = max(int(round(pct / 100 * len(ordered))) - 1, 0)
+    return ordered[index]
+
+
+def iter_url_patterns(namespaces=BENCHMARK_NAMESPACES):
+    """
+    Yield (view_name, route_kwarg_names) for every named URL in the given namespaces.
+
+    Duplicate view names (e.g. accounts '' and 'login/') are yielded once.
+    """
+    seen = set()
+    for entry in get_resolver().url_patterns:
+        if not isinstance(entry, URLResolver) or entry.namespace not in namespaces:
+            continue
+        for pattern in entry.url_patterns:
+            if not isinstance(pattern, URLPattern) or not pattern.name:
+                continue
+            view_name = f'{entry.namespace}:{pattern.name}'
+            if view_name in seen or view_name in SKIP_URL_NAMES or view_name in MUTATING_URL_NAMES:
+                continue
+            seen.add(view_name)
+            yield view_name, list(pattern.pattern.converters)
+
+
+class BenchmarkFixture:
+    """
+    Pick one representative user per role and sample ids for URL arguments.
+
+    The mahasiswa has an accepted internship; the supervisor and kaprodi
+    are the ones responsible for that mahasiswa, so every dashboard has data.
+    A role without a matching user (e.g. no Kaprodi for that jurusan) is None.
+    """
+
+    def __init__(self):
+        konfirmasi = KonfirmasiMagang.objects.filter(
+            status='accepted', supervisor_user__isnull=False
+        ).select_related('mahasiswa__mahasiswa').order_by('id').first()
+        if konfirmasi is None:
+            raise ValueError("Dataset has no accepted KonfirmasiMagang with a supervisor account")
+
+        jurusan = konfirmasi.mahasiswa.mahasiswa.jurusan
+        kaprodi = Kaprodi.objects.filter(jurusan=jurusan).select_related('user').first()
+        self.users = {
+            'admin': User.objects.filter(role='admin').order_by('id').first(),
+            'supervisor': konfirmasi.supervisor_user,
+            'kaprodi': kaprodi.user if kaprodi else None,
+            'mahasiswa': konfirmasi.mahasiswa,
+        }
+
+        evaluasi = EvaluasiSupervisor.objects.filter(konfirmasi=konfirmasi).order_by('id').first()
+        application = JobApplication.objects.order_by('id').first()
+        sertifikat = SertifikatCoop.objects.order_by('id').first()
+        self.kwargs = {
+            'konfirmasi_id': konfirmasi.id,
+            'template_id': evaluasi.template_id if evaluasi else None,
+            'job_id': JobPosting.objects.order_by('id').values_list('id', flat=True).first(),
+            'application_id': application.id if application else None,
+            'sertifikat_id': sertifikat.id if sertifikat else None,
+            'bulan': timezone.now().strftime('%Y-%m'),
+        }
+
+    def url_for(self, view_name, kwarg_names):
+        """Reverse a URL with sample kwargs, or None when a sample is missing"""
+        kwargs = {name: self.kwargs.get(name) for name in kwarg_names}
+        if any(value is None for value in kwargs.values()):
+            return None
+        return reverse(view_name, kwargs=kwargs)
+
+
+def measure_view(client, url, repeat):
+    """
+    Request url repeat times (after one warm-up) and summarise.
+
+    Returns:
+        dict: status, p50_ms, p95_ms, mean_ms, queries, peak_memory_kb
+    """
+    client.get(url)
+
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        response = client.get(url)
+        timings.append((time.perf_counter() - start) * 1000)
+
+    # Query count and memory are measured on separate runs so they do not distort the timings
+    with QueryRecorder() as recorder:
+        client.get(url)
+
+    tracemalloc.start()
+    try:
+        client.get(url)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        'status': response.status_code,
+        'p50_ms': round(percentile(timings, 50), 2),
+        'p95_ms': round(percentile(timings, 95), 2),
+        'mean_ms': round(statistics.mean(timings), 2),
+        'queries': recorder.count,
+        'peak_memory_kb': round(peak / 1024, 1),
+    }
+
+
+def run_benchmark(repeat=10, roles=BENCHMARK_ROLES, only=None, progress=None):
+    """
+    Benchmark every coops/jobs/accounts URL as each role.
+
+    Args:
+        repeat: Timed requests per (URL, role)
+        roles: Roles to log in as
+        only: Optional substring filter on view names
+        progress: Optional callable(key, result) called after each measurement
+
+    Returns:
+        dict: {'meta': {...}, 'results': {'<view_name> [<role>]': {...}}}
+            meta['skipped_roles'] lists roles without a user in the dataset
+    """
+    fixture = BenchmarkFixture()
+    results = {}
+    skipped = []
+    skipped_roles = [role for role in roles if fixture.users.get(role) is None]
+    roles = [role for role in roles if role not in skipped_roles]
+
+    # View yang error/403 sudah tercatat di hasil; traceback di log hanya jadi noise
+    request_logger = logging.getLogger('django.request')
+    previous_level = request_logger.level
+    request_logger.setLevel(logging.CRITICAL)
+    try:
+        for view_name, kwarg_names in iter_url_patterns():
+            if only and only not in view_name:
+                continue
+            url = fixture.url_for(view_name, kwarg_names)
+            if url is None:
+                skipped.append(view_name)
+                continue
+            for role in roles:
+                # Login ulang per URL: beberapa view bisa mengubah sesi.
+                # View yang error dicatat sebagai status 500, benchmark tetap lanjut.
+                client = Client(raise_request_exception=False)
+                client.force_login(fixture.users[role])
+                key = f'{view_name} [{role}]'
+                results[key] = {'url': url, **measure_view(client, url, repeat)}
+                if progress:
+                    progress(key, results[key])
+    finally:
+        request_logger.setLevel(previous_level)
+
+    return {
+        'meta': {
+            'created_at': timezone.now().isoformat(),
+            'repeat': repeat,
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'database': connection.vendor,
+            'students': User.objects.filter(role='mahasiswa').count(),
+            'skipped': skipped,
+            'skipped_roles': skipped_roles,
+        },
+        'results': results,
+    }
+
+
+def compare_results(baseline, current, threshold=DEFAULT_THRESHOLD):
+    """
+    Compare two benchmark results.
+
+    A view regresses when p50 or p95 grows by more than ``threshold``
+    (fraction, e.g. 0.2 = 20%) and by at least MIN_REGRESSION_MS, or when
+    it runs more queries.
+
+    Returns:
+        list: [{'key', 'metric', 'baseline', 'current', 'change'}] for each regression
+    """
+    regressions = []
+    for key, now in current['results'].items():
+        before = baseline['results'].get(key)
+        if before is None or before['status'] != now['status']:
+            continue
+        for metric in ('p50_ms', 'p95_ms'):
+            delta = now[metric] - before[metric]
+            if before[metric] > 0 and delta >= MIN_REGRESSION_MS and delta / before[metric] > threshold:
+                regressions.append({
+                    'key': key, 'metric': metric, 'baseline': before[metric], 'current': now[metric],
+                    'change': f"+{delta / before[metric]:.0%}",
+                })
+        if now['queries'] > before['queries']:
+            regressions.append({
+                'key': key, 'metric': 'queries', 'baseline': before['queries'], 'current': now['queries'],
+                'change': f"+{now['queries'] - before['queries']}",
+            })
+    return regressions
+
+
+def load_results(path):
+    with open(path) as f:
+        return json.load(f)
+
+
+def save_results(results, path):
+    with open(path, 'w') as f:
+        json.dump(results, f, indent=2, sort_keys=True)
+
+
+def sample_certificate():
+    """Unsaved SertifikatCoop with every field the certificate renders (no database needed)"""
+    import datetime
+    from accounts.models import Mahasiswa
+
+    user = User(username='benchmark', first_name='Benchmark', last_name='Mahasiswa Sertifikat', role='mahasiswa')
+    user.mahasiswa = Mahasiswa(nim='10000000001', prodi='Software Engineering', nama=user.get_full_name())
+    konfirmasi = KonfirmasiMagang(
+        mahasiswa=user, nama_perusahaan='PT Benchmark Indonesia', posisi='Software Engineer Intern',
+        periode_awal=datetime.date(2025, 1, 6), periode_akhir=datetime.date(2025, 6, 27),
+    )
+    return SertifikatCoop(
+        konfirmasi=konfirmasi, nomor_sertifikat='COOP/2025/0001', nilai_akhir='A',
+        tanggal_kelulusan=datetime.date(2025, 7, 1), status='issued',
+    )
+
+
+def benchmark_certificate_render(repeat=200):
+    """
+    Micro-benchmark CertificateGenerator.generate_pdf with and without the static layer.
+
+    Returns:
+        dict: {mode: {'p50_ms', 'p95_ms', 'mean_ms', 'certs_per_second', 'bytes'}}
+    """
+    from ..certificate_generator import CertificateGenerator
+
+    sertifikat = sample_certificate()
+    results = {}
+    for mode, use_static_layer in (('static_layer', True), ('direct', False)):
+        # Warm-up: static layer dikompilasi di sini, bukan di pengukuran
+        size = len(CertificateGenerator(sertifikat, use_static_layer).generate_pdf().getvalue())
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            CertificateGenerator(sertifikat, use_static_layer).generate_pdf()
+            timings.append((time.perf_counter() - start) * 1000)
+        results[mode] = {
+            'p50_ms': round(percentile(timings, 50), 3),
+            'p95_ms': round(percentile(timings, 95), 3),
+            'mean_ms': round(statistics.mean(timings), 3),
+            'certs_per_second': int(1000 / statistics.mean(timings)),
+            'bytes': size,
+        }
+    return results
@@ -0,0 +1,141 @@
+import multiprocessing
+import os
+import zipfile
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from django.core.files.base import ContentFile
+from .certificate_cache import certificate_cache_name, certificate_fingerprint, get_certificate_storage
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Render yang sedang berjalan per worker; membatasi PDF yang menunggu di memori
+IN_FLIGHT_PER_WORKER = 4
+
+
+def _init_worker():
+    # Worker di-spawn (bukan fork) supaya tidak mewarisi koneksi database proses induk;
+    # worker hanya butuh settings, tidak pernah membuka koneksi database
+    import django
+    django.setup()
+
+
+def _render(sertifikat):
+    from ..certificate_generator import CertificateGenerator
+    return CertificateGenerator(sertifikat).generate_pdf().getvalue()
+
+
+def certificate_filename(sertifikat):
+    return f"Sertifikat_COOP_{sertifikat.nomor_sertifikat.replace('/', '_')}.pdf"
+
+
+class _ZipStream:
+    """Write-only file object that hands out what zipfile has written so far"""
+
+    def __init__(self):
+        self.chunks = []
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def pop(self):
+        data = b''.join(self.chunks)
+        self.chunks.clear()
+        return data
+
+
+class CertificateBatch:
+    """
+    Render many certificates in parallel worker processes and package them as one ZIP.
+
+    Certificate data is loaded once in the calling process; workers only
+    render. PDFs already in the certificate cache are reused, new renders
+    are stored there. At most ``workers * IN_FLIGHT_PER_WORKER`` PDFs are
+    held in memory at any time, whatever the batch size.
+    """
+
+    def __init__(self, queryset, workers=None, progress=None):
+        """
+        Args:
+            queryset: SertifikatCoop queryset to export
+            workers: Worker processes (default: all cores; 1 renders in-process)
+            progress: Optional callable(done, total) called after each certificate
+        """
+        self.sertifikats = list(queryset.select_related('konfirmasi__mahasiswa__mahasiswa').order_by('id'))
+        self.workers = workers or os.cpu_count() or 1
+        self.progress = progress
+
+    def __len__(self):
+        return len(self.sertifikats)
+
+    def iter_pdfs(self):
+        """Yield (filename, pdf bytes) in queryset order"""
+        storage = get_certificate_storage()
+        total = len(self.sertifikats)
+        window = self.workers * IN_FLIGHT_PER_WORKER
+        pool = None
+        if self.workers > 1 and total > 1:
+            pool = ProcessPoolExecutor(
+                max_workers=min(self.workers, total),
+                mp_context=multiprocessing.get_context('spawn'),
+                initializer=_init_worker,
+            )
+
+        pending = deque()
+        done = 0
+        try:
+            for sertifikat in self.sertifikats:
+                name = certificate_cache_name(sertifikat.konfirmasi_id, certificate_fingerprint(sertifikat))
+                if storage.exists(name):
+                    job = None
+                elif pool is not None:
+                    job = pool.submit(_render, sertifikat)
+                else:
+                    job = _render(sertifikat)
+                pending.append((sertifikat, name, job))
+
+                while len(pending) >= window:
+                    done += 1
+                    yield self._finish(storage, *pending.popleft(), done, total)
+
+            while pending:
+                done += 1
+                yield self._finish(storage, *pending.popleft(), done, total)
+        finally:
+            if pool is not None:
+                pool.shutdown(cancel_futures=True)
+
+    def _finish(self, storage, sertifikat, name, job, done, total):
+        if job is None:
+            try:
+                with storage.open(name, 'rb') as f:
+                    data = f.read()
+            except FileNotFoundError:
+                # Dihapus oleh invalidation sejak exists(): render ulang di sini
+                data = _render(sertifikat)
+        else:
+            data = job if isinstance(job, bytes) else job.result()
+            if not storage.exists(name):
+                storage.save(name, ContentFile(data))
+        if self.progress:
+            self.progress(done, total)
+        return certificate_filename(sertifikat), data
+
+    def write_zip(self, fileobj):
+        """Write the ZIP to a file object (or path); PDFs are written one at a time"""
+        with zipfile.ZipFile(fileobj, 'w', compression=zipfile.ZIP_DEFLATED) as archive:
+            for filename, data in self.iter_pdfs():
+                archive.writestr(filename, data)
+
+    def stream_zip(self):
+        """Yield the ZIP as byte chunks, one per certificate, for StreamingHttpResponse"""
+        buffer = _ZipStream()
+        with zipfile.ZipFile(buffer, 'w', compression=zipfile.ZIP_DEFLATED) as archive:
+            for filename, data in self.iter_pdfs():
+                archive.writestr(filename, data)
+                yield buffer.pop()
+        yield buffer.pop()
@@ -0,0 +1,151 @@
+import hashlib
+import json
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import storages
+from django.db import transaction
+from django.utils import timezone
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Nama storage di settings.STORAGES untuk PDF sertifikat yang sudah dirender
+CERTIFICATE_STORAGE = 'certificates'
+
+
+def get_certificate_storage():
+    return storages[CERTIFICATE_STORAGE]
+
+
+def certificate_fields(sertifikat):
+    """
+    Every value that ends up in the rendered PDF (plus status).
+
+    Expects sertifikat with konfirmasi__mahasiswa__mahasiswa selected.
+    """
+    from ..certificate_generator import CertificateGenerator
+
+    konfirmasi = sertifikat.konfirmasi
+    user = konfirmasi.mahasiswa
+    try:
+        mahasiswa = user.mahasiswa
+        nim, prodi = mahasiswa.nim, mahasiswa.prodi
+    except Exception:
+        nim, prodi = None, None
+
+    return {
+        'layout': CertificateGenerator.LAYOUT_VERSION,
+        'brand': [settings.BRAND_PRIMARY_COLOR, settings.BRAND_SECONDARY_COLOR, settings.BRAND_SUCCESS_COLOR],
+        'nomor_sertifikat': sertifikat.nomor_sertifikat,
+        'nilai_akhir': sertifikat.nilai_akhir,
+        'status': sertifikat.status,
+        'tanggal_kelulusan': sertifikat.tanggal_kelulusan.isoformat(),
+        'nama': user.get_full_name(),
+        'username': user.username,
+        'nim': nim,
+        'prodi': prodi,
+        'nama_perusahaan': konfirmasi.nama_perusahaan,
+        'posisi': konfirmasi.posisi,
+        'periode_awal': konfirmasi.periode_awal.isoformat() if konfirmasi.periode_awal else None,
+        'periode_akhir': konfirmasi.periode_akhir.isoformat() if konfirmasi.periode_akhir else None,
+    }
+
+
+def certificate_fingerprint(sertifikat):
+    """SHA-256 of the certificate's rendered fields: any change produces a new key (and ETag)"""
+    payload = json.dumps(certificate_fields(sertifikat), sort_keys=True)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def certificate_cache_name(konfirmasi_id, fingerprint):
+    # Dikelompokkan per konfirmasi (satu sertifikat per konfirmasi) agar
+    # perubahan KonfirmasiMagang bisa membuang cache tanpa query tambahan
+    return f'{konfirmasi_id}/{fingerprint}.pdf'
+
+
+def get_cached_certificate(sertifikat):
+    """
+    Return the cached PDF for a certificate, rendering and storing it on a miss.
+
+    Returns:
+        tuple: (storage name, fingerprint)
+    """
+    from ..certificate_generator import CertificateGenerator
+
+    storage = get_certificate_storage()
+    fingerprint = certificate_fingerprint(sertifikat)
+    name = certificate_cache_name(sertifikat.konfirmasi_id, fingerprint)
+    if not storage.exists(name):
+        pdf = CertificateGenerator(sertifikat).generate_pdf()
+        # Render paralel untuk sertifikat yang sama menghasilkan isi identik; yang pertama disimpan
+        if not storage.exists(name):
+            saved_name = storage.save(name, ContentFile(pdf.getvalue()))
+            if saved_name != name:
+                storage.delete(saved_name)
+    return name, fingerprint
+
+
+def open_cached_certificate(sertifikat):
+    """
+    Open the cached PDF of a certificate, rendering it on a miss.
+
+    An invalidation in another request can remove the file between the
+    existence check and open(); it is then rendered once more.
+
+    Returns:
+        tuple: (open binary file, fingerprint, modified datetime)
+    """
+    storage = get_certificate_storage()
+    for attempt in range(2):
+        name, fingerprint = get_cached_certificate(sertifikat)
+        try:
+            pdf = storage.open(name, 'rb')
+        except FileNotFoundError:
+            if attempt:
+                raise
+            continue
+        try:
+            modified = storage.get_modified_time(name)
+        except FileNotFoundError:
+            # Sudah terbuka: isinya tetap bisa dibaca, waktu diambil saat ini
+            modified = timezone.now()
+        return pdf, fingerprint, modified
+
+
+def _delete_cached_certificates(konfirmasi_id):
+    from ..models import SertifikatCoop
+
+    storage = get_certificate_storage()
+    try:
+        _, files = storage.listdir(str(konfirmasi_id))
+    except FileNotFoundError:
+        return
+    # PDF untuk isi sertifikat saat ini tetap disimpan: unduhan yang sedang berjalan memakainya
+    sertifikat = SertifikatCoop.objects.select_related(
+        'konfirmasi__mahasiswa__mahasiswa'
+    ).filter(konfirmasi_id=konfirmasi_id).first()
+    current = f'{certificate_fingerprint(sertifikat)}.pdf' if sertifikat else None
+    for filename in files:
+        if filename != current:
+            storage.delete(f'{konfirmasi_id}/{filename}')
+
+
+def invalidate_certificate_cache(konfirmasi_ids):
+    """
+    Remove cached certificate PDFs of the given KonfirmasiMagang ids after commit.
+
+    Stale PDFs are never served anyway (the key changes with the fields);
+    this only frees the storage. The PDF matching the current fields is kept.
+    """
+    konfirmasi_ids = list(konfirmasi_ids)
+    if not konfirmasi_ids:
+        return
+
+    def delete():
+        for konfirmasi_id in konfirmasi_ids:
+            try:
+                _delete_cached_certificates(konfirmasi_id)
+            except Exception as e:
+                logger.error(f"Failed to delete cached certificate for konfirmasi {konfirmasi_id}: {str(e)}")
+
+    transaction.on_commit(delete)
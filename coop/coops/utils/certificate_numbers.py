@@ -0,0 +1,109 @@
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+from ..models import NomorSertifikatCounter, SertifikatCoop
+from .certificate_verification import invalidate_verification
+import logging
+
+logger = logging.getLogger(__name__)
+
+BULK_BATCH_SIZE = 1000
+
+
+def format_nomor_sertifikat(year, number):
+    return f"COOP/{year}/{number:04d}/UTS"
+
+
+def _highest_issued_number(year):
+    """Highest number already used in the year (counter seed for certificates numbered before the counter existed)"""
+    highest = 0
+    prefix = f"COOP/{year}/"
+    for nomor in SertifikatCoop.objects.filter(nomor_sertifikat__startswith=prefix).values_list('nomor_sertifikat', flat=True):
+        number = nomor[len(prefix):].split('/')[0]
+        if number.isdigit():
+            highest = max(highest, int(number))
+    return highest
+
+
+def reserve_certificate_numbers(count=1, year=None):
+    """
+    Reserve a block of consecutive certificate numbers for the year.
+
+    The block is claimed with one UPDATE ... SET last_number = last_number + count
+    on the year's counter row, which row-locks it until the surrounding
+    transaction ends, so concurrent callers always get disjoint blocks.
+    Numbers of a rolled back transaction are handed out again; numbers that
+    are reserved but never saved leave a gap.
+
+    Args:
+        count: Size of the block
+        year: Year of the sequence (default: current year)
+
+    Returns:
+        range: The reserved numbers
+    """
+    year = year or timezone.localdate().year
+    counter = NomorSertifikatCounter.objects.filter(year=year)
+    with transaction.atomic():
+        if not counter.update(last_number=F('last_number') + count):
+            # Baris counter tahun ini belum ada: buat (sekali per tahun), lalu klaim seperti biasa
+            NomorSertifikatCounter.objects.bulk_create(
+                [NomorSertifikatCounter(year=year, last_number=_highest_issued_number(year))],
+                ignore_conflicts=True,
+            )
+            counter.update(last_number=F('last_number') + count)
+        last_number = counter.values_list('last_number', flat=True).get()
+    return range(last_number - count + 1, last_number + 1)
+
+
+def allocate_nomor_sertifikat(count=1, year=None):
+    """
+    Reserve count certificate numbers.
+
+    Returns:
+        list: Formatted numbers, e.g. ['COOP/2025/0001/UTS']
+    """
+    year = year or timezone.localdate().year
+    return [format_nomor_sertifikat(year, number) for number in reserve_certificate_numbers(count, year)]
+
+
+def issue_certificates(konfirmasi_qs, nilai_akhir='A', issued_by=None):
+    """
+    Create issued certificates for every completed internship in konfirmasi_qs that has none yet.
+
+    Numbers are reserved as one block in their own short transaction and the
+    certificates are bulk inserted afterwards, so several batches (e.g. one
+    per prodi) can run in parallel without waiting on each other or retrying.
+
+    Args:
+        konfirmasi_qs: KonfirmasiMagang queryset
+        nilai_akhir: Grade for the new certificates
+        issued_by: Admin user recorded as dikeluarkan_oleh
+
+    Returns:
+        int: Number of certificates created
+    """
+    konfirmasi_ids = list(
+        konfirmasi_qs.filter(status='completed', sertifikat__isnull=True).order_by('id').values_list('id', flat=True)
+    )
+    if not konfirmasi_ids:
+        return 0
+
+    numbers = allocate_nomor_sertifikat(len(konfirmasi_ids))
+    sertifikats = [
+        SertifikatCoop(
+            konfirmasi_id=konfirmasi_id, nomor_sertifikat=nomor, nilai_akhir=nilai_akhir,
+            dikeluarkan_oleh=issued_by, status='issued',
+        )
+        for konfirmasi_id, nomor in zip(konfirmasi_ids, numbers)
+    ]
+    scope = SertifikatCoop.objects.filter(konfirmasi_id__in=konfirmasi_ids)
+    with transaction.atomic():
+        # Konfirmasi yang sertifikatnya dibuat batch lain di antara query di atas dan insert ini dilewati
+        SertifikatCoop.objects.bulk_create(sertifikats, batch_size=BULK_BATCH_SIZE, ignore_conflicts=True)
+        created = scope.filter(nomor_sertifikat__in=numbers).count()
+        # bulk_create tidak memanggil save(): hapus hasil "tidak ditemukan" yang mungkin sudah di-cache
+        invalidate_verification(numbers)
+
+    logger.info(f"Issued {created} certificates ({numbers[0]} .. {numbers[-1]})")
+    return created
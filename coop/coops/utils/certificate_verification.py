@@ -0,0 +1,78 @@
+import hashlib
+from django.core.cache import cache
+from django.db import transaction
+from .shared_cache import cache_ttl
+
+# Hasil verifikasi (termasuk "tidak ditemukan") disimpan di cache per nomor sertifikat.
+# Perubahan status menghapus entri saat commit; TTL hanya membatasi umur data
+# deskriptif (nama, perusahaan) yang berubah tanpa menyentuh sertifikat.
+VERIFY_CACHE_TTL = 60 * 60
+VERIFY_NEGATIVE_CACHE_TTL = 5 * 60
+
+# Batas umur respons di cache HTTP (browser/CDN), yang tidak bisa di-invalidate:
+# selama ini sertifikat yang baru dicabut masih bisa terlihat valid
+VERIFY_HTTP_MAX_AGE = 60
+
+# Panjang maksimum SertifikatCoop.nomor_sertifikat; input lebih panjang tidak mungkin ada
+MAX_NOMOR_LENGTH = 50
+
+
+def verification_cache_key(nomor_sertifikat):
+    # Nomor berasal dari URL publik: di-hash agar key selalu aman dan pendek
+    return f'certificate:verify:{hashlib.sha256(nomor_sertifikat.encode()).hexdigest()}'
+
+
+def _lookup(nomor_sertifikat):
+    from ..models import SertifikatCoop
+
+    sertifikat = SertifikatCoop.objects.select_related(
+        'konfirmasi__mahasiswa__mahasiswa'
+    ).filter(nomor_sertifikat=nomor_sertifikat).first()
+    if sertifikat is None:
+        return {'found': False, 'nomor_sertifikat': nomor_sertifikat}
+
+    konfirmasi = sertifikat.konfirmasi
+    user = konfirmasi.mahasiswa
+    try:
+        prodi = user.mahasiswa.prodi
+    except Exception:
+        prodi = None
+
+    return {
+        'found': True,
+        'valid': sertifikat.status == 'issued',
+        'status': sertifikat.status,
+        'nomor_sertifikat': sertifikat.nomor_sertifikat,
+        'nama': user.get_full_name() or user.username,
+        'prodi': prodi,
+        'nama_perusahaan': konfirmasi.nama_perusahaan,
+        'posisi': konfirmasi.posisi,
+        'periode_awal': konfirmasi.periode_awal.isoformat() if konfirmasi.periode_awal else None,
+        'periode_akhir': konfirmasi.periode_akhir.isoformat() if konfirmasi.periode_akhir else None,
+        'tanggal_kelulusan': sertifikat.tanggal_kelulusan.isoformat(),
+    }
+
+
+def get_verification(nomor_sertifikat):
+    """
+    Public verification data for a certificate number, cached (also when not found).
+
+    Returns:
+        dict: {'found': False, 'nomor_sertifikat'} or {'found': True, 'valid', 'status', 'nama', ...}
+    """
+    if len(nomor_sertifikat) > MAX_NOMOR_LENGTH:
+        return {'found': False, 'nomor_sertifikat': nomor_sertifikat}
+
+    key = verification_cache_key(nomor_sertifikat)
+    result = cache.get(key)
+    if result is None:
+        result = _lookup(nomor_sertifikat)
+        cache.set(key, result, cache_ttl(VERIFY_CACHE_TTL if result['found'] else VERIFY_NEGATIVE_CACHE_TTL))
+    return result
+
+
+def invalidate_verification(nomor_sertifikats):
+    """Drop cached verification results (positive and negative) after commit"""
+    keys = [verification_cache_key(nomor) for nomor in nomor_sertifikats if nomor]
+    if keys:
+        transaction.on_commit(lambda: cache.delete_many(keys))
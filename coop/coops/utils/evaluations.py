@@ -0,0 +1,115 @@
+from django.db import transaction
+from django.db.models import Count
+from ..models import KonfirmasiMagang, EvaluasiTemplate, EvaluasiSupervisor
+import logging
+
+logger = logging.getLogger(__name__)
+
+BULK_BATCH_SIZE = 1000
+
+
+def provision_evaluations(konfirmasi_qs=None, templates=None):
+    """
+    Create the missing EvaluasiSupervisor rows for accepted internships.
+
+    Every accepted KonfirmasiMagang must have one evaluation per active
+    template. Missing pairs are inserted with a single conflict-ignoring
+    bulk insert, so running this concurrently or repeatedly is safe.
+
+    Call it when a student is accepted or a template is activated; read
+    paths (e.g. the supervisor dashboard) should never write.
+
+    Args:
+        konfirmasi_qs: KonfirmasiMagang queryset to provision
+            (default: every accepted internship)
+        templates: EvaluasiTemplate queryset or list
+            (default: every active template)
+
+    Returns:
+        int: Number of evaluation rows created
+    """
+    if konfirmasi_qs is None:
+        konfirmasi_qs = KonfirmasiMagang.objects.all()
+
+    konfirmasi_ids = list(konfirmasi_qs.filter(status='accepted').values_list('id', flat=True))
+    if templates is None:
+        template_ids = list(EvaluasiTemplate.objects.filter(aktif=True).values_list('id', flat=True))
+    else:
+        template_ids = [template.id for template in templates if template.aktif]
+    if not konfirmasi_ids or not template_ids:
+        return 0
+
+    scope = EvaluasiSupervisor.objects.filter(
+        konfirmasi_id__in=konfirmasi_ids,
+        template_id__in=template_ids,
+    )
+
+    with transaction.atomic():
+        existing = set(scope.values_list('konfirmasi_id', 'template_id'))
+        missing = [
+            EvaluasiSupervisor(konfirmasi_id=konfirmasi_id, template_id=template_id, status='pending', jawaban={})
+            for konfirmasi_id in konfirmasi_ids
+            for template_id in template_ids
+            if (konfirmasi_id, template_id) not in existing
+        ]
+        if not missing:
+            return 0
+
+        EvaluasiSupervisor.objects.bulk_create(missing, batch_size=BULK_BATCH_SIZE, ignore_conflicts=True)
+        # ignore_conflicts hides rows inserted concurrently by another worker,
+        # so count what actually exists now instead of trusting len(missing)
+        created = scope.count() - len(existing)
+
+    logger.info(f"Provisioned {created} evaluations for {len(konfirmasi_ids)} internships x {len(template_ids)} templates")
+    return created
+
+
+def evaluation_summary(konfirmasi_qs):
+    """
+    Summarise evaluation progress for a set of internships in one grouped query.
+
+    Args:
+        konfirmasi_qs: KonfirmasiMagang queryset (e.g. everything a supervisor oversees)
+
+    Returns:
+        dict: {
+            'per_konfirmasi': {konfirmasi_id: {'total': int, 'completed': int}},
+            'pending': int, 'completed': int,   # over all given internships
+            'jenis': {'uts': {'total', 'completed', 'percent'}, 'uas': {...}},
+                                                # accepted internships only
+        }
+    """
+    rows = EvaluasiSupervisor.objects.filter(
+        konfirmasi__in=konfirmasi_qs
+    ).values(
+        'konfirmasi_id', 'konfirmasi__status', 'template__jenis', 'status'
+    ).annotate(n=Count('id')).order_by()
+
+    summary = {
+        'per_konfirmasi': {},
+        'pending': 0,
+        'completed': 0,
+        'jenis': {jenis: {'total': 0, 'completed': 0, 'percent': 0} for jenis in ('uts', 'uas')},
+    }
+    for row in rows:
+        n = row['n']
+        is_completed = row['status'] == 'completed'
+
+        counts = summary['per_konfirmasi'].setdefault(row['konfirmasi_id'], {'total': 0, 'completed': 0})
+        counts['total'] += n
+        if is_completed:
+            counts['completed'] += n
+
+        if row['status'] in ('pending', 'completed'):
+            summary[row['status']] += n
+
+        jenis = summary['jenis'].get(row['template__jenis'])
+        if jenis is not None and row['konfirmasi__status'] == 'accepted':
+            jenis['total'] += n
+            if is_completed:
+                jenis['completed'] += n
+
+    for jenis in summary['jenis'].values():
+        jenis['percent'] = int((jenis['completed'] / jenis['total']) * 100) if jenis['total'] else 0
+
+    return summary
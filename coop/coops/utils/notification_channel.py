@@ -0,0 +1,212 @@
+import asyncio
+import json
+import threading
+from django.conf import settings
+from django.utils.module_loading import import_string
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Komentar heartbeat menjaga koneksi tetap hidup melewati proxy/load balancer
+STREAM_HEARTBEAT_SECONDS = 15
+# Stream ditutup berkala; browser reconnect otomatis dengan Last-Event-ID
+STREAM_MAX_SECONDS = 30 * 60
+STREAM_RETRY_MS = 5000
+# Maksimal notifikasi yang dikirim ulang saat reconnect
+STREAM_REPLAY_LIMIT = 50
+# "User" khusus: event yang dikirim ke sini diterima semua stream (pengumuman)
+BROADCAST_TOPIC = 'all'
+
+
+class NotificationChannel:
+    """
+    Fan-out channel between code that creates notifications and open SSE streams.
+
+    publish() is called from normal (sync) Django code after a commit;
+    subscribe() is used by the async stream view and yields event dicts
+    ({'event': str, 'data': dict, 'id': optional}) for one user, plus
+    everything published to BROADCAST_TOPIC.
+    """
+
+    def publish(self, user_id, event):
+        raise NotImplementedError
+
+    def subscribe(self, user_id):
+        """Return an async context manager yielding an async iterator of events"""
+        raise NotImplementedError
+
+
+class _InProcessSubscription:
+    def __init__(self, channel, user_id):
+        self.channel = channel
+        self.user_id = user_id
+        self.loop = None
+        self.queue = None
+
+    async def __aenter__(self):
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(maxsize=self.channel.max_queue_size)
+        with self.channel.lock:
+            self.channel.subscribers.setdefault(self.user_id, set()).add(self)
+        return self
+
+    async def __aexit__(self, *exc_info):
+        with self.channel.lock:
+            subscribers = self.channel.subscribers.get(self.user_id, set())
+            subscribers.discard(self)
+            if not subscribers:
+                self.channel.subscribers.pop(self.user_id, None)
+
+    def deliver(self, event):
+        # Dipanggil dari thread lain (view sync), jadi lewat event loop milik subscriber
+        def put():
+            try:
+                self.queue.put_nowait(event)
+            except asyncio.QueueFull:
+                logger.warning(f"Notification stream for user {self.user_id} is too slow, dropping event")
+        try:
+            self.loop.call_soon_threadsafe(put)
+        except RuntimeError:
+            # Event loop sudah ditutup (server shutdown)
+            pass
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        return await self.queue.get()
+
+
+class InProcessChannel(NotificationChannel):
+    """
+    Default channel: subscribers live in this process's memory.
+
+    Only correct when the ASGI server runs a single process; use
+    RedisChannel when there are several workers.
+    """
+
+    max_queue_size = 100
+
+    def __init__(self, **options):
+        self.subscribers = {}
+        self.lock = threading.Lock()
+
+    def publish(self, user_id, event):
+        with self.lock:
+            if user_id == BROADCAST_TOPIC:
+                subscribers = [s for user_subscribers in self.subscribers.values() for s in user_subscribers]
+            else:
+                subscribers = list(self.subscribers.get(user_id, ()))
+        for subscription in subscribers:
+            subscription.deliver(event)
+
+    def subscribe(self, user_id):
+        return _InProcessSubscription(self, user_id)
+
+
+class _RedisSubscription:
+    def __init__(self, channel, user_id):
+        self.channel = channel
+        self.user_id = user_id
+        self.client = None
+        self.pubsub = None
+
+    async def __aenter__(self):
+        import redis.asyncio
+
+        self.client = redis.asyncio.from_url(self.channel.url)
+        self.pubsub = self.client.pubsub()
+        await self.pubsub.subscribe(
+            self.channel.channel_name(self.user_id), self.channel.channel_name(BROADCAST_TOPIC)
+        )
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.pubsub.aclose()
+        await self.client.aclose()
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        while True:
+            message = await self.pubsub.get_message(ignore_subscribe_messages=True, timeout=None)
+            if message is not None:
+                return json.loads(message['data'])
+
+
+class RedisChannel(NotificationChannel):
+    """
+    Channel over Redis pub/sub, one Redis channel per user.
+
+    Works across any number of ASGI workers and hosts. Requires the
+    ``redis`` package (already a project dependency).
+    """
+
+    def __init__(self, location, prefix='notifications', **options):
+        self.url = location
+        self.prefix = prefix
+        self._client = None
+        self._client_lock = threading.Lock()
+
+    def channel_name(self, user_id):
+        return f'{self.prefix}:{user_id}'
+
+    def _sync_client(self):
+        if self._client is None:
+            with self._client_lock:
+                if self._client is None:
+                    import redis
+                    self._client = redis.Redis.from_url(self.url)
+        return self._client
+
+    def publish(self, user_id, event):
+        try:
+            self._sync_client().publish(self.channel_name(user_id), json.dumps(event))
+        except Exception as e:
+            # Notifikasi sudah tersimpan; stream yang terlewat akan menyusul lewat Last-Event-ID
+            logger.error(f"Failed to publish notification event for user {user_id}: {str(e)}")
+
+    def subscribe(self, user_id):
+        return _RedisSubscription(self, user_id)
+
+
+_channel = None
+_channel_lock = threading.Lock()
+
+
+def get_notification_channel():
+    """Return the process-wide channel configured in settings.NOTIFICATION_CHANNEL"""
+    global _channel
+    if _channel is None:
+        with _channel_lock:
+            if _channel is None:
+                config = dict(getattr(settings, 'NOTIFICATION_CHANNEL', {}))
+                backend = config.pop('BACKEND', 'coops.utils.notification_channel.InProcessChannel')
+                options = {key.lower(): value for key, value in config.items()}
+                _channel = import_string(backend)(**options)
+    return _channel
+
+
+def publish_notification_event(user_id, event, data, event_id=None):
+    """Send one event to every open stream of user_id"""
+    payload = {'event': event, 'data': data}
+    if event_id is not None:
+        payload['id'] = event_id
+    get_notification_channel().publish(user_id, payload)
+
+
+def format_event(data=None, event=None, event_id=None, retry=None, comment=None):
+    """Encode one Server-Sent Events message"""
+    lines = []
+    if comment is not None:
+        lines.append(f': {comment}')
+    if retry is not None:
+        lines.append(f'retry: {retry}')
+    if event_id is not None:
+        lines.append(f'id: {event_id}')
+    if event is not None:
+        lines.append(f'event: {event}')
+    if data is not None:
+        lines.append(f'data: {json.dumps(data)}')
+    return ('\n'.join(lines) + '\n\n').encode()
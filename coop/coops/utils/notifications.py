@@ -0,0 +1,408 @@
+import time
+from collections import Counter
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Exists, OuterRef, Q, QuerySet
+from django.urls import reverse
+from django.utils import timezone
+from .notification_channel import BROADCAST_TOPIC, publish_notification_event
+from .shared_cache import cache_ttl
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Counter dan daftar notifikasi terbaru per user disimpan di cache.
+# TTL membatasi selisih jika cache dan database sempat tidak sinkron
+# (tanpa cache bersama dibatasi lagi oleh cache_ttl, lihat shared_cache.py).
+UNREAD_COUNT_TTL = 60 * 60
+RECENT_NOTIFICATIONS_TTL = 10 * 60
+RECENT_NOTIFICATIONS_LIMIT = 10
+# Baris per INSERT saat satu notifikasi dikirim ke banyak user
+NOTIFY_BATCH_SIZE = 500
+
+
+def unread_cache_key(user_id):
+    return f'notifications:unread:{user_id}'
+
+
+def recent_cache_key(user_id):
+    return f'notifications:recent:{user_id}'
+
+
+def _personal_unread_count(user_id):
+    count = cache.get(unread_cache_key(user_id))
+    if count is None:
+        from ..models import Notification
+        count = Notification.objects.filter(user_id=user_id, is_read=False).count()
+        cache.add(unread_cache_key(user_id), count, cache_ttl(UNREAD_COUNT_TTL))
+    return count
+
+
+def get_unread_count(user_id):
+    """
+    Return the user's unread count (personal notifications plus matching
+    broadcasts), from cache when possible.
+
+    On a cache miss the personal count is rebuilt from the database with
+    cache.add, so a concurrent rebuild or increment is never overwritten.
+    """
+    return _personal_unread_count(user_id) + get_broadcast_state(user_id)['unread']
+
+
+def serialize_notification(notification):
+    return {
+        'id': notification.id,
+        'kind': 'personal',
+        'title': notification.title,
+        'message': notification.message,
+        'type': notification.notification_type,
+        'is_read': notification.is_read,
+        'link': notification.link or '',
+        'read_url': reverse('coops:mark_notification_read', args=[notification.id]),
+        'created_at': notification.created_at.strftime('%Y-%m-%d %H:%M:%S'),
+    }
+
+
+def get_recent_notifications(user_id):
+    """Return the latest personal notifications and broadcasts as JSON-ready dicts, newest first"""
+    data = cache.get(recent_cache_key(user_id))
+    if data is None:
+        from ..models import Notification
+        notifications = Notification.objects.filter(user_id=user_id).order_by('-created_at')[:RECENT_NOTIFICATIONS_LIMIT]
+        data = [serialize_notification(notification) for notification in notifications]
+        cache.set(recent_cache_key(user_id), data, cache_ttl(RECENT_NOTIFICATIONS_TTL))
+
+    merged = data + get_broadcast_state(user_id)['recent']
+    merged.sort(key=lambda item: item['created_at'], reverse=True)
+    return merged[:RECENT_NOTIFICATIONS_LIMIT]
+
+
+# INCRBY hanya untuk key yang sudah ada (key yang hilang dibangun ulang dari database)
+_INCR_EXISTING_SCRIPT = """
+local results = {}
+for i, key in ipairs(KEYS) do
+    if redis.call('exists', key) == 1 then
+        results[i] = redis.call('incrby', key, ARGV[i])
+    else
+        results[i] = false
+    end
+end
+return results
+"""
+
+
+def _incr_many(deltas):
+    """
+    Apply {user_id: delta} to the cached counters in one step.
+
+    With Django's RedisCache this is a single atomic script call; other
+    backends fall back to one atomic incr per key.
+
+    Returns:
+        dict: {user_id: new count, or None if the counter was not cached}
+    """
+    from django.core.cache import caches
+    from django.core.cache.backends.redis import RedisCache
+
+    # caches['default'] is the backend itself; `cache` is a proxy and never an instance of it
+    backend = caches['default']
+    if isinstance(backend, RedisCache) and len(deltas) > 1:
+        user_ids = list(deltas)
+        keys = [backend.make_and_validate_key(unread_cache_key(user_id)) for user_id in user_ids]
+        client = backend._cache.get_client(write=True)
+        results = client.eval(_INCR_EXISTING_SCRIPT, len(keys), *keys, *(deltas[u] for u in user_ids))
+        return dict(zip(user_ids, results))
+
+    counts = {}
+    for user_id, delta in deltas.items():
+        try:
+            # incr/decr are atomic in Redis and memcached (and under LocMemCache's lock)
+            counts[user_id] = cache.incr(unread_cache_key(user_id), delta)
+        except ValueError:
+            # Not cached: the next read rebuilds it from the database
+            counts[user_id] = None
+    return counts
+
+
+def _apply_unread_delta(user_ids_with_delta):
+    deltas = {user_id: delta for user_id, delta in user_ids_with_delta.items() if delta}
+    counts = _incr_many(deltas)
+    # Hanya state broadcast yang sudah di-cache (tanpa query tambahan)
+    version = _broadcast_version()
+    cached_states = cache.get_many([broadcast_cache_key(user_id, version) for user_id in counts])
+
+    negative_keys = []
+    for user_id, count in counts.items():
+        if count is not None and count < 0:
+            logger.warning(f"Unread counter for user {user_id} went negative, dropping it")
+            negative_keys.append(unread_cache_key(user_id))
+            count = None
+        state = cached_states.get(broadcast_cache_key(user_id, version))
+        # Tanpa counter atau state broadcast di cache total tidak diketahui;
+        # client lalu menerapkan delta pada badge-nya alih-alih memuat ulang
+        publish_notification_event(user_id, 'unread', {
+            'unread_count': count + state['unread'] if count is not None and state else None,
+            'delta': deltas[user_id],
+        })
+    cache.delete_many([recent_cache_key(user_id) for user_id in user_ids_with_delta] + negative_keys)
+
+
+def _publish_created(payloads):
+    for user_id, notification_id, data in payloads:
+        publish_notification_event(user_id, 'notification', data, event_id=notification_id)
+
+
+def notifications_changed(user_ids_with_delta):
+    """
+    Update cached unread counters after notifications were written.
+
+    Applied on commit, so a rolled back transaction never touches the cache.
+
+    Args:
+        user_ids_with_delta: {user_id: change in unread count}, e.g. {5: +1}
+            for a new notification or {5: -3} after marking three as read.
+            A delta of 0 only invalidates the cached notification list.
+    """
+    if user_ids_with_delta:
+        transaction.on_commit(lambda: _apply_unread_delta(dict(user_ids_with_delta)))
+
+
+def notifications_created(notifications):
+    """
+    Update counters and push new notifications to open streams, on commit.
+
+    Args:
+        notifications: Saved Notification instances (with ids)
+    """
+    deltas = Counter()
+    for notification in notifications:
+        deltas[notification.user_id] += 0 if notification.is_read else 1
+    notifications_changed(deltas)
+
+    payloads = [(n.user_id, n.id, serialize_notification(n)) for n in notifications]
+    if payloads:
+        transaction.on_commit(lambda: _publish_created(payloads))
+
+
+def _recipient_ids(recipients):
+    if isinstance(recipients, QuerySet) and recipients.model is get_user_model():
+        return list(recipients.values_list('pk', flat=True))
+    # List User atau id; urutan dipertahankan, duplikat dibuang
+    return list(dict.fromkeys(getattr(recipient, 'pk', recipient) for recipient in recipients))
+
+
+def notify(recipients, title, message, notification_type='info', link='', batch_size=NOTIFY_BATCH_SIZE):
+    """
+    Send the same notification to many users.
+
+    All rows are written with chunked bulk_create inside one transaction,
+    and the unread counters of every recipient are updated in one step on
+    commit, so 40 recipients cost a handful of queries instead of 40.
+
+    Args:
+        recipients: User queryset, iterable of User instances or user ids
+        title: Notification title
+        message: Notification message
+        notification_type: One of Notification.NOTIFICATION_TYPES
+        link: Optional URL shown with the notification
+        batch_size: Rows per INSERT
+
+    Returns:
+        list: The created Notification instances
+    """
+    from ..models import Notification
+
+    user_ids = _recipient_ids(recipients)
+    if not user_ids:
+        return []
+
+    now = timezone.now()
+    with transaction.atomic():
+        created = Notification.objects.bulk_create(
+            [
+                Notification(
+                    user_id=user_id, title=title, message=message,
+                    notification_type=notification_type, link=link or None, created_at=now
+                )
+                for user_id in user_ids
+            ],
+            batch_size=batch_size,
+        )
+        # bulk_create tidak memanggil save(), jadi counter diperbarui di sini
+        notifications_created(created)
+    return created
+
+
+def invalidate_notification_cache(user_id):
+    """Drop the cached counter and list when the exact change is unknown (e.g. an edit in the admin)"""
+    transaction.on_commit(lambda: cache.delete_many([unread_cache_key(user_id), recent_cache_key(user_id)]))
+
+
+# --- Broadcast (pengumuman) ---
+# Satu baris BroadcastNotification per pengumuman; user membaca lewat filter target.
+# State broadcast per user di-cache dengan versi global, jadi pengumuman baru cukup
+# mengganti satu key versi alih-alih menghapus cache ribuan user.
+BROADCAST_VERSION_KEY = 'notifications:broadcast:version'
+BROADCAST_STATE_TTL = 10 * 60
+AUDIENCE_TTL = 60 * 60
+
+
+def broadcast_cache_key(user_id, version):
+    return f'notifications:broadcast:{version}:{user_id}'
+
+
+def audience_cache_key(user_id):
+    return f'notifications:audience:{user_id}'
+
+
+def _broadcast_version():
+    version = cache.get(BROADCAST_VERSION_KEY)
+    if version is None:
+        cache.add(BROADCAST_VERSION_KEY, time.time_ns(), None)
+        version = cache.get(BROADCAST_VERSION_KEY)
+    return version
+
+
+def get_audience(user_id):
+    """
+    Return the attributes broadcasts are targeted by, cached per user.
+
+    Returns:
+        dict: role, jurusan (mahasiswa or kaprodi), angkatan (mahasiswa only)
+            and since (broadcasts older than the account are not shown)
+    """
+    audience = cache.get(audience_cache_key(user_id))
+    if audience is None:
+        row = get_user_model().objects.filter(pk=user_id).values(
+            'role', 'date_joined', 'mahasiswa__jurusan', 'mahasiswa__angkatan', 'kaprodi_profile__jurusan'
+        ).first() or {}
+        audience = {
+            'role': row.get('role'),
+            'jurusan': row.get('mahasiswa__jurusan') or row.get('kaprodi_profile__jurusan'),
+            'angkatan': row.get('mahasiswa__angkatan'),
+            'since': row.get('date_joined'),
+        }
+        cache.set(audience_cache_key(user_id), audience, cache_ttl(AUDIENCE_TTL))
+    return audience
+
+
+def invalidate_audience(user_id):
+    """Drop the cached audience and broadcast state after commit (role or profile changed)"""
+    transaction.on_commit(lambda: cache.delete_many([
+        audience_cache_key(user_id), broadcast_cache_key(user_id, _broadcast_version())
+    ]))
+
+
+def audience_matches(audience, target_role, target_jurusan, target_angkatan):
+    """Whether a broadcast with the given targets reaches this audience (empty target = everyone)"""
+    return (
+        (not target_role or target_role == audience['role'])
+        and (not target_jurusan or target_jurusan == audience['jurusan'])
+        and (not target_angkatan or target_angkatan == audience['angkatan'])
+    )
+
+
+def broadcasts_for(audience):
+    """BroadcastNotification queryset visible to an audience from get_audience()"""
+    from ..models import BroadcastNotification
+
+    queryset = BroadcastNotification.objects.filter(
+        Q(target_role__isnull=True) | Q(target_role='') | Q(target_role=audience['role']),
+        Q(target_jurusan__isnull=True) | Q(target_jurusan='') | Q(target_jurusan=audience['jurusan']),
+        Q(target_angkatan__isnull=True) | Q(target_angkatan=audience['angkatan']),
+    )
+    if audience['since']:
+        queryset = queryset.filter(created_at__gte=audience['since'])
+    return queryset
+
+
+def serialize_broadcast(broadcast, is_read=False):
+    return {
+        'id': broadcast.id,
+        'kind': 'broadcast',
+        'title': broadcast.title,
+        'message': broadcast.message,
+        'type': broadcast.notification_type,
+        'is_read': is_read,
+        'link': broadcast.link or '',
+        'read_url': reverse('coops:mark_broadcast_read', args=[broadcast.id]),
+        'created_at': broadcast.created_at.strftime('%Y-%m-%d %H:%M:%S'),
+    }
+
+
+def get_broadcast_state(user_id):
+    """
+    Return {'unread': int, 'recent': [serialized broadcasts]} for a user.
+
+    Cached per user under the current broadcast version; two queries on a miss.
+    """
+    key = broadcast_cache_key(user_id, _broadcast_version())
+    state = cache.get(key)
+    if state is None:
+        from ..models import BroadcastRead
+
+        queryset = broadcasts_for(get_audience(user_id)).annotate(
+            is_read=Exists(BroadcastRead.objects.filter(broadcast=OuterRef('pk'), user_id=user_id))
+        )
+        state = {
+            'unread': queryset.filter(is_read=False).count(),
+            'recent': [
+                serialize_broadcast(broadcast, broadcast.is_read)
+                for broadcast in queryset.order_by('-created_at')[:RECENT_NOTIFICATIONS_LIMIT]
+            ],
+        }
+        cache.set(key, state, cache_ttl(BROADCAST_STATE_TTL))
+    return state
+
+
+def mark_broadcasts_read(user_id, broadcast_ids):
+    """
+    Record that user_id has read the given broadcasts.
+
+    Returns:
+        int: Number of broadcasts that were not read before
+    """
+    from ..models import BroadcastRead
+
+    already_read = set(
+        BroadcastRead.objects.filter(user_id=user_id, broadcast_id__in=broadcast_ids).values_list('broadcast_id', flat=True)
+    )
+    new_ids = [broadcast_id for broadcast_id in broadcast_ids if broadcast_id not in already_read]
+    if new_ids:
+        BroadcastRead.objects.bulk_create(
+            [BroadcastRead(user_id=user_id, broadcast_id=broadcast_id) for broadcast_id in new_ids],
+            ignore_conflicts=True,
+        )
+        transaction.on_commit(lambda: _broadcast_reads_changed(user_id))
+    return len(new_ids)
+
+
+def _broadcast_reads_changed(user_id):
+    cache.delete(broadcast_cache_key(user_id, _broadcast_version()))
+    publish_notification_event(user_id, 'unread', {'unread_count': get_unread_count(user_id)})
+
+
+def _bump_broadcast_version():
+    cache.set(BROADCAST_VERSION_KEY, time.time_ns(), None)
+
+
+def broadcasts_changed():
+    """Invalidate every user's cached broadcast state (one cache write, on commit)"""
+    transaction.on_commit(_bump_broadcast_version)
+
+
+def broadcast_created(broadcast):
+    """Invalidate cached broadcast state and push the broadcast to matching open streams, on commit"""
+    payload = {
+        'target_role': broadcast.target_role,
+        'target_jurusan': broadcast.target_jurusan,
+        'target_angkatan': broadcast.target_angkatan,
+        'notification': serialize_broadcast(broadcast),
+    }
+
+    def publish():
+        _bump_broadcast_version()
+        publish_notification_event(BROADCAST_TOPIC, 'broadcast', payload)
+
+    transaction.on_commit(publish)
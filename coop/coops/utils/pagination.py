@@ -0,0 +1,88 @@
+import base64
+import json
+from django.db.models import Q
+
+
+DEFAULT_KEYSET_LIMIT = 50
+MAX_KEYSET_LIMIT = 200
+
+
+def encode_cursor(values):
+    """Encode the sort-key values of the last row into an opaque URL-safe cursor"""
+    payload = json.dumps([value.isoformat() if hasattr(value, 'isoformat') else value for value in values])
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor, model, fields):
+    """
+    Decode a cursor produced by encode_cursor.
+
+    Returns:
+        list: Python values for each field, or None if the cursor is invalid
+    """
+    if not cursor:
+        return None
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        raw_values = json.loads(base64.urlsafe_b64decode(padded.encode()).decode())
+        if len(raw_values) != len(fields):
+            return None
+        return [model._meta.get_field(field).to_python(value) for field, value in zip(fields, raw_values)]
+    except Exception:
+        return None
+
+
+def keyset_filter(fields, values, descending=True):
+    """
+    Build the row-value comparison (f1, f2, ...) < (v1, v2, ...) as a Q object.
+
+    Expanded form: f1 <= v1 AND (f1 < v1 OR (f1 = v1 AND f2 < v2) OR ...).
+    The leading f1 <= v1 is redundant but gives the planner an index range
+    bound; the OR chain alone is not used as one.
+    """
+    lookup = 'lt' if descending else 'gt'
+    condition = Q()
+    for i, field in enumerate(fields):
+        equal_prefix = {fields[j]: values[j] for j in range(i)}
+        condition |= Q(**equal_prefix, **{f'{field}__{lookup}': values[i]})
+    return Q(**{f'{fields[0]}__{lookup}e': values[0]}) & condition
+
+
+def keyset_page(queryset, fields, cursor=None, limit=DEFAULT_KEYSET_LIMIT, descending=True):
+    """
+    Return one page of a queryset using keyset (seek) pagination.
+
+    Unlike OFFSET pagination, each page after the first starts at the
+    cursor: keyset_filter bounds the leading field, so the index covering
+    ``fields`` is range-scanned from there and deep pages cost the same as
+    the first one. The last field must be unique (normally 'id') to make
+    the ordering total.
+
+    Args:
+        queryset: Base queryset (filters applied, ordering will be replaced)
+        fields: Sort fields, e.g. ('week_start_date', 'id')
+        cursor: Cursor string from a previous page (None for the first page)
+        limit: Page size
+        descending: Newest first when True
+
+    Returns:
+        tuple: (items, next_cursor) where next_cursor is None on the last page
+    """
+    try:
+        limit = min(max(int(limit), 1), MAX_KEYSET_LIMIT)
+    except (TypeError, ValueError):
+        limit = DEFAULT_KEYSET_LIMIT
+
+    values = decode_cursor(cursor, queryset.model, fields)
+    if values is not None:
+        queryset = queryset.filter(keyset_filter(fields, values, descending))
+
+    prefix = '-' if descending else ''
+    items = list(queryset.order_by(*[f'{prefix}{field}' for field in fields])[:limit + 1])
+
+    next_cursor = None
+    if len(items) > limit:
+        items = items[:limit]
+        last = items[-1]
+        next_cursor = encode_cursor([getattr(last, field) for field in fields])
+    return items, next_cursor
@@ -0,0 +1,144 @@
+import re
+import threading
+import time
+from collections import Counter, deque
+from contextlib import ExitStack
+from django.db import connections
+
+
+# Literal yang diganti '?' agar query dengan parameter berbeda punya fingerprint sama
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+_IN_LIST = re.compile(r"\bIN\s*\((?:\s*\?\s*,?)+\)", re.IGNORECASE)
+_WHITESPACE = re.compile(r"\s+")
+
+
+def fingerprint(sql):
+    """
+    Normalise a SQL statement so repeated queries group together.
+
+    Literals and placeholders become '?', IN lists collapse to IN (...),
+    so the N statements of an N+1 loop share one fingerprint.
+    """
+    sql = _STRING_LITERAL.sub('?', sql)
+    sql = _NUMBER_LITERAL.sub('?', sql)
+    sql = sql.replace('%s', '?')
+    sql = _IN_LIST.sub('IN (...)', sql)
+    return _WHITESPACE.sub(' ', sql).strip()
+
+
+class QueryRecorder:
+    """
+    Context manager that records every query executed on all DB connections.
+
+    Uses connection.execute_wrapper, so it works with DEBUG=False and does
+    not depend on connection.queries.
+
+    Usage:
+        with QueryRecorder() as recorder:
+            ...
+        recorder.count, recorder.db_time, recorder.duplicates()
+    """
+
+    def __init__(self):
+        self.queries = []  # [(sql, duration_seconds)]
+        self._stack = None
+
+    def __enter__(self):
+        self._stack = ExitStack()
+        for connection in connections.all():
+            self._stack.enter_context(connection.execute_wrapper(self))
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stack.close()
+        return False
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries.append((sql, time.perf_counter() - start))
+
+    @property
+    def count(self):
+        return len(self.queries)
+
+    @property
+    def db_time(self):
+        return sum(duration for _, duration in self.queries)
+
+    def fingerprints(self):
+        return Counter(fingerprint(sql) for sql, _ in self.queries)
+
+    def duplicates(self, min_count=2):
+        """Fingerprints executed at least min_count times, most frequent first"""
+        return [(fp, n) for fp, n in self.fingerprints().most_common() if n >= min_count]
+
+
+# Summary key for requests that did not resolve to a view
+UNRESOLVED = '<unresolved>'
+
+
+class QuerySummary:
+    """
+    Rolling, thread-safe per-URL-name summary of recent requests.
+
+    Only the last ``window`` samples per URL name are kept, so memory use
+    is bounded regardless of uptime.
+    """
+
+    def __init__(self, window=200):
+        self.window = window
+        self._samples = {}
+        self._lock = threading.Lock()
+
+    def record(self, url_name, queries, db_time, wall_time, duplicates, over_budget):
+        sample = {
+            'queries': queries,
+            'db_time': db_time,
+            'wall_time': wall_time,
+            'duplicates': duplicates,
+            'over_budget': over_budget,
+        }
+        with self._lock:
+            samples = self._samples.get(url_name)
+            if samples is None:
+                samples = self._samples[url_name] = deque(maxlen=self.window)
+            samples.append(sample)
+
+    def reset(self):
+        with self._lock:
+            self._samples.clear()
+
+    def snapshot(self):
+        """
+        Returns:
+            list: One dict per URL name, sorted by max query count (worst first)
+        """
+        with self._lock:
+            items = [(name, list(samples)) for name, samples in self._samples.items()]
+
+        rows = []
+        for name, samples in items:
+            query_counts = [s['queries'] for s in samples]
+            wall_times = sorted(s['wall_time'] for s in samples)
+            worst_duplicates = max(samples, key=lambda s: len(s['duplicates']))['duplicates']
+            rows.append({
+                'url_name': name,
+                'requests': len(samples),
+                'avg_queries': round(sum(query_counts) / len(samples), 1),
+                'max_queries': max(query_counts),
+                'avg_db_ms': round(sum(s['db_time'] for s in samples) / len(samples) * 1000, 1),
+                'avg_wall_ms': round(sum(wall_times) / len(samples) * 1000, 1),
+                'p95_wall_ms': round(wall_times[int(0.95 * (len(wall_times) - 1))] * 1000, 1),
+                'over_budget': sum(1 for s in samples if s['over_budget']),
+                'duplicates': worst_duplicates,
+            })
+        rows.sort(key=lambda row: row['max_queries'], reverse=True)
+        return rows
+
+
+# Satu summary per proses, dibaca oleh halaman admin query_budget_report
+summary = QuerySummary()
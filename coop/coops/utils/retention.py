@@ -0,0 +1,165 @@
+import datetime
+import json
+import time
+from collections import Counter
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, F, Window
+from django.db.models.functions import RowNumber
+from django.utils import timezone
+from .notifications import notifications_changed
+import logging
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_RETENTION = {
+    'DAYS': 90,
+    'KEEP_LATEST': None,
+    'BATCH_SIZE': 1000,
+}
+
+# Kolom yang disimpan di arsip (JSON Lines)
+ARCHIVE_FIELDS = ('id', 'user_id', 'title', 'message', 'notification_type', 'is_read', 'link', 'created_at')
+
+
+def get_retention_settings():
+    return {**DEFAULT_RETENTION, **getattr(settings, 'NOTIFICATION_RETENTION', {})}
+
+
+class NotificationPurger:
+    """
+    Delete (and optionally archive) old notifications in bounded batches.
+
+    Each batch selects at most ``batch_size`` ids and deletes them in its
+    own short transaction, so locks are held for one batch only. Cached
+    counters and lists of every affected user are invalidated on commit.
+
+    Two rules, applied in order:
+      - read notifications older than ``older_than_days``
+      - with ``keep_latest``: everything but the newest N per user
+        (read rows only, unless ``include_unread``)
+    """
+
+    def __init__(self, older_than_days=90, keep_latest=None, include_unread=False, batch_size=1000,
+                 archive=None, dry_run=False, pause=0, progress=None):
+        """
+        Args:
+            older_than_days: Age of read notifications to delete (None to skip this rule)
+            keep_latest: Keep only the newest N notifications per user (None to skip)
+            include_unread: Let keep_latest also delete unread notifications
+            batch_size: Rows per delete transaction
+            archive: Optional writable text file; deleted rows are written as JSON Lines
+            dry_run: Count matching rows without deleting
+            pause: Seconds to sleep between batches (gives other writers room)
+            progress: Optional callable(rule, stats) called after each batch
+        """
+        self.older_than_days = older_than_days
+        self.keep_latest = keep_latest
+        self.include_unread = include_unread
+        self.batch_size = batch_size
+        self.archive = archive
+        self.dry_run = dry_run
+        self.pause = pause
+        self.progress = progress
+
+    def run(self):
+        """
+        Returns:
+            dict: {rule: {'deleted', 'batches', 'seconds', 'rows_per_second'}}
+        """
+        from ..models import Notification
+
+        stats = {}
+        if self.older_than_days is not None:
+            cutoff = timezone.now() - datetime.timedelta(days=self.older_than_days)
+            queryset = Notification.objects.filter(is_read=True, created_at__lt=cutoff)
+            stats['age'] = self._purge('age', self._seek_batches(queryset))
+        if self.keep_latest is not None:
+            stats['keep_latest'] = self._purge('keep_latest', self._excess_batches())
+        return stats
+
+    def _seek_batches(self, queryset):
+        """Yield id lists of at most batch_size, seeking by id so no batch rescans earlier rows"""
+        last_id = 0
+        while True:
+            ids = list(queryset.filter(id__gt=last_id).order_by('id').values_list('id', flat=True)[:self.batch_size])
+            if not ids:
+                return
+            yield ids
+            if len(ids) < self.batch_size:
+                return
+            last_id = ids[-1]
+
+    def _excess_batches(self):
+        """Yield id lists of rows past the newest keep_latest per user"""
+        from ..models import Notification
+
+        user_ids = list(
+            Notification.objects.values('user_id').annotate(total=Count('id')).filter(
+                total__gt=self.keep_latest
+            ).order_by('user_id').values_list('user_id', flat=True)
+        )
+        # Satu query window per kelompok user, bukan satu query per user
+        chunk_users = max(self.batch_size // self.keep_latest, 1)
+        for i in range(0, len(user_ids), chunk_users):
+            ranked = Notification.objects.filter(user_id__in=user_ids[i:i + chunk_users]).annotate(
+                rank=Window(RowNumber(), partition_by=F('user_id'), order_by=[F('created_at').desc(), F('id').desc()])
+            )
+            # is_read difilter setelah ranking agar notifikasi unread tetap dihitung sebagai "terbaru"
+            excess = [
+                notification_id
+                for notification_id, is_read in ranked.filter(rank__gt=self.keep_latest).values_list('id', 'is_read')
+                if is_read or self.include_unread
+            ]
+            for j in range(0, len(excess), self.batch_size):
+                yield excess[j:j + self.batch_size]
+
+    def _purge(self, rule, batches):
+        stats = {'deleted': 0, 'batches': 0, 'seconds': 0.0, 'rows_per_second': 0}
+        start = time.perf_counter()
+
+        for ids in batches:
+            stats['deleted'] += len(ids) if self.dry_run else self._delete_batch(ids)
+            stats['batches'] += 1
+
+            elapsed = time.perf_counter() - start
+            stats['seconds'] = round(elapsed, 2)
+            stats['rows_per_second'] = int(stats['deleted'] / elapsed) if elapsed else 0
+            if self.progress:
+                self.progress(rule, stats)
+            if self.pause and not self.dry_run:
+                time.sleep(self.pause)
+
+        elapsed = time.perf_counter() - start
+        stats['seconds'] = round(elapsed, 2)
+        stats['rows_per_second'] = int(stats['deleted'] / elapsed) if elapsed else 0
+        return stats
+
+    def _delete_batch(self, ids):
+        from ..models import Notification
+
+        with transaction.atomic():
+            rows = Notification.objects.filter(id__in=ids)
+            fields = ARCHIVE_FIELDS if self.archive is not None else ('user_id', 'is_read')
+            unread_deltas = Counter()
+            for row in rows.values(*fields):
+                unread_deltas[row['user_id']] -= 0 if row['is_read'] else 1
+                if self.archive is not None:
+                    row['created_at'] = row['created_at'].isoformat()
+                    self.archive.write(json.dumps(row) + '\n')
+            # QuerySet.delete() menjadi satu DELETE (Notification.delete() per baris tidak dipanggil),
+            # jadi cache counter dan daftar terbaru user diperbarui di sini
+            deleted, _ = rows.delete()
+            notifications_changed(unread_deltas)
+        return deleted
+
+
+def purge_notifications(**options):
+    """Run NotificationPurger with NOTIFICATION_RETENTION settings as defaults"""
+    config = get_retention_settings()
+    options.setdefault('older_than_days', config['DAYS'])
+    options.setdefault('keep_latest', config['KEEP_LATEST'])
+    options.setdefault('batch_size', config['BATCH_SIZE'])
+    stats = NotificationPurger(**options).run()
+    logger.info(f"Notification retention: {stats}")
+    return stats
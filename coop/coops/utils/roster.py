@@ -0,0 +1,115 @@
+from django.core.paginator import Paginator
+from django.db.models import Count, Q
+from accounts.models import Mahasiswa
+
+
+# KonfirmasiMagang.mahasiswa and Mahasiswa.email are both one-to-one links to
+# User, so the internship row is reachable from Mahasiswa through a single join.
+KONFIRMASI_PATH = 'email__konfirmasimagang'
+
+ROSTER_STATUSES = ('pending', 'accepted', 'rejected', 'completed')
+
+ROSTER_SORT_FIELDS = {
+    'nama': 'nama',
+    'nim': 'nim',
+    'angkatan': 'angkatan',
+    'prodi': 'prodi',
+    'terbaru': 'created_at',
+    'status': f'{KONFIRMASI_PATH}__status',
+    'perusahaan': f'{KONFIRMASI_PATH}__nama_perusahaan',
+    'diubah': f'{KONFIRMASI_PATH}__updated_at',
+}
+
+DEFAULT_SORT = 'nama'
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+
+def roster_queryset(base_queryset=None, search='', status='', angkatan='', sort=DEFAULT_SORT):
+    """
+    Build the filtered and sorted mahasiswa roster joined to KonfirmasiMagang.
+
+    Args:
+        base_queryset: Mahasiswa queryset to start from (default: all mahasiswa)
+        search: Free text matched against nama, NIM, username and perusahaan
+        status: One of ROSTER_STATUSES, or 'none' for mahasiswa without konfirmasi
+        angkatan: Tahun angkatan filter
+        sort: Key of ROSTER_SORT_FIELDS, prefix with '-' for descending
+
+    Returns:
+        QuerySet: Mahasiswa rows with user and konfirmasi fetched in the same query
+    """
+    queryset = base_queryset if base_queryset is not None else Mahasiswa.objects.all()
+    queryset = queryset.select_related('email', KONFIRMASI_PATH)
+
+    if search:
+        queryset = queryset.filter(
+            Q(nama__icontains=search) |
+            Q(nim__icontains=search) |
+            Q(email__username__icontains=search) |
+            Q(**{f'{KONFIRMASI_PATH}__nama_perusahaan__icontains': search})
+        )
+
+    if status == 'none':
+        queryset = queryset.filter(**{f'{KONFIRMASI_PATH}__isnull': True})
+    elif status in ROSTER_STATUSES:
+        queryset = queryset.filter(**{f'{KONFIRMASI_PATH}__status': status})
+
+    if angkatan:
+        try:
+            queryset = queryset.filter(angkatan=int(angkatan))
+        except (TypeError, ValueError):
+            pass
+
+    descending = sort.startswith('-')
+    field = ROSTER_SORT_FIELDS.get(sort.lstrip('-'), ROSTER_SORT_FIELDS[DEFAULT_SORT])
+    # pk as tie breaker keeps pages stable when the sort column has duplicates
+    if descending:
+        return queryset.order_by(f'-{field}', '-pk')
+    return queryset.order_by(field, 'pk')
+
+
+def roster_status_counts(base_queryset=None):
+    """
+    Count mahasiswa per konfirmasi status with a single conditional aggregate.
+
+    Returns:
+        dict: total, pending, accepted, rejected, completed and none counts
+    """
+    queryset = base_queryset if base_queryset is not None else Mahasiswa.objects.all()
+    status_field = f'{KONFIRMASI_PATH}__status'
+    aggregates = {'total': Count('id')}
+    for status in ROSTER_STATUSES:
+        aggregates[status] = Count('id', filter=Q(**{status_field: status}))
+    aggregates['none'] = Count('id', filter=Q(**{f'{KONFIRMASI_PATH}__isnull': True}))
+    return queryset.order_by().aggregate(**aggregates)
+
+
+def roster_page(queryset, page_number=None, per_page=DEFAULT_PAGE_SIZE):
+    """
+    Paginate a roster queryset.
+
+    Returns:
+        tuple: (page_obj, rows) where rows is a list of (mahasiswa, konfirmasi_or_none)
+    """
+    try:
+        per_page = min(max(int(per_page), 1), MAX_PAGE_SIZE)
+    except (TypeError, ValueError):
+        per_page = DEFAULT_PAGE_SIZE
+
+    page_obj = Paginator(queryset, per_page).get_page(page_number)
+    rows = [
+        (mahasiswa, getattr(mahasiswa.email, 'konfirmasimagang', None))
+        for mahasiswa in page_obj.object_list
+    ]
+    return page_obj, rows
+
+
+def roster_filters(params):
+    """Extract the roster filter values from request.GET"""
+    return {
+        'search': params.get('search', '').strip(),
+        'status': params.get('status', ''),
+        'angkatan': params.get('angkatan', ''),
+        'sort': params.get('sort', DEFAULT_SORT),
+    }
@@ -0,0 +1,37 @@
+from django.conf import settings
+from django.core import checks
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+
+# Dengan LocMemCache tiap worker punya cache sendiri: invalidation (notifications_changed,
+# invalidate_verification, ...) hanya mengenai worker yang menjalankannya. Umur entri lalu
+# dibatasi agar worker lain tidak lama menyajikan counter basi atau sertifikat yang sudah dicabut.
+LOCAL_CACHE_MAX_TTL = 30
+
+
+def is_process_local_cache():
+    """True if the default cache is not shared between processes"""
+    return isinstance(caches['default'], LocMemCache)
+
+
+def cache_ttl(ttl):
+    """
+    Timeout for entries that are invalidated explicitly.
+
+    Returns ttl with a shared cache (Redis), or at most LOCAL_CACHE_MAX_TTL
+    (settings, default 30 seconds) when every process has its own cache.
+    """
+    if ttl is not None and is_process_local_cache():
+        return min(ttl, getattr(settings, 'LOCAL_CACHE_MAX_TTL', LOCAL_CACHE_MAX_TTL))
+    return ttl
+
+
+def check_shared_cache(app_configs, **kwargs):
+    if settings.DEBUG or not is_process_local_cache():
+        return []
+    return [checks.Warning(
+        "The default cache is a per-process LocMemCache.",
+        hint="Set REDIS_URL when running more than one worker; until then cached counters and "
+             "certificate verifications are only kept for LOCAL_CACHE_MAX_TTL seconds.",
+        id='coops.W001',
+    )]
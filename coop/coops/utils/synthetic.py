@@ -0,0 +1,393 @@
+import datetime
+import random
+import time
+from django.contrib.auth.hashers import make_password
+from django.core.management.color import no_style
+from django.db import connection, models, transaction
+from django.db.models import Max
+from django.utils import timezone
+from accounts.models import User, Mahasiswa, Kaprodi
+from jobs.models import Supervisor, JobPosting, JobApplication
+from ..models import (
+    KonfirmasiMagang, EvaluasiTemplate, EvaluasiSupervisor, LaporanKemajuan,
+    WeeklyReport, Notification
+)
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Semua akun sintetis memakai domain ini, sehingga mudah dihapus lagi
+SYNTHETIC_EMAIL_DOMAIN = 'synthetic.test'
+SYNTHETIC_TEMPLATE_PREFIX = '[Synthetic]'
+SYNTHETIC_PASSWORD = 'synthetic'
+
+INSERT_BATCH_SIZE = 5000
+
+# (status, bobot) -- None berarti mahasiswa belum mengisi konfirmasi magang
+KONFIRMASI_STATUS_WEIGHTS = [
+    ('pending', 15),
+    ('accepted', 40),
+    ('rejected', 10),
+    ('completed', 20),
+    (None, 15),
+]
+JURUSAN_LIST = [code for code, _ in Kaprodi.JURUSAN_CHOICES]
+BIDANG_USAHA = ['Teknologi', 'Perbankan', 'Manufaktur', 'Konsultan', 'FMCG', 'Logistik', 'Startup']
+POSISI = ['Business Analyst Intern', 'Software Engineer Intern', 'Marketing Intern', 'Finance Intern', 'Data Intern']
+QUESTIONS = [
+    'Bagaimana kedisiplinan mahasiswa?',
+    'Bagaimana kemampuan teknis mahasiswa?',
+    'Bagaimana kemampuan komunikasi mahasiswa?',
+    'Saran untuk pengembangan mahasiswa',
+]
+WEEKLY_APPLICATION_STATUSES = ['searching', 'applied', 'interview_scheduled', 'waiting_response', 'rejected']
+NOTIFICATION_TYPES = ['info', 'warning', 'success', 'danger']
+JOB_APPLICATION_STATUSES = [choice for choice, _ in JobApplication.STATUS_CHOICES]
+
+GENERATED_MODELS = [
+    User, Kaprodi, Supervisor, EvaluasiTemplate, JobPosting, Mahasiswa, KonfirmasiMagang,
+    EvaluasiSupervisor, LaporanKemajuan, WeeklyReport, JobApplication, Notification,
+]
+
+
+def synthetic_email(name):
+    return f'{name}@{SYNTHETIC_EMAIL_DOMAIN}'
+
+
+def synthetic_users():
+    return User.objects.filter(email__endswith=f'@{SYNTHETIC_EMAIL_DOMAIN}')
+
+
+def clear_synthetic_data():
+    """
+    Delete everything created by CohortGenerator.
+
+    Returns:
+        int: Number of rows deleted (all models, including cascades)
+    """
+    with transaction.atomic():
+        deleted, _ = JobPosting.objects.filter(created_by__in=synthetic_users()).delete()
+        deleted += EvaluasiTemplate.objects.filter(nama__startswith=SYNTHETIC_TEMPLATE_PREFIX).delete()[0]
+        deleted += synthetic_users().delete()[0]
+    return deleted
+
+
+def cached_adapter(adapter):
+    """Memoise a date/datetime adapter: generated rows repeat the same values a lot"""
+    cache = {}
+
+    def adapt(value):
+        try:
+            return cache[value]
+        except KeyError:
+            result = cache[value] = adapter(value)
+            return result
+    return adapt
+
+
+class RowInserter:
+    """
+    Insert plain dict rows with executemany, bypassing per-object ORM work.
+
+    bulk_create spends most of its time compiling SQL value by value; here
+    the INSERT statement is built once per model and each row is a tuple.
+    Missing columns get the field default (auto_now fields get ``now``),
+    and only dates, datetimes and JSON go through the backend adapters.
+    """
+
+    def __init__(self, model, now):
+        self.model = model
+        self.fields = [field for field in model._meta.concrete_fields]
+        self.defaults = {}
+        self.adapters = {}
+        for field in self.fields:
+            if getattr(field, 'auto_now', False) or getattr(field, 'auto_now_add', False):
+                self.defaults[field.attname] = now
+            else:
+                # Same as the ORM: the declared default, '' for non-null text, else None
+                self.defaults[field.attname] = field.get_default()
+
+            if isinstance(field, models.JSONField):
+                self.adapters[field.attname] = lambda value, field=field: field.get_db_prep_save(value, connection)
+            elif isinstance(field, models.DateTimeField):
+                self.adapters[field.attname] = cached_adapter(connection.ops.adapt_datetimefield_value)
+            elif isinstance(field, models.DateField):
+                self.adapters[field.attname] = cached_adapter(connection.ops.adapt_datefield_value)
+
+        quote = connection.ops.quote_name
+        columns = ', '.join(quote(field.column) for field in self.fields)
+        placeholders = ', '.join(['%s'] * len(self.fields))
+        self.sql = f'INSERT INTO {quote(model._meta.db_table)} ({columns}) VALUES ({placeholders})'
+
+    def insert(self, rows):
+        columns = [
+            (field.attname, self.defaults[field.attname], self.adapters.get(field.attname))
+            for field in self.fields
+        ]
+        params = [
+            [
+                adapter(value) if adapter and value is not None else value
+                for attname, default, adapter in columns
+                for value in (row.get(attname, default),)
+            ]
+            for row in rows
+        ]
+
+        with connection.cursor() as cursor:
+            for start in range(0, len(params), INSERT_BATCH_SIZE):
+                cursor.executemany(self.sql, params[start:start + INSERT_BATCH_SIZE])
+        return len(params)
+
+
+class CohortGenerator:
+    """
+    Generate a realistic, reproducible dataset with fast bulk inserts.
+
+    Primary keys are assigned up front (continuing from the current
+    maximum), so related rows can reference each other without reading
+    ids back, and every table is filled with executemany. Students are
+    processed in chunks, one transaction each, so memory stays flat;
+    50k students take seconds. The same seed and sizes always produce
+    the same data.
+
+    Not safe to run while other processes insert into the same tables.
+
+    Usage:
+        stats = CohortGenerator(students=50000, seed=42).run()
+    """
+
+    def __init__(self, students, seed=42, supervisors=None, admins=2, job_postings=None,
+                 weeks=4, notifications=3, applications=2, chunk_size=5000):
+        self.students = students
+        self.seed = seed
+        self.supervisors = supervisors if supervisors is not None else max(students // 20, 1)
+        self.admins = admins
+        self.job_postings = job_postings if job_postings is not None else max(students // 50, 5)
+        self.weeks = weeks
+        self.notifications = notifications
+        self.applications = applications
+        self.chunk_size = chunk_size
+
+        self.rng = random.Random(seed)
+        self.password = make_password(SYNTHETIC_PASSWORD)
+        self.now = timezone.now()
+        self.today = self.now.date()
+        self.current_week_start = self.today - datetime.timedelta(days=self.today.weekday())
+        self.stats = {}
+
+    def run(self, progress=None):
+        """
+        Generate the whole dataset.
+
+        Args:
+            progress: Optional callable(done, total) called after each chunk
+
+        Returns:
+            dict: Rows created per model plus 'seconds'
+        """
+        start = time.perf_counter()
+        self.inserters = {model: RowInserter(model, self.now) for model in GENERATED_MODELS}
+        self.next_ids = {
+            model: (model.objects.aggregate(max_id=Max('id'))['max_id'] or 0) + 1
+            for model in GENERATED_MODELS
+        }
+
+        with transaction.atomic():
+            self._create_staff()
+            self._create_templates()
+            self._create_job_postings()
+
+        for offset in range(0, self.students, self.chunk_size):
+            with transaction.atomic():
+                self._create_students(range(offset, min(offset + self.chunk_size, self.students)))
+            if progress:
+                progress(min(offset + self.chunk_size, self.students), self.students)
+
+        self._reset_sequences()
+        self.stats['seconds'] = round(time.perf_counter() - start, 2)
+        logger.info(f"Synthetic cohort generated: {self.stats}")
+        return self.stats
+
+    def _insert(self, model, rows):
+        """Assign ids, insert rows and return them (with 'id' set)"""
+        next_id = self.next_ids[model]
+        for offset, row in enumerate(rows):
+            row['id'] = next_id + offset
+        self.next_ids[model] = next_id + len(rows)
+        self.stats[model.__name__] = self.stats.get(model.__name__, 0) + self.inserters[model].insert(rows)
+        return rows
+
+    def _reset_sequences(self):
+        # Ids were assigned explicitly, so sequence-based backends (PostgreSQL) must catch up
+        statements = connection.ops.sequence_reset_sql(no_style(), GENERATED_MODELS)
+        if statements:
+            with connection.cursor() as cursor:
+                for sql in statements:
+                    cursor.execute(sql)
+
+    def _user(self, username, role, first_name, last_name='', **extra):
+        return {
+            'username': username, 'email': synthetic_email(username), 'password': self.password,
+            'role': role, 'first_name': first_name, 'last_name': last_name,
+            'date_joined': self.now, **extra,
+        }
+
+    def _create_staff(self):
+        self.admin_users = self._insert(User, [
+            self._user(f'syn-admin{i}', 'admin', 'Admin', str(i), is_staff=True)
+            for i in range(self.admins)
+        ])
+        kaprodi_users = self._insert(User, [
+            self._user(f'syn-kaprodi-{jurusan.lower()}', 'kaprodi', 'Kaprodi', jurusan)
+            for jurusan in JURUSAN_LIST
+        ])
+        self._insert(Kaprodi, [
+            {'user_id': user['id'], 'nama': f"Kaprodi {jurusan}", 'email': user['email'], 'jurusan': jurusan}
+            for user, jurusan in zip(kaprodi_users, JURUSAN_LIST)
+        ])
+
+        self.supervisor_users = self._insert(User, [
+            self._user(f'syn-supervisor{i}', 'supervisor', 'Supervisor', str(i))
+            for i in range(self.supervisors)
+        ])
+        for i, user in enumerate(self.supervisor_users):
+            user['perusahaan'] = f'PT Sintetis {i}'
+            user['bidang_usaha'] = self.rng.choice(BIDANG_USAHA)
+        self._insert(Supervisor, [
+            {
+                'user_id': user['id'], 'nama': f"Supervisor {user['last_name']}", 'email': user['email'],
+                'no_hp': '0800000000', 'perusahaan': user['perusahaan'], 'bidang_usaha': user['bidang_usaha'],
+                'created_automatically': True,
+            }
+            for user in self.supervisor_users
+        ])
+
+    def _create_templates(self):
+        self.templates = self._insert(EvaluasiTemplate, [
+            {
+                'nama': f'{SYNTHETIC_TEMPLATE_PREFIX} Evaluasi {jenis.upper()}', 'jenis': jenis,
+                'pertanyaan': QUESTIONS, 'aktif': True,
+            }
+            for jenis in ('uts', 'uas')
+        ])
+
+    def _create_job_postings(self):
+        rng = self.rng
+        self.jobs = self._insert(JobPosting, [
+            {
+                'title': f'{rng.choice(POSISI)} #{i}', 'company_name': f'PT Lowongan {i}',
+                'description': 'Lowongan magang sintetis.', 'requirements': 'Mahasiswa aktif.',
+                'location': rng.choice(['Jakarta', 'Tangerang', 'Bandung', 'Surabaya']),
+                'job_type': 'internship',
+                'application_deadline': self.today + datetime.timedelta(days=rng.randint(-10, 60)),
+                'posted_date': self.now - datetime.timedelta(days=rng.randint(0, 90)),
+                'is_active': rng.random() < 0.9,
+                'created_by_id': self.admin_users[0]['id'] if self.admin_users else None,
+            }
+            for i in range(self.job_postings)
+        ])
+
+    def _create_students(self, indexes):
+        rng = self.rng
+        statuses, weights = zip(*KONFIRMASI_STATUS_WEIGHTS)
+
+        users = self._insert(User, [
+            self._user(f'syn-mhs{i}', 'mahasiswa', 'Mahasiswa', str(i)) for i in indexes
+        ])
+        student_status = rng.choices(statuses, weights, k=len(users))
+
+        self._insert(Mahasiswa, [
+            {
+                'email_id': user['id'], 'nama': f'Mahasiswa {i}', 'nim': f'SYN{i:07d}',
+                'prodi': 'Program Sintetis', 'angkatan': rng.randint(2020, 2024),
+                'jenis_kelamin': rng.choice('LP'), 'no_hp': '0811111111',
+                'jurusan': rng.choice(JURUSAN_LIST), 'magang': status is not None,
+            }
+            for i, user, status in zip(indexes, users, student_status)
+        ])
+
+        konfirmasi_list = []
+        for user, status in zip(users, student_status):
+            if status is None:
+                continue
+            supervisor = self.supervisor_users[rng.randrange(len(self.supervisor_users))]
+            start_date = self.today - datetime.timedelta(days=rng.randint(0, 180))
+            placed = status in ('accepted', 'completed')
+            konfirmasi_list.append({
+                'mahasiswa_id': user['id'], 'status': status, 'posisi': rng.choice(POSISI),
+                'nama_perusahaan': supervisor['perusahaan'], 'alamat_perusahaan': 'Jl. Sintetis No. 1',
+                'bidang_usaha': supervisor['bidang_usaha'],
+                'nama_supervisor': f"Supervisor {supervisor['last_name']}",
+                'email_supervisor': supervisor['email'], 'wa_supervisor': '0800000000',
+                'supervisor_user_id': supervisor['id'], 'surat_penerimaan': 'https://example.com/surat.pdf',
+                'periode_awal': start_date, 'periode_akhir': start_date + datetime.timedelta(days=180),
+                'approved_by_id': supervisor['id'] if placed else None,
+                'approved_at': self.now if placed else None,
+                'rejected_at': self.now if status == 'rejected' else None,
+            })
+        self._insert(KonfirmasiMagang, konfirmasi_list)
+        placed = [k for k in konfirmasi_list if k['status'] in ('accepted', 'completed')]
+
+        evaluations = []
+        for konfirmasi in placed:
+            for template in self.templates:
+                done = konfirmasi['status'] == 'completed' or rng.random() < 0.5
+                evaluations.append({
+                    'konfirmasi_id': konfirmasi['id'], 'template_id': template['id'],
+                    'status': 'completed' if done else 'pending',
+                    'jawaban': {str(q): f'Jawaban sintetis {rng.randint(1, 5)}' for q in range(len(QUESTIONS))} if done else {},
+                    'submitted_at': self.now - datetime.timedelta(days=rng.randint(0, 30)) if done else None,
+                })
+        self._insert(EvaluasiSupervisor, evaluations)
+
+        self._insert(LaporanKemajuan, [
+            {
+                'konfirmasi_id': konfirmasi['id'],
+                'bulan': konfirmasi['periode_awal'] + datetime.timedelta(days=30 * month),
+                'profil_perusahaan': 'Profil sintetis', 'jobdesk': 'Jobdesk sintetis',
+                'suasana_lingkungan': 'Kondusif', 'manfaat_perkuliahan': 'Analisis data',
+                'kebutuhan_pembelajaran': 'Tools industri',
+                'status': rng.choice(['draft', 'submitted', 'reviewed']), 'submitted_at': self.now,
+            }
+            for konfirmasi in placed
+            for month in range(rng.randint(1, 3))
+        ])
+
+        # Mahasiswa yang belum mendapat tempat magang mengirim laporan mingguan dan melamar lowongan
+        searching = [user for user, status in zip(users, student_status) if status not in ('accepted', 'completed')]
+        reports = []
+        for user in searching:
+            for week in range(self.weeks):
+                if rng.random() < 0.8:
+                    week_start = self.current_week_start - datetime.timedelta(weeks=week)
+                    reports.append({
+                        'student_id': user['id'], 'week_number': self.weeks - week,
+                        'week_start_date': week_start, 'week_end_date': week_start + datetime.timedelta(days=6),
+                        'main_activities': 'Mencari lowongan', 'target_achievement': 'Melamar 3 perusahaan',
+                        'companies_applied': 'PT A, PT B', 'next_week_plan': 'Follow up',
+                        'progress_percentage': rng.randint(0, 100),
+                        'application_status': rng.choice(WEEKLY_APPLICATION_STATUSES),
+                        'is_late': rng.random() < 0.1,
+                    })
+        self._insert(WeeklyReport, reports)
+
+        applications = []
+        if self.jobs:
+            for user in searching:
+                for job in rng.sample(self.jobs, min(self.applications, len(self.jobs))):
+                    applications.append({
+                        'job_id': job['id'], 'mahasiswa_id': user['id'], 'cv_url': 'https://example.com/cv.pdf',
+                        'status': rng.choice(JOB_APPLICATION_STATUSES),
+                        'applied_date': self.now - datetime.timedelta(days=rng.randint(0, 60)),
+                    })
+        self._insert(JobApplication, applications)
+
+        self._insert(Notification, [
+            {
+                'user_id': user['id'], 'title': 'Notifikasi sintetis', 'message': 'Pesan sintetis',
+                'notification_type': rng.choice(NOTIFICATION_TYPES), 'is_read': rng.random() < 0.6,
+                'created_at': self.now - datetime.timedelta(minutes=rng.randint(0, 60 * 24 * 60)),
+            }
+            for user in users
+            for _ in range(self.notifications)
+        ])
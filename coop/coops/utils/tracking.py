@@ -0,0 +1,130 @@
+from django.db.models import Count, Q, F, Case, When, Value, IntegerField
+from ..models import KonfirmasiMagang, EvaluasiTemplate, EvaluasiSupervisor
+
+
+# Internship statuses that are expected to receive supervisor evaluations
+TRACKED_KONFIRMASI_STATUSES = ('accepted', 'completed')
+DONE_EVALUATION_STATUSES = ('completed', 'finished')
+
+EXPORT_COLUMNS = [
+    'template_id', 'template', 'jenis', 'konfirmasi_id', 'mahasiswa', 'nim',
+    'perusahaan', 'posisi', 'supervisor', 'email_supervisor', 'status', 'submitted_at',
+]
+
+
+def tracked_konfirmasi():
+    """Internships that should have an evaluation for every active template"""
+    return KonfirmasiMagang.objects.filter(
+        status__in=TRACKED_KONFIRMASI_STATUSES
+    ).select_related('mahasiswa', 'mahasiswa__mahasiswa').order_by('nama_supervisor', 'id')
+
+
+def template_completion(total):
+    """
+    Active templates annotated with their completion statistics.
+
+    The completed count and completion rate are computed by the database in
+    one grouped query over EvaluasiSupervisor.
+
+    Args:
+        total: Number of tracked internships (the denominator for every template)
+    """
+    done_filter = Q(
+        evaluasisupervisor__status__in=DONE_EVALUATION_STATUSES,
+        evaluasisupervisor__konfirmasi__status__in=TRACKED_KONFIRMASI_STATUSES,
+    )
+    return EvaluasiTemplate.objects.filter(aktif=True).annotate(
+        completed=Count('evaluasisupervisor', filter=done_filter),
+        total_supervisors=Value(total, output_field=IntegerField()),
+    ).annotate(
+        pending=F('total_supervisors') - F('completed'),
+        completion_rate=Case(
+            When(total_supervisors__gt=0, then=F('completed') * 100 / F('total_supervisors')),
+            default=Value(0),
+            output_field=IntegerField(),
+        ),
+    ).order_by('id')
+
+
+def evaluation_cells(template_ids):
+    """Map (konfirmasi_id, template_id) to (status, submitted_at) in one query"""
+    rows = EvaluasiSupervisor.objects.filter(
+        template_id__in=template_ids,
+        konfirmasi__status__in=TRACKED_KONFIRMASI_STATUSES,
+    ).values_list('konfirmasi_id', 'template_id', 'status', 'submitted_at')
+    return {(konfirmasi_id, template_id): (status, submitted_at)
+            for konfirmasi_id, template_id, status, submitted_at in rows}
+
+
+def build_tracking_matrix():
+    """
+    Build the evaluation tracking matrix (active templates x tracked internships).
+
+    Costs a fixed number of queries no matter how many templates or internships
+    exist: one for the internships, one for the annotated templates and one for
+    the evaluation cells.
+
+    Returns:
+        list: One dict per template with its statistics and supervisor_details
+    """
+    konfirmasi_list = list(tracked_konfirmasi())
+    templates = list(template_completion(len(konfirmasi_list)))
+    cells = evaluation_cells([template.id for template in templates])
+
+    tracking_data = []
+    for template in templates:
+        supervisor_details = []
+        for konfirmasi in konfirmasi_list:
+            status, submitted_date = cells.get((konfirmasi.id, template.id), ('not_created', None))
+            supervisor_details.append({
+                'konfirmasi': konfirmasi,
+                'status': status,
+                'submitted_date': submitted_date,
+            })
+
+        tracking_data.append({
+            'template': template,
+            'total_supervisors': template.total_supervisors,
+            'completed': template.completed,
+            'pending': template.pending,
+            'completion_rate': template.completion_rate,
+            'supervisor_details': supervisor_details,
+        })
+    return tracking_data
+
+
+def matrix_rows(tracking_data):
+    """Flatten the tracking matrix into export rows (see EXPORT_COLUMNS)"""
+    for data in tracking_data:
+        template = data['template']
+        for detail in data['supervisor_details']:
+            konfirmasi = detail['konfirmasi']
+            user = konfirmasi.mahasiswa
+            mahasiswa_obj = getattr(user, 'mahasiswa', None)
+            yield {
+                'template_id': template.id,
+                'template': template.nama,
+                'jenis': template.jenis,
+                'konfirmasi_id': konfirmasi.id,
+                'mahasiswa': user.get_full_name() or user.username,
+                'nim': mahasiswa_obj.nim if mahasiswa_obj else '',
+                'perusahaan': konfirmasi.nama_perusahaan,
+                'posisi': konfirmasi.posisi,
+                'supervisor': konfirmasi.nama_supervisor,
+                'email_supervisor': konfirmasi.email_supervisor,
+                'status': detail['status'],
+                'submitted_at': detail['submitted_date'].isoformat() if detail['submitted_date'] else '',
+            }
+
+
+def summary_rows(tracking_data):
+    """Per-template statistics for the JSON export"""
+    return [{
+        'template_id': data['template'].id,
+        'template': data['template'].nama,
+        'jenis': data['template'].jenis,
+        'total_supervisors': data['total_supervisors'],
+        'completed': data['completed'],
+        'pending': data['pending'],
+        'completion_rate': data['completion_rate'],
+    } for data in tracking_data]
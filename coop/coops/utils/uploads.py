@@ -0,0 +1,428 @@
+import datetime
+import os
+import uuid
+from django.apps import apps
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+import logging
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_UPLOAD_QUEUE = {
+    'SPOOL_DIR': None,
+    'MAX_ATTEMPTS': 5,
+    'RETRY_BACKOFF': 30,
+    'STALE_AFTER': 15 * 60,
+    'UPLOAD_TIMEOUT': 60 * 60,
+    'DIRECT_URL_TTL': 15 * 60,
+}
+
+# Status yang belum selesai; upload lama dengan status ini dibatalkan jika field yang sama diupload ulang
+UNFINISHED_STATUSES = ('pending', 'failed', 'awaiting')
+
+# Tipe file yang diterima per jenis dokumen, dengan ekstensi yang cocok
+PDF_IMAGE_TYPES = {
+    'application/pdf': ('.pdf',),
+    'image/jpeg': ('.jpg', '.jpeg'),
+    'image/png': ('.png',),
+}
+REPORT_TYPES = {
+    'application/pdf': ('.pdf',),
+    'application/msword': ('.doc',),
+    'application/vnd.openxmlformats-officedocument.wordprocessingml.document': ('.docx',),
+}
+
+
+class UploadRejected(Exception):
+    """A direct upload request that cannot be accepted (message is shown to the user)"""
+
+
+def get_upload_settings():
+    config = {**DEFAULT_UPLOAD_QUEUE, **getattr(settings, 'UPLOAD_QUEUE', {})}
+    if not config['SPOOL_DIR']:
+        config['SPOOL_DIR'] = os.path.join(settings.BASE_DIR, 'cache', 'uploads')
+    return config
+
+
+def retry_countdown(attempts):
+    """Seconds before the next attempt: RETRY_BACKOFF, doubled after every failed attempt"""
+    return get_upload_settings()['RETRY_BACKOFF'] * 2 ** max(attempts - 1, 0)
+
+
+def spool_file(file):
+    """Write an uploaded file to the spool directory chunk by chunk; returns the path"""
+    spool_dir = get_upload_settings()['SPOOL_DIR']
+    os.makedirs(spool_dir, exist_ok=True)
+    path = os.path.join(spool_dir, f"{uuid.uuid4().hex}{os.path.splitext(file.name)[1]}")
+    with open(path, 'wb') as f:
+        for chunk in file.chunks():
+            f.write(chunk)
+    return path
+
+
+def _remove_spool(upload):
+    if upload.spool_path:
+        try:
+            os.remove(upload.spool_path)
+        except FileNotFoundError:
+            pass
+
+
+def _target(upload):
+    return {'target_model': upload.target_model, 'target_id': upload.target_id, 'target_field': upload.target_field}
+
+
+def _record_url(upload, url):
+    """Mark an upload done and write its URL to the target, unless a newer upload for that field exists"""
+    from ..models import FileUpload
+
+    now = timezone.now()
+    with transaction.atomic():
+        FileUpload.objects.filter(id=upload.id).update(
+            status='done', url=url, last_error='', completed_at=now, updated_at=now
+        )
+        if not FileUpload.objects.filter(id__gt=upload.id, **_target(upload)).exists():
+            model = apps.get_model(upload.target_model)
+            # update(): save() target tidak dipanggil, hanya field URL yang berubah
+            model._default_manager.filter(pk=upload.target_id).update(**{upload.target_field: url})
+    upload.status, upload.url, upload.last_error, upload.completed_at = 'done', url, '', now
+
+
+def _set_status(upload, status, error=''):
+    from ..models import FileUpload
+
+    upload.status, upload.last_error = status, error[:2000]
+    FileUpload.objects.filter(id=upload.id).update(
+        status=upload.status, last_error=upload.last_error, updated_at=timezone.now()
+    )
+
+
+def _unique_object_name(object_name):
+    # Tiap upload punya objek sendiri: upload lama yang selesai belakangan tidak menimpa yang baru
+    stem, ext = os.path.splitext(object_name)
+    return f"{stem}_{uuid.uuid4().hex[:8]}{ext}"
+
+
+def enqueue_upload(file, instance, field, folder, filename=None, uploaded_by=None):
+    """
+    Spool a file to local disk and upload it to Firebase in the background.
+
+    The request only pays for writing the file locally; a Celery worker
+    (or the calling process in eager mode) uploads it after commit and
+    writes the public URL to ``instance.<field>``. Older unfinished uploads
+    for the same field are cancelled; one that is already uploading writes
+    to its own object, so it can never overwrite the newer file.
+
+    Args:
+        file: Django UploadedFile
+        instance: Saved model instance that receives the URL
+        field: Name of the URL field on instance
+        folder: Folder in Firebase Storage
+        filename: Base object name in the folder, suffixed to be unique
+            (default: UUID + original extension)
+        uploaded_by: User who may follow the upload status
+
+    Returns:
+        FileUpload
+    """
+    from ..models import FileUpload
+    from ..tasks import process_upload_task
+
+    if filename is None:
+        filename = f"{uuid.uuid4()}{os.path.splitext(file.name)[1]}"
+    else:
+        filename = _unique_object_name(filename)
+    target = {'target_model': instance._meta.label_lower, 'target_id': instance.pk, 'target_field': field}
+
+    path = spool_file(file)
+    with transaction.atomic():
+        FileUpload.objects.filter(status__in=UNFINISHED_STATUSES, **target).update(
+            status='cancelled', updated_at=timezone.now()
+        )
+        upload = FileUpload.objects.create(
+            uploaded_by=uploaded_by, blob_path=f"{folder}/{filename}", original_name=file.name[:255],
+            content_type=file.content_type or '', size=file.size, spool_path=path, **target
+        )
+    transaction.on_commit(lambda: process_upload_task.delay(upload.id))
+    return upload
+
+
+def process_upload(upload_id):
+    """
+    Upload one spooled file and write its URL to the target field.
+
+    The row is claimed with a conditional UPDATE (pending -> uploading),
+    so duplicate task deliveries never upload the same file twice. The
+    target is only updated if no newer upload for the same field exists.
+
+    Returns:
+        FileUpload: With the resulting status ('done'; 'pending' = retry later;
+            'failed' after MAX_ATTEMPTS; otherwise the status it already had)
+    """
+    from coop.firebase.storage_helper import upload_local_file
+    from ..models import FileUpload
+
+    claimed = FileUpload.objects.filter(id=upload_id, status='pending').update(
+        status='uploading', attempts=F('attempts') + 1, updated_at=timezone.now()
+    )
+    upload = FileUpload.objects.get(id=upload_id)
+    if not claimed:
+        if upload.status == 'cancelled':
+            _remove_spool(upload)
+        return upload
+
+    try:
+        url = upload_local_file(upload.spool_path, upload.blob_path, upload.content_type or None)
+    except Exception as e:
+        _set_status(upload, 'failed' if upload.attempts >= get_upload_settings()['MAX_ATTEMPTS'] else 'pending', str(e))
+        logger.warning(f"Upload {upload.id} ({upload.blob_path}) attempt {upload.attempts} failed: {str(e)}")
+        return upload
+
+    _record_url(upload, url)
+    _remove_spool(upload)
+    return upload
+
+
+def requeue_stale_uploads():
+    """
+    Queue uploads again whose task was lost (broker restart, killed worker),
+    and retries left pending in eager mode (no broker).
+
+    A pending upload is stale STALE_AFTER seconds after its retry was due
+    (backoff included). An upload still marked uploading is only considered
+    lost after UPLOAD_TIMEOUT (the task's hard time limit) plus STALE_AFTER,
+    so a slow upload that is still running is never started a second time.
+
+    Returns:
+        int: Number of uploads queued
+    """
+    from ..models import FileUpload
+    from ..tasks import process_upload_task
+
+    config = get_upload_settings()
+    now = timezone.now()
+    stale_after = datetime.timedelta(seconds=config['STALE_AFTER'])
+    # Upload langsung (tanpa spool) yang macet saat verifikasi kembali menunggu; lihat expire_direct_uploads
+    FileUpload.objects.filter(status='uploading', spool_path='', updated_at__lt=now - stale_after).update(
+        status='awaiting', updated_at=now
+    )
+
+    lost = list(FileUpload.objects.filter(
+        status='uploading', updated_at__lt=now - stale_after - datetime.timedelta(seconds=config['UPLOAD_TIMEOUT'])
+    ).exclude(spool_path='').values_list('id', flat=True))
+    FileUpload.objects.filter(id__in=lost, status='uploading').update(status='pending', updated_at=now)
+
+    upload_ids = list(lost)
+    for upload_id, attempts, updated_at in FileUpload.objects.filter(
+        status='pending', updated_at__lt=now - stale_after
+    ).exclude(id__in=lost).values_list('id', 'attempts', 'updated_at'):
+        # Retry yang masih menunggu backoff-nya tidak dijalankan lebih awal
+        backoff = datetime.timedelta(seconds=retry_countdown(attempts) if attempts else 0)
+        if updated_at + backoff + stale_after < now:
+            upload_ids.append(upload_id)
+
+    for upload_id in upload_ids:
+        process_upload_task.delay(upload_id)
+    if upload_ids:
+        logger.info(f"Requeued {len(upload_ids)} stale uploads")
+    return len(upload_ids)
+
+
+def retry_uploads(queryset):
+    """Queue failed uploads again with a fresh attempt budget; returns the number queued"""
+    from ..tasks import process_upload_task
+
+    upload_ids = list(queryset.filter(status='failed').values_list('id', flat=True))
+    queryset.model.objects.filter(id__in=upload_ids).update(status='pending', attempts=0, updated_at=timezone.now())
+    for upload_id in upload_ids:
+        transaction.on_commit(lambda upload_id=upload_id: process_upload_task.delay(upload_id))
+    return len(upload_ids)
+
+
+# Upload langsung dari browser ke Firebase dengan signed URL (file tidak melewati worker Django)
+
+def _student_nim(user):
+    return getattr(getattr(user, 'mahasiswa', None), 'nim', user.username)
+
+
+def _mahasiswa_document(path_func):
+    def resolve(user, filename):
+        from accounts.models import Mahasiswa
+        mahasiswa = Mahasiswa.objects.filter(email=user).first()
+        if mahasiswa is None:
+            raise UploadRejected("Data mahasiswa tidak ditemukan.")
+        return mahasiswa, path_func(filename, mahasiswa.nim)
+    return resolve
+
+
+def _surat_penerimaan(user, filename):
+    from coop.firebase.storage_helper import surat_penerimaan_path
+    from ..models import KonfirmasiMagang
+    konfirmasi = KonfirmasiMagang.objects.filter(mahasiswa=user).first()
+    if konfirmasi is None:
+        raise UploadRejected("Isi konfirmasi magang terlebih dahulu.")
+    return konfirmasi, surat_penerimaan_path(filename, _student_nim(user), konfirmasi.nama_perusahaan)
+
+
+def _laporan_akhir(user, filename):
+    from coop.firebase.storage_helper import laporan_path
+    from ..models import LaporanAkhir
+    laporan = LaporanAkhir.objects.filter(konfirmasi__mahasiswa=user).first()
+    if laporan is None:
+        raise UploadRejected("Simpan laporan akhir terlebih dahulu.")
+    return laporan, laporan_path(filename, _student_nim(user), 'akhir')
+
+
+def _direct_upload_kinds():
+    from coop.firebase import storage_helper
+    mb = 1024 * 1024
+    # jenis: (field target, ukuran maksimum, tipe file, fungsi (user, filename) -> (instance, (folder, filename)))
+    return {
+        'surat_penerimaan': ('surat_penerimaan', 5 * mb, PDF_IMAGE_TYPES, _surat_penerimaan),
+        'cv': ('cv', 10 * mb, PDF_IMAGE_TYPES, _mahasiswa_document(storage_helper.cv_path)),
+        'porto': ('porto', 10 * mb, PDF_IMAGE_TYPES, _mahasiswa_document(storage_helper.portfolio_path)),
+        'sptjm': ('sptjm', 10 * mb, PDF_IMAGE_TYPES, _mahasiswa_document(storage_helper.sptjm_path)),
+        'konsultasi': ('konsultasi', 10 * mb, PDF_IMAGE_TYPES, _mahasiswa_document(storage_helper.konsultasi_path)),
+        'laporan_akhir': ('file_laporan', 10 * mb, REPORT_TYPES, _laporan_akhir),
+    }
+
+
+def start_direct_upload(user, kind, filename, content_type, size):
+    """
+    Reserve a Firebase object for a browser upload and sign a PUT URL for it.
+
+    The object goes in the folder the matching upload_* helper uses, under
+    that helper's name plus a random suffix: a PUT that never lands, or an
+    older request's late PUT, can then never be mistaken for (or replace)
+    the live document. The signed URL only accepts the declared content
+    type and exact size and expires after DIRECT_URL_TTL; the browser then
+    calls complete_direct_upload (through the complete view).
+
+    Args:
+        user: Student uploading the file
+        kind: Document kind ('surat_penerimaan', 'cv', 'porto', 'sptjm', 'konsultasi', 'laporan_akhir')
+        filename: Original file name (for the extension)
+        content_type: MIME type the browser will send
+        size: File size in bytes
+
+    Returns:
+        tuple: (FileUpload with status 'awaiting', signed URL, headers the PUT must carry)
+
+    Raises:
+        UploadRejected: Unknown kind, invalid file or no target record yet
+    """
+    from coop.firebase.storage_helper import generate_upload_url
+    from ..models import FileUpload
+
+    kinds = _direct_upload_kinds()
+    if kind not in kinds:
+        raise UploadRejected("Jenis dokumen tidak dikenal.")
+    field, max_size, content_types, resolve = kinds[kind]
+
+    ext = os.path.splitext(filename)[1].lower()
+    if ext not in content_types.get(content_type, ()):
+        raise UploadRejected(f"Format file harus {'/'.join(e[1:].upper() for types in content_types.values() for e in types)}.")
+    if not 0 < size <= max_size:
+        raise UploadRejected(f"File terlalu besar (maks {max_size // (1024 * 1024)}MB).")
+
+    instance, (folder, object_name) = resolve(user, filename)
+    blob_path = f"{folder}/{_unique_object_name(object_name)}"
+    ttl = get_upload_settings()['DIRECT_URL_TTL']
+    url, headers = generate_upload_url(blob_path, content_type, size, expiration_minutes=ttl // 60)
+
+    target = {'target_model': instance._meta.label_lower, 'target_id': instance.pk, 'target_field': field}
+    with transaction.atomic():
+        FileUpload.objects.filter(status__in=UNFINISHED_STATUSES, **target).update(
+            status='cancelled', updated_at=timezone.now()
+        )
+        upload = FileUpload.objects.create(
+            uploaded_by=user, blob_path=blob_path, original_name=filename[:255],
+            content_type=content_type, size=size, status='awaiting', **target
+        )
+    return upload, url, headers
+
+
+def _referenced_by_target(upload):
+    """True if the target field currently holds the URL of upload.blob_path"""
+    from coop.firebase.config import blob_path_from_url
+
+    model = apps.get_model(upload.target_model)
+    current = model._default_manager.filter(pk=upload.target_id).values_list(upload.target_field, flat=True).first()
+    return bool(current) and blob_path_from_url(current) == upload.blob_path
+
+
+def complete_direct_upload(upload_id):
+    """
+    Verify a browser upload and record its URL on the target.
+
+    The object must exist with the declared size and content type. A
+    missing object leaves the upload awaiting (the browser may still be
+    uploading); a mismatching one is deleted and the upload fails. An
+    object the target field currently points to is never deleted.
+
+    Returns:
+        FileUpload: With the resulting status ('done', 'awaiting' with last_error,
+            'failed'; otherwise the status it already had)
+    """
+    from coop.firebase.storage_helper import get_blob, publish_blob
+    from ..models import FileUpload
+
+    claimed = FileUpload.objects.filter(id=upload_id, status='awaiting').update(
+        status='uploading', attempts=F('attempts') + 1, updated_at=timezone.now()
+    )
+    upload = FileUpload.objects.get(id=upload_id)
+    if not claimed:
+        return upload
+
+    try:
+        blob = get_blob(upload.blob_path)
+        if blob is None:
+            _set_status(upload, 'awaiting', "File belum ada di storage.")
+            return upload
+
+        if blob.size != upload.size or (blob.content_type or '') != upload.content_type:
+            _set_status(
+                upload, 'failed',
+                f"File tidak sesuai: {blob.size} byte {blob.content_type}, "
+                f"diharapkan {upload.size} byte {upload.content_type}."
+            )
+            if not _referenced_by_target(upload):
+                blob.delete()
+            return upload
+
+        url = publish_blob(blob)
+    except Exception as e:
+        if upload.status == 'uploading':
+            _set_status(upload, 'awaiting', str(e))
+        logger.warning(f"Verifying direct upload {upload.id} ({upload.blob_path}) failed: {str(e)}")
+        return upload
+
+    _record_url(upload, url)
+    return upload
+
+
+def expire_direct_uploads():
+    """
+    Settle browser uploads whose signed URL expired without a completion call.
+
+    Uploads whose object exists are completed as usual, the rest are
+    cancelled.
+
+    Returns:
+        int: Number of uploads completed
+    """
+    from ..models import FileUpload
+
+    ttl = get_upload_settings()['DIRECT_URL_TTL']
+    cutoff = timezone.now() - datetime.timedelta(seconds=ttl)
+    completed = 0
+    for upload_id in FileUpload.objects.filter(status='awaiting', created_at__lt=cutoff).values_list('id', flat=True):
+        upload = complete_direct_upload(upload_id)
+        if upload.status == 'awaiting':
+            FileUpload.objects.filter(id=upload_id, status='awaiting').update(
+                status='cancelled', updated_at=timezone.now()
+            )
+        completed += upload.status == 'done'
+    return completed
@@ -12,9 +12,13 @@ from django.utils import timezone
 from datetime import date, timedelta
 from .utils.supervisor_manager import create_supervisor_with_reset_link
 import logging
+import os
 
 logger = logging.getLogger(__name__)
 
+# Jumlah maksimum mahasiswa belum lapor yang ditampilkan di admin_weekly_reports
+OVERDUE_PREVIEW_LIMIT = 100
+
 
 # Mahasiswa isi konfirmasi magang
 @login_required
@@ -78,15 +82,14 @@ def konfirmasi_magang(request):
                     logger.info(f"New supervisor account created: {email_supervisor}")
                     messages.success(request, f"Akun supervisor telah dibuat. Admin akan menghubungi supervisor untuk setup password.")
 
-                    admin_users = User.objects.filter(role='admin')
-                    for admin in admin_users:
-                        Notification.objects.create(
-                            user=admin,
-                            title="Akun Supervisor Baru Dibuat",
-                            message=f"Supervisor {nama_supervisor} ({email_supervisor}) untuk mahasiswa {request.user.get_full_name()} di {nama_perusahaan}. Harap hubungi supervisor untuk setup password.",
-                            notification_type='info',
-                            link='/accounts/register-supervisor/'
-                        )
+                    from .utils.notifications import notify
+                    notify(
+                        User.objects.filter(role='admin'),
+                        title="Akun Supervisor Baru Dibuat",
+                        message=f"Supervisor {nama_supervisor} ({email_supervisor}) untuk mahasiswa {request.user.get_full_name()} di {nama_perusahaan}. Harap hubungi supervisor untuk setup password.",
+                        notification_type='info',
+                        link='/accounts/register-supervisor/'
+                    )
 
             except Exception as e:
                 logger.error(f"Error creating supervisor: {str(e)}")
@@ -104,8 +107,6 @@ def konfirmasi_magang(request):
             km.email_supervisor = email_supervisor
             km.wa_supervisor = wa_supervisor
             km.supervisor_user = supervisor_user
-            if surat:
-                km.surat_penerimaan = surat
             km.status = 'pending'
             km.save()
             messages.success(request, "Konfirmasi magang berhasil diperbarui.")
@@ -122,12 +123,21 @@ def konfirmasi_magang(request):
             km.email_supervisor = email_supervisor
             km.wa_supervisor = wa_supervisor
             km.supervisor_user = supervisor_user
-            if surat:
-                km.surat_penerimaan = surat
             km.status = 'pending'
             km.save()
             messages.success(request, "Konfirmasi magang berhasil dikirim.")
 
+        if surat:
+            # Upload ke Firebase di belakang layar; surat_penerimaan diisi URL setelah selesai
+            from coop.firebase.storage_helper import surat_penerimaan_path
+            from .utils.uploads import enqueue_upload
+            nim = getattr(getattr(request.user, 'mahasiswa', None), 'nim', request.user.username)
+            enqueue_upload(
+                surat, km, 'surat_penerimaan',
+                *surat_penerimaan_path(surat.name, nim, nama_perusahaan),
+                uploaded_by=request.user,
+            )
+
         # set Mahasiswa.magang flag if Mahasiswa record exists
         try:
             m = request.user.mahasiswa
@@ -147,27 +157,37 @@ def status_magang(request):
     if request.user.role != "admin":
         return redirect("/")  # hanya admin
 
-    # Tampilkan semua mahasiswa beserta konfirmasi magang jika ada
-    from accounts.models import Mahasiswa
+    from .utils.roster import (
+        roster_queryset, roster_status_counts, roster_page, roster_filters, ROSTER_SORT_FIELDS
+    )
+
+    # Tampilkan mahasiswa beserta konfirmasi magang (join, filter dan paginasi di database)
+    filters = roster_filters(request.GET)
+    mahasiswa_qs = roster_queryset(**filters)
+    page_obj, mahasiswa_list = roster_page(
+        mahasiswa_qs,
+        page_number=request.GET.get('page'),
+        per_page=request.GET.get('per_page', 50),
+    )
 
-    mahasiswa_qs = Mahasiswa.objects.select_related('email').all()
-    # Bangun list of tuples: (mahasiswa, magang_or_none)
-    mahasiswa_list = []
-    for m in mahasiswa_qs:
-        magang = KonfirmasiMagang.objects.filter(mahasiswa=m.email).first()
-        mahasiswa_list.append((m, magang))
+    # Calculate statistics (satu conditional aggregate)
+    stats = roster_status_counts()
 
-    # Calculate statistics
-    all_konfirmasi = KonfirmasiMagang.objects.all()
-    accepted_count = all_konfirmasi.filter(status__in=['accepted', 'completed']).count()
-    pending_count = all_konfirmasi.filter(status='pending').count()
-    rejected_count = all_konfirmasi.filter(status='rejected').count()
+    # Query string tanpa 'page' untuk link paginasi
+    querystring = request.GET.copy()
+    querystring.pop('page', None)
 
     context = {
         'mahasiswa_list': mahasiswa_list,
-        'accepted_count': accepted_count,
-        'pending_count': pending_count,
-        'rejected_count': rejected_count,
+        'page_obj': page_obj,
+        'accepted_count': stats['accepted'] + stats['completed'],
+        'pending_count': stats['pending'],
+        'rejected_count': stats['rejected'],
+        'total_mahasiswa': stats['total'],
+        'angkatan_list': Mahasiswa.objects.values_list('angkatan', flat=True).distinct().order_by('-angkatan'),
+        'sort_options': ROSTER_SORT_FIELDS.keys(),
+        'filter_querystring': querystring.urlencode(),
+        **{f'filter_{key}': value for key, value in filters.items()},
     }
 
     template = loader.get_template("coops/status_magang.html")
@@ -231,52 +251,30 @@ def tracking_evaluasi(request):
         messages.error(request, "Akses ditolak. Anda bukan admin.")
         return redirect("/")
 
-    from .models import EvaluasiTemplate, EvaluasiSupervisor
-    
-    tracking_data = []
-    
-    # Loop through each evaluation template
-    for template in EvaluasiTemplate.objects.filter(aktif=True):
-        # Get all internships with status accepted or completed
-        # Note: "status='accepted' or 'completed'" would evaluate to 'accepted' in Python,
-        # so use __in to match multiple values.
-        accepted_konfirmasi = KonfirmasiMagang.objects.filter(status__in=['accepted', 'completed'])
+    from .utils.tracking import build_tracking_matrix, matrix_rows, summary_rows, EXPORT_COLUMNS
 
-        # Get evaluation data for this template
-        evaluations = EvaluasiSupervisor.objects.filter(template=template)
+    # Matrix template x konfirmasi dibangun dengan jumlah query yang tetap
+    tracking_data = build_tracking_matrix()
 
-        # Calculate statistics
-        total_supervisors = accepted_konfirmasi.count()
-        completed = evaluations.filter(status__in=['completed', 'finished']).count()
-        pending = total_supervisors - completed
-        completion_rate = int((completed / total_supervisors) * 100) if total_supervisors > 0 else 0
+    export_format = request.GET.get('format', '')
+    if export_format == 'csv':
+        import csv
 
-        # Get detailed supervisor info
-        supervisor_details = []
-        for konfirmasi in accepted_konfirmasi:
-            try:
-                evaluation = evaluations.get(konfirmasi=konfirmasi)
-                status = evaluation.status
-                submitted_date = evaluation.submitted_at
-            except EvaluasiSupervisor.DoesNotExist:
-                status = 'not_created'
-                submitted_date = None
-
-            supervisor_details.append({
-                'konfirmasi': konfirmasi,
-                'status': status,
-                'submitted_date': submitted_date
-            })
+        response = HttpResponse(content_type='text/csv')
+        response['Content-Disposition'] = 'attachment; filename="tracking_evaluasi.csv"'
+        writer = csv.DictWriter(response, fieldnames=EXPORT_COLUMNS)
+        writer.writeheader()
+        writer.writerows(matrix_rows(tracking_data))
+        return response
 
-        tracking_data.append({
-            'template': template,
-            'total_supervisors': total_supervisors,
-            'completed': completed,
-            'pending': pending,
-            'completion_rate': completion_rate,
-            'supervisor_details': supervisor_details
+    if export_format == 'json':
+        from django.http import JsonResponse
+
+        return JsonResponse({
+            'templates': summary_rows(tracking_data),
+            'matrix': list(matrix_rows(tracking_data)),
         })
-    
+
     context = {
         'tracking_data': tracking_data
     }
@@ -424,6 +422,15 @@ def laporan_akhir(request):
         
         # Cek apakah laporan sudah ada untuk mahasiswa ini
         existing_laporan = LaporanAkhir.objects.filter(konfirmasi=konfirmasi).first()
+
+        file_laporan = request.FILES.get('file_laporan')
+        if file_laporan:
+            if file_laporan.size > 10 * 1024 * 1024:  # 10 MB
+                messages.error(request, "File terlalu besar (maks 10MB).")
+                return redirect('coops:laporan_akhir')
+            if os.path.splitext(file_laporan.name)[1].lower() not in ('.pdf', '.doc', '.docx'):
+                messages.error(request, "Format file harus PDF atau DOC.")
+                return redirect('coops:laporan_akhir')
         
         try:
             if existing_laporan:
@@ -450,6 +457,17 @@ def laporan_akhir(request):
                     submitted_at=timezone.now()
                 )
                 messages.success(request, 'Laporan akhir berhasil disimpan.')
+
+            if file_laporan:
+                # Upload di belakang layar; file_laporan diisi URL setelah selesai
+                from coop.firebase.storage_helper import laporan_path
+                from .utils.uploads import enqueue_upload
+                nim = getattr(getattr(request.user, 'mahasiswa', None), 'nim', request.user.username)
+                enqueue_upload(
+                    file_laporan, existing_laporan or laporan, 'file_laporan',
+                    *laporan_path(file_laporan.name, nim, 'akhir'),
+                    uploaded_by=request.user,
+                )
                 
             return redirect('coops:mahasiswa_dashboard')
             
@@ -512,11 +530,13 @@ def evaluasi_supervisor(request, konfirmasi_id, template_id):
         except Exception as e:
             messages.error(request, f'Terjadi kesalahan: {str(e)}')
     
-    # Parse questions from template
-    try:
-        questions = json.loads(template.pertanyaan) if template.pertanyaan else []
-    except json.JSONDecodeError:
-        questions = []
+    # Parse questions from template (JSONField berisi list; string JSON lama tetap didukung)
+    questions = template.pertanyaan or []
+    if isinstance(questions, str):
+        try:
+            questions = json.loads(questions)
+        except json.JSONDecodeError:
+            questions = []
     
     # If evaluation already completed, show read-only view
     if evaluasi.status == 'completed':
@@ -557,11 +577,13 @@ def hasil_evaluasi(request, konfirmasi_id, template_id):
         messages.error(request, 'Data evaluasi tidak ditemukan.')
         return redirect('coops:tracking_evaluasi')
     
-    # Parse questions from template
-    try:
-        questions = json.loads(template.pertanyaan) if template.pertanyaan else []
-    except json.JSONDecodeError:
-        questions = []
+    # Parse questions from template (JSONField berisi list; string JSON lama tetap didukung)
+    questions = template.pertanyaan or []
+    if isinstance(questions, str):
+        try:
+            questions = json.loads(questions)
+        except json.JSONDecodeError:
+            questions = []
     
     # Combine questions with answers
     qa_pairs = []
@@ -888,53 +910,119 @@ def admin_weekly_reports(request):
         return redirect("/")
     
     from .models import WeeklyReport, DeadlineReminder, KonfirmasiMagang
+    from .utils.pagination import keyset_page
     from accounts.models import User
+    from django.db.models import Count, Exists, OuterRef, Q
     from django.utils import timezone
-    
-    # Get all weekly reports
-    reports = WeeklyReport.objects.select_related('student').order_by('-week_start_date', 'student__username')
-    
+    from datetime import datetime
+
+    today = timezone.now().date()
+    current_week_start = today - timezone.timedelta(days=today.weekday())
+
+    # Minggu yang dipantau (default: minggu ini), selalu dinormalisasi ke hari Senin
+    filter_week = request.GET.get('week', '')
+    week_start = current_week_start
+    if filter_week:
+        try:
+            week_date = datetime.strptime(filter_week, '%Y-%m-%d').date()
+            week_start = week_date - timezone.timedelta(days=week_date.weekday())
+        except ValueError:
+            filter_week = ''
+
+    filter_application_status = request.GET.get('application_status', '')
+    search_query = request.GET.get('search', '').strip()
+
+    # Get weekly reports (filter di database, keyset pagination)
+    reports = WeeklyReport.objects.select_related('student', 'student__mahasiswa')
+    if filter_week:
+        reports = reports.filter(week_start_date=week_start)
+    if filter_application_status:
+        reports = reports.filter(application_status=filter_application_status)
+    if search_query:
+        reports = reports.filter(
+            Q(student__first_name__icontains=search_query) |
+            Q(student__last_name__icontains=search_query) |
+            Q(student__username__icontains=search_query) |
+            Q(student__mahasiswa__nim__icontains=search_query)
+        )
+
+    total_reports = reports.count()
+    report_page, next_cursor = keyset_page(
+        reports,
+        fields=('week_start_date', 'id'),
+        cursor=request.GET.get('cursor'),
+        limit=request.GET.get('per_page', 50),
+    )
+
     # Get active deadline settings
     active_deadline = DeadlineReminder.objects.filter(is_active=True).first()
-    
+
+    # Mahasiswa yang belum mendapat tempat magang (tidak ada konfirmasi yang accepted)
+    has_report = WeeklyReport.objects.filter(student=OuterRef('pk'), week_start_date=week_start)
+    mahasiswa_without_internship = User.objects.filter(
+        role='mahasiswa'
+    ).exclude(
+        konfirmasimagang__status='accepted'
+    ).annotate(has_report=Exists(has_report))
+
+    # Semua hitungan kartu ringkasan dalam satu aggregate
+    week_stats = mahasiswa_without_internship.aggregate(
+        total=Count('id'),
+        reported=Count('id', filter=Q(has_report=True)),
+    )
+
+    # Mahasiswa yang belum lapor untuk minggu ini (anti-join NOT EXISTS, dibatasi untuk tampilan)
+    not_reported_count = week_stats['total'] - week_stats['reported']
+    students_without_reports = list(
+        mahasiswa_without_internship.filter(has_report=False)
+        .select_related('mahasiswa')
+        .order_by('username')[:OVERDUE_PREVIEW_LIMIT]
+    )
+
     # Get mahasiswa who need to submit but haven't
     overdue_mahasiswa = []
-    
-    if active_deadline:
-        today = timezone.now().date()
-        
-        # Get mahasiswa yang belum mendapat tempat magang (tidak ada konfirmasi yang accepted)
-        mahasiswa_without_internship = User.objects.filter(
-            role='mahasiswa'
-        ).exclude(
-            konfirmasimagang__status='accepted'
-        )
-        
-        # Cek yang melewati deadline
-        if today > active_deadline.deadline_date:
-            days_since_monday = today.weekday()
-            current_week_start = today - timezone.timedelta(days=days_since_monday)
-            
-            for mahasiswa in mahasiswa_without_internship:
-                # Cek apakah sudah submit laporan minggu ini
-                current_report = WeeklyReport.objects.filter(
-                    student=mahasiswa,
-                    week_start_date=current_week_start
-                ).first()
-                
-                if not current_report:
-                    overdue_mahasiswa.append({
-                        'mahasiswa': mahasiswa,
-                        'deadline': active_deadline.deadline_date,
-                        'days_overdue': (today - active_deadline.deadline_date).days
-                    })
-    
+    total_overdue = 0
+
+    if active_deadline and today > active_deadline.deadline_date:
+        total_overdue = not_reported_count
+        days_overdue = (today - active_deadline.deadline_date).days
+        for mahasiswa in students_without_reports:
+            overdue_mahasiswa.append({
+                'mahasiswa': mahasiswa,
+                'deadline': active_deadline.deadline_date,
+                'days_overdue': days_overdue,
+            })
+
+    # Pilihan minggu untuk filter (12 minggu terakhir yang punya laporan)
+    available_weeks = [
+        {'week_start': start, 'week_end': start + timezone.timedelta(days=6)}
+        for start in WeeklyReport.objects.order_by('-week_start_date').values_list(
+            'week_start_date', flat=True
+        ).distinct()[:12]
+    ]
+
+    # Query string tanpa 'cursor' untuk link halaman berikutnya
+    querystring = request.GET.copy()
+    querystring.pop('cursor', None)
+
     context = {
-        'reports': reports,
+        'reports': report_page,
+        'next_cursor': next_cursor,
+        'is_first_page': not request.GET.get('cursor'),
+        'filter_querystring': querystring.urlencode(),
         'overdue_mahasiswa': overdue_mahasiswa,
+        'students_without_reports': students_without_reports,
         'active_deadline': active_deadline,
-        'total_reports': reports.count(),
-        'total_overdue': len(overdue_mahasiswa),
+        'total_reports': total_reports,
+        'total_overdue': total_overdue,
+        'total_students': week_stats['total'],
+        'reported_this_week': week_stats['reported'],
+        'not_reported_this_week': not_reported_count,
+        'overdue_students': total_overdue,
+        'week_start': week_start,
+        'available_weeks': available_weeks,
+        'application_status_choices': WeeklyReport._meta.get_field('application_status').choices,
+        'filter_application_status': filter_application_status,
     }
     
     return render(request, 'coops/admin_weekly_reports.html', context)
@@ -1094,79 +1182,374 @@ def manage_deadline_reminder(request):
 def get_notifications(request):
     """Get notifications for the current user"""
     from django.http import JsonResponse
-    from .models import Notification
-
-    notifications = Notification.objects.filter(user=request.user).order_by('-created_at')[:10]
-
-    notifications_data = []
-    for notif in notifications:
-        notifications_data.append({
-            'id': notif.id,
-            'title': notif.title,
-            'message': notif.message,
-            'type': notif.notification_type,
-            'is_read': notif.is_read,
-            'link': notif.link or '',
-            'created_at': notif.created_at.strftime('%Y-%m-%d %H:%M:%S'),
-        })
+    from .utils.notifications import get_recent_notifications, get_unread_count
 
-    unread_count = Notification.objects.filter(user=request.user, is_read=False).count()
+    # Counter dan daftar terbaru diambil dari cache; database hanya saat cache miss
+    notifications_data = get_recent_notifications(request.user.id)
+    unread_count = get_unread_count(request.user.id)
 
     return JsonResponse({
         'notifications': notifications_data,
         'unread_count': unread_count,
     })
 
+@login_required
+def notification_history(request):
+    """
+    Page through the current user's notifications, newest first.
+
+    Query params: cursor (from the previous page's next_cursor), limit,
+    type (notification_type) and is_read (true/false).
+    """
+    from django.http import JsonResponse
+    from .models import Notification
+    from .utils.notifications import serialize_notification
+    from .utils.pagination import keyset_page
+
+    notifications = Notification.objects.filter(user=request.user)
+
+    notification_type = request.GET.get('type', '')
+    if notification_type:
+        if notification_type not in dict(Notification.NOTIFICATION_TYPES):
+            return JsonResponse({'error': 'Invalid type'}, status=400)
+        notifications = notifications.filter(notification_type=notification_type)
+
+    is_read = request.GET.get('is_read', '').lower()
+    if is_read:
+        if is_read not in ('true', 'false', '1', '0'):
+            return JsonResponse({'error': 'Invalid is_read'}, status=400)
+        notifications = notifications.filter(is_read=is_read in ('true', '1'))
+
+    # Satu range scan pada index (user, created_at, id) per halaman, tanpa OFFSET
+    page, next_cursor = keyset_page(
+        notifications,
+        fields=('created_at', 'id'),
+        cursor=request.GET.get('cursor'),
+        limit=request.GET.get('limit', 20),
+    )
+    return JsonResponse({
+        'notifications': [serialize_notification(notification) for notification in page],
+        'next_cursor': next_cursor,
+    })
+
 @login_required
 def mark_notification_read(request, notification_id):
     """Mark a notification as read"""
     from django.http import JsonResponse
     from .models import Notification
+    from .utils.notifications import notifications_changed
 
-    try:
-        notification = Notification.objects.get(id=notification_id, user=request.user)
-        notification.is_read = True
-        notification.save()
-        return JsonResponse({'success': True})
-    except Notification.DoesNotExist:
+    # Conditional update: counter hanya berkurang jika notifikasi memang belum dibaca
+    marked = Notification.objects.filter(id=notification_id, user=request.user, is_read=False).update(is_read=True)
+    if marked:
+        notifications_changed({request.user.id: -marked})
+    elif not Notification.objects.filter(id=notification_id, user=request.user).exists():
         return JsonResponse({'error': 'Notification not found'}, status=404)
+    return JsonResponse({'success': True})
 
 @login_required
 def mark_all_notifications_read(request):
     """Mark all notifications as read"""
     from django.http import JsonResponse
     from .models import Notification
+    from .utils.notifications import notifications_changed, broadcasts_for, get_audience, mark_broadcasts_read
 
     if request.method == 'POST':
-        Notification.objects.filter(user=request.user, is_read=False).update(is_read=True)
+        marked = Notification.objects.filter(user=request.user, is_read=False).update(is_read=True)
+        if marked:
+            notifications_changed({request.user.id: -marked})
+        unread_broadcasts = broadcasts_for(get_audience(request.user.id)).exclude(
+            reads__user=request.user
+        ).values_list('id', flat=True)
+        mark_broadcasts_read(request.user.id, list(unread_broadcasts))
         return JsonResponse({'success': True})
 
     return JsonResponse({'error': 'Invalid request'}, status=400)
 
+@login_required
+def mark_broadcast_read(request, broadcast_id):
+    """Mark a broadcast announcement as read for the current user"""
+    from django.http import JsonResponse
+    from .utils.notifications import broadcasts_for, get_audience, mark_broadcasts_read
+
+    if not broadcasts_for(get_audience(request.user.id)).filter(id=broadcast_id).exists():
+        return JsonResponse({'error': 'Notification not found'}, status=404)
+    mark_broadcasts_read(request.user.id, [broadcast_id])
+    return JsonResponse({'success': True})
+
+@login_required
+def upload_status(request, upload_id):
+    """Status of a background file upload (uploader or admin only)"""
+    from django.http import JsonResponse
+    from .models import FileUpload
+
+    upload = FileUpload.objects.filter(id=upload_id).first()
+    if upload is None or (request.user.role != 'admin' and upload.uploaded_by_id != request.user.id):
+        return JsonResponse({'error': 'Upload not found'}, status=404)
+
+    return JsonResponse({
+        'id': upload.id,
+        'status': upload.status,
+        'original_name': upload.original_name,
+        'attempts': upload.attempts,
+        'url': upload.url or None,
+        'error': upload.last_error if upload.status == 'failed' else None,
+        'completed_at': upload.completed_at.isoformat() if upload.completed_at else None,
+    })
+
+@login_required
+def direct_upload_start(request):
+    """
+    Signed URL for uploading a document straight from the browser to Firebase.
+
+    POST: kind, filename, content_type, size. The browser PUTs the file to
+    upload_url with the returned headers, then POSTs to complete_url.
+    """
+    from django.http import JsonResponse
+    from django.urls import reverse
+    from .utils.uploads import UploadRejected, get_upload_settings, start_direct_upload
+
+    if request.method != 'POST':
+        return JsonResponse({'error': 'Invalid request'}, status=400)
+    if request.user.role != 'mahasiswa':
+        return JsonResponse({'error': 'Akses ditolak'}, status=403)
+
+    try:
+        size = int(request.POST.get('size', ''))
+    except ValueError:
+        return JsonResponse({'error': 'Invalid size'}, status=400)
+
+    try:
+        upload, upload_url, headers = start_direct_upload(
+            request.user,
+            request.POST.get('kind', ''),
+            request.POST.get('filename', '').strip(),
+            request.POST.get('content_type', '').strip(),
+            size,
+        )
+    except UploadRejected as e:
+        return JsonResponse({'error': str(e)}, status=400)
+    except Exception as e:
+        logger.error(f"Error signing upload URL: {str(e)}")
+        return JsonResponse({'error': 'Upload tidak tersedia, coba lagi nanti.'}, status=503)
+
+    expires_at = upload.created_at + timedelta(seconds=get_upload_settings()['DIRECT_URL_TTL'])
+    return JsonResponse({
+        'upload_id': upload.id,
+        'upload_url': upload_url,
+        'method': 'PUT',
+        'headers': headers,
+        'expires_at': expires_at.isoformat(),
+        'complete_url': reverse('coops:direct_upload_complete', args=[upload.id]),
+    })
+
+@login_required
+def direct_upload_complete(request, upload_id):
+    """Completion callback after the browser upload: verifies the object and records its URL"""
+    from django.http import JsonResponse
+    from .models import FileUpload
+    from .utils.uploads import complete_direct_upload
+
+    if request.method != 'POST':
+        return JsonResponse({'error': 'Invalid request'}, status=400)
+    if not FileUpload.objects.filter(id=upload_id, uploaded_by=request.user, spool_path='').exists():
+        return JsonResponse({'error': 'Upload not found'}, status=404)
+
+    upload = complete_direct_upload(upload_id)
+    status = {'done': 200, 'failed': 400, 'cancelled': 410}.get(upload.status, 409)
+    return JsonResponse({
+        'id': upload.id,
+        'status': upload.status,
+        'url': upload.url or None,
+        'error': (upload.last_error or None) if upload.status != 'done' else None,
+    }, status=status)
+
+@login_required
+async def notifications_stream(request):
+    """
+    Server-Sent Events stream of new notifications and unread count changes.
+
+    Needs an ASGI server (uvicorn/daphne); under WSGI every open stream
+    would hold a worker. On reconnect the browser sends Last-Event-ID and
+    notifications created in between are replayed from the database.
+    """
+    import asyncio
+    import time
+    from django.core.handlers.asgi import ASGIRequest
+    from django.http import HttpResponse, StreamingHttpResponse
+    from asgiref.sync import sync_to_async
+    from .models import Notification
+    from .utils import notification_channel as channel_module
+    from .utils.notifications import get_unread_count, get_audience, audience_matches, serialize_notification
+
+    if not isinstance(request, ASGIRequest):
+        # WSGI (mis. runserver) akan mem-buffer seluruh stream; 204 membuat
+        # EventSource berhenti reconnect dan browser kembali ke polling
+        return HttpResponse(status=204)
+
+    user = await request.auser()
+    last_event_id = request.headers.get('Last-Event-ID') or request.GET.get('last_event_id')
+    try:
+        last_event_id = int(last_event_id) if last_event_id else None
+    except ValueError:
+        last_event_id = None
+
+    async def event_stream():
+        last_sent_id = last_event_id or 0
+        deadline = time.monotonic() + channel_module.STREAM_MAX_SECONDS
+
+        async with channel_module.get_notification_channel().subscribe(user.id) as subscription:
+            # Subscribe dulu, baru replay, supaya tidak ada notifikasi yang terlewat di antaranya
+            yield channel_module.format_event(retry=channel_module.STREAM_RETRY_MS, comment='connected')
+            if last_event_id is not None:
+                missed = Notification.objects.filter(
+                    user_id=user.id, id__gt=last_event_id
+                ).order_by('id')[:channel_module.STREAM_REPLAY_LIMIT]
+                async for notification in missed:
+                    last_sent_id = notification.id
+                    yield channel_module.format_event(
+                        serialize_notification(notification), event='notification', event_id=notification.id
+                    )
+            unread_count = await sync_to_async(get_unread_count)(user.id)
+            yield channel_module.format_event({'unread_count': unread_count}, event='unread')
+            audience = await sync_to_async(get_audience)(user.id)
+
+            pending = None
+            try:
+                while time.monotonic() < deadline:
+                    if pending is None:
+                        pending = asyncio.ensure_future(subscription.__anext__())
+                    done, _ = await asyncio.wait({pending}, timeout=channel_module.STREAM_HEARTBEAT_SECONDS)
+                    if not done:
+                        yield channel_module.format_event(comment='heartbeat')
+                        continue
+
+                    message = pending.result()
+                    pending = None
+                    if message['event'] == 'broadcast':
+                        # Pengumuman dikirim ke semua stream; hanya diteruskan ke target yang cocok
+                        data = message['data']
+                        if audience_matches(audience, data['target_role'], data['target_jurusan'], data['target_angkatan']):
+                            yield channel_module.format_event(data['notification'], event='notification')
+                        continue
+                    event_id = message.get('id')
+                    if event_id is not None:
+                        if event_id <= last_sent_id:
+                            continue  # sudah terkirim lewat replay
+                        last_sent_id = event_id
+                    yield channel_module.format_event(message['data'], event=message['event'], event_id=event_id)
+            finally:
+                if pending is not None:
+                    pending.cancel()
+
+    response = StreamingHttpResponse(event_stream(), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    # Nonaktifkan buffering nginx agar event langsung sampai
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
 @login_required
 def download_sertifikat(request, sertifikat_id):
-    """Download certificate as PDF"""
+    """Download certificate as PDF (served from the rendered-PDF cache, supports conditional GET)"""
     from django.http import FileResponse
+    from django.utils.cache import get_conditional_response, patch_cache_control
+    from django.utils.http import http_date
     from .models import SertifikatCoop
-    from .certificate_generator import CertificateGenerator
+    from .utils.certificate_cache import open_cached_certificate
 
     try:
-        sertifikat = SertifikatCoop.objects.get(id=sertifikat_id)
+        sertifikat = SertifikatCoop.objects.select_related(
+            'konfirmasi__mahasiswa__mahasiswa'
+        ).get(id=sertifikat_id)
 
         if request.user.role == 'mahasiswa' and sertifikat.konfirmasi.mahasiswa != request.user:
             messages.error(request, "Anda tidak memiliki akses ke sertifikat ini.")
             return redirect('coops:mahasiswa_dashboard')
 
-        generator = CertificateGenerator(sertifikat)
-        pdf_buffer = generator.generate_pdf()
+        # PDF dirender sekali per isi sertifikat; unduhan berikutnya dibaca dari storage
+        pdf, fingerprint, modified = open_cached_certificate(sertifikat)
+        etag = f'"{fingerprint}"'
+        last_modified = int(modified.timestamp())
 
-        filename = f"Sertifikat_COOP_{sertifikat.nomor_sertifikat.replace('/', '_')}.pdf"
+        response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        if response is None:
+            filename = f"Sertifikat_COOP_{sertifikat.nomor_sertifikat.replace('/', '_')}.pdf"
+            response = FileResponse(pdf, content_type='application/pdf')
+            response['Content-Disposition'] = f'attachment; filename="{filename}"'
+        else:
+            pdf.close()
 
-        response = FileResponse(pdf_buffer, content_type='application/pdf')
-        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+        response['ETag'] = etag
+        response['Last-Modified'] = http_date(last_modified)
+        # Browser boleh menyimpan, tapi selalu revalidasi (sertifikat bisa dicabut)
+        patch_cache_control(response, private=True, no_cache=True)
 
         return response
 
     except SertifikatCoop.DoesNotExist:
         messages.error(request, "Sertifikat tidak ditemukan.")
         return redirect('coops:mahasiswa_dashboard')
+
+def verify_sertifikat(request, nomor_sertifikat):
+    """Public certificate verification (target of the certificate QR code); HTML or ?format=json"""
+    import hashlib
+    import json
+    from django.http import JsonResponse
+    from django.utils.cache import get_conditional_response, patch_cache_control
+    from .utils.certificate_verification import get_verification, VERIFY_HTTP_MAX_AGE
+
+    result = get_verification(nomor_sertifikat)
+    as_json = request.GET.get('format') == 'json'
+    etag = '"{}"'.format(hashlib.sha256(
+        json.dumps([result, as_json], sort_keys=True).encode()
+    ).hexdigest()[:32])
+
+    response = get_conditional_response(request, etag=etag) if result['found'] else None
+    if response is None:
+        status = 200 if result['found'] else 404
+        if as_json:
+            response = JsonResponse(result, status=status)
+        else:
+            # Hasil di cache berisi tanggal ISO (juga dipakai untuk JSON); template butuh date
+            context = {'result': result}
+            for field in ('periode_awal', 'periode_akhir', 'tanggal_kelulusan'):
+                if result.get(field):
+                    context[field] = date.fromisoformat(result[field])
+            response = render(request, 'coops/verify_sertifikat.html', context, status=status)
+
+    response['ETag'] = etag
+    # Publik dan boleh disimpan CDN, tapi singkat: pencabutan harus cepat terlihat
+    patch_cache_control(response, public=True, max_age=VERIFY_HTTP_MAX_AGE)
+    return response
+
+@login_required
+def query_budget_report(request):
+    """Ringkasan query per URL dari QueryBudgetMiddleware (admin only)"""
+    if request.user.role != "admin":
+        messages.error(request, "Akses ditolak. Anda bukan admin.")
+        return redirect("/")
+
+    from django.http import JsonResponse
+    from .middleware import get_query_budget_settings
+    from .utils.query_budget import summary
+
+    if request.method == "POST" and request.POST.get('action') == 'reset':
+        summary.reset()
+        messages.success(request, "Ringkasan query berhasil direset.")
+        return redirect('coops:query_budget_report')
+
+    config = get_query_budget_settings()
+    rows = summary.snapshot()
+    for row in rows:
+        row['budget'] = config['VIEWS'].get(row['url_name'], config['DEFAULT_BUDGET'])
+
+    if request.GET.get('format') == 'json':
+        return JsonResponse({'enabled': config['ENABLED'], 'views': rows})
+
+    context = {
+        'rows': rows,
+        'enabled': config['ENABLED'],
+        'default_budget': config['DEFAULT_BUDGET'],
+        'slow_ms': config['SLOW_MS'],
+    }
+    return render(request, 'coops/query_budget_report.html', context)
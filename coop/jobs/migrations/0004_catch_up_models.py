@@ -0,0 +1,67 @@
+# Generated by Django 5.2.18 on 2026-10-18 10:17
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0003_alter_supervisor_user'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='supervisor',
+            name='created_automatically',
+            field=models.BooleanField(default=False, verbose_name='Dibuat Otomatis'),
+        ),
+        migrations.CreateModel(
+            name='JobPosting',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('title', models.CharField(max_length=200, verbose_name='Judul Lowongan')),
+                ('company_name', models.CharField(max_length=200, verbose_name='Nama Perusahaan')),
+                ('company_logo', models.URLField(blank=True, null=True, verbose_name='Logo Perusahaan (Firebase URL)')),
+                ('description', models.TextField(verbose_name='Deskripsi Pekerjaan')),
+                ('requirements', models.TextField(verbose_name='Persyaratan')),
+                ('location', models.CharField(max_length=200, verbose_name='Lokasi')),
+                ('job_type', models.CharField(choices=[('internship', 'Magang'), ('fulltime', 'Full Time'), ('parttime', 'Part Time'), ('contract', 'Kontrak')], default='internship', max_length=20, verbose_name='Tipe Pekerjaan')),
+                ('salary_range', models.CharField(blank=True, max_length=100, null=True, verbose_name='Range Gaji')),
+                ('application_deadline', models.DateField(verbose_name='Batas Akhir Pendaftaran')),
+                ('posted_date', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Tanggal Posting')),
+                ('is_active', models.BooleanField(default=True, verbose_name='Status Aktif')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('created_by', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='job_postings', to=settings.AUTH_USER_MODEL, verbose_name='Dibuat Oleh')),
+            ],
+            options={
+                'verbose_name': 'Lowongan Pekerjaan',
+                'verbose_name_plural': 'Lowongan Pekerjaan',
+                'ordering': ['-posted_date'],
+            },
+        ),
+        migrations.CreateModel(
+            name='JobApplication',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('cv_url', models.URLField(verbose_name='CV (Firebase URL)')),
+                ('cover_letter', models.TextField(blank=True, null=True, verbose_name='Cover Letter')),
+                ('status', models.CharField(choices=[('applied', 'Diajukan'), ('reviewed', 'Direview'), ('interview', 'Interview'), ('accepted', 'Diterima'), ('rejected', 'Ditolak')], default='applied', max_length=20, verbose_name='Status')),
+                ('notes', models.TextField(blank=True, null=True, verbose_name='Catatan dari Admin/HR')),
+                ('applied_date', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Tanggal Apply')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('mahasiswa', models.ForeignKey(limit_choices_to={'role': 'mahasiswa'}, on_delete=django.db.models.deletion.CASCADE, related_name='job_applications', to=settings.AUTH_USER_MODEL, verbose_name='Mahasiswa')),
+                ('job', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='applications', to='jobs.jobposting', verbose_name='Lowongan')),
+            ],
+            options={
+                'verbose_name': 'Aplikasi Lowongan',
+                'verbose_name_plural': 'Aplikasi Lowongan',
+                'ordering': ['-applied_date'],
+                'unique_together': {('job', 'mahasiswa')},
+            },
+        ),
+    ]
@@ -45,61 +45,45 @@ def supervisor_dashboard(request):
     supervisor = request.user.supervisor  # This will create supervisor profile if needed
     
     # Ambil semua konfirmasi magang yang diawasi supervisor ini (accepted + pending)
-    konfirmasi_all = KonfirmasiMagang.objects.filter(email_supervisor=supervisor.email)
+    konfirmasi_qs = KonfirmasiMagang.objects.filter(email_supervisor=supervisor.email)
+    konfirmasi_all = list(konfirmasi_qs.select_related('mahasiswa'))
     # accepted subset for some stats
-    mahasiswa_magang = konfirmasi_all.filter(status='accepted')
-    
-    # Auto-create evaluations for accepted students when templates exist
-    from coops.models import EvaluasiTemplate
+    mahasiswa_magang = [k for k in konfirmasi_all if k.status == 'accepted']
+
+    # Evaluasi dibuat saat mahasiswa diterima atau template diaktifkan
+    # (lihat coops.utils.evaluations.provision_evaluations), bukan di sini
     templates = EvaluasiTemplate.objects.filter(aktif=True)
-    
-    for konfirmasi in mahasiswa_magang:
-        for template in templates:
-            # Create evaluation if doesn't exist
-            evaluasi, created = EvaluasiSupervisor.objects.get_or_create(
-                konfirmasi=konfirmasi,
-                template=template,
-                defaults={
-                    'status': 'pending',
-                    'jawaban': {}  # Empty dict as default
-                }
-            )
-    
+
+    # Semua hitungan evaluasi (per mahasiswa, pending/completed, UTS/UAS)
+    # dari satu grouped aggregate
+    from coops.utils.evaluations import evaluation_summary
+    summary = evaluation_summary(konfirmasi_qs)
+
     # Statistik
-    total_mahasiswa = mahasiswa_magang.count()
-    
+    total_mahasiswa = len(mahasiswa_magang)
+
     # Evaluasi yang belum diisi (pending) and completed (use all supervised konfirmasi)
-    evaluasi_pending = EvaluasiSupervisor.objects.filter(
-        konfirmasi__in=konfirmasi_all,
-        status='pending'
-    ).count()
+    evaluasi_pending = summary['pending']
 
     # Evaluasi yang sudah selesai
-    evaluasi_completed = EvaluasiSupervisor.objects.filter(
-        konfirmasi__in=konfirmasi_all,
-        status='completed'
-    ).count()
-    
+    evaluasi_completed = summary['completed']
+
     # Laporan bulanan yang tersedia
     laporan_bulanan = LaporanKemajuan.objects.filter(
-        konfirmasi__in=konfirmasi_all,
+        konfirmasi__in=konfirmasi_qs,
         status='submitted'
     ).count()
-    
+
     # Mahasiswa yang butuh persetujuan
-    mahasiswa_pending = konfirmasi_all.filter(status='pending')
-    
+    mahasiswa_pending = [k for k in konfirmasi_all if k.status == 'pending']
+
     # Add evaluation completion status for each mahasiswa
     mahasiswa_magang_with_status = []
     for konfirmasi in mahasiswa_magang:
-        # Count total evaluations for this student
-        total_evaluations = EvaluasiSupervisor.objects.filter(konfirmasi=konfirmasi).count()
-        # Count completed evaluations for this student
-        completed_evaluations = EvaluasiSupervisor.objects.filter(
-            konfirmasi=konfirmasi, 
-            status='completed'
-        ).count()
-        
+        counts = summary['per_konfirmasi'].get(konfirmasi.id, {'total': 0, 'completed': 0})
+        total_evaluations = counts['total']
+        completed_evaluations = counts['completed']
+
         # Check if all evaluations are completed
         all_evaluations_completed = (total_evaluations > 0 and 
                                    completed_evaluations == total_evaluations)
@@ -113,9 +97,9 @@ def supervisor_dashboard(request):
     
     # Evaluasi yang harus diisi - only show those within active period
     evaluasi_list = EvaluasiSupervisor.objects.filter(
-        konfirmasi__in=konfirmasi_all,
+        konfirmasi__in=konfirmasi_qs,
         status='pending'
-    ).select_related('konfirmasi__mahasiswa', 'template')
+    ).select_related('konfirmasi__mahasiswa', 'template')[:5]
 
     # Filter evaluasi by period status
     evaluasi_list_filtered = []
@@ -124,18 +108,18 @@ def supervisor_dashboard(request):
         evaluasi.period_status = evaluasi.template.period_status_display()
         evaluasi_list_filtered.append(evaluasi)
 
-    evaluasi_list = evaluasi_list_filtered[:5]
+    evaluasi_list = evaluasi_list_filtered
 
     # Overall evaluation counts and breakdown by type (UTS/UAS)
-    total_evaluasi = EvaluasiSupervisor.objects.filter(konfirmasi__in=mahasiswa_magang).count()
-    uts_total = EvaluasiSupervisor.objects.filter(konfirmasi__in=mahasiswa_magang, template__jenis='uts').count()
-    uts_completed = EvaluasiSupervisor.objects.filter(konfirmasi__in=mahasiswa_magang, template__jenis='uts', status='completed').count()
-    uas_total = EvaluasiSupervisor.objects.filter(konfirmasi__in=mahasiswa_magang, template__jenis='uas').count()
-    uas_completed = EvaluasiSupervisor.objects.filter(konfirmasi__in=mahasiswa_magang, template__jenis='uas', status='completed').count()
+    total_evaluasi = sum(summary['per_konfirmasi'].get(k.id, {'total': 0})['total'] for k in mahasiswa_magang)
+    uts_total = summary['jenis']['uts']['total']
+    uts_completed = summary['jenis']['uts']['completed']
+    uas_total = summary['jenis']['uas']['total']
+    uas_completed = summary['jenis']['uas']['completed']
 
     # percentages (integers)
-    uts_percent = int((uts_completed / uts_total) * 100) if uts_total else 0
-    uas_percent = int((uas_completed / uas_total) * 100) if uas_total else 0
+    uts_percent = summary['jenis']['uts']['percent']
+    uas_percent = summary['jenis']['uas']['percent']
     
     # Check if there are any students with pending evaluations
     has_pending_evaluations = any(not item['all_evaluations_completed'] for item in mahasiswa_magang_with_status)
@@ -159,6 +143,7 @@ def supervisor_dashboard(request):
         'konfirmasi_all': konfirmasi_all,
         'evaluasi_templates': templates,
         'has_pending_evaluations': has_pending_evaluations,
+        'evaluation_summary': summary,
     }
     
     return render(request, "jobs/supervisor_dashboard.html", context)
@@ -288,19 +273,6 @@ def approve_mahasiswa(request, konfirmasi_id):
                 konfirmasi.rejected_at = None
                 konfirmasi.rejection_reason = None
 
-                # Auto-create evaluations when student is accepted
-                from coops.models import EvaluasiTemplate
-                templates = EvaluasiTemplate.objects.filter(aktif=True)
-                for template in templates:
-                    EvaluasiSupervisor.objects.get_or_create(
-                        konfirmasi=konfirmasi,
-                        template=template,
-                        defaults={
-                            'status': 'pending',
-                            'jawaban': {}
-                        }
-                    )
-
                 # Send notification to mahasiswa
                 from coops.models import Notification
                 Notification.objects.create(
@@ -329,21 +301,24 @@ def approve_mahasiswa(request, konfirmasi_id):
 
             konfirmasi.save()
 
+            # Auto-create evaluations when student is accepted
+            if status == 'accepted':
+                from coops.utils.evaluations import provision_evaluations
+                provision_evaluations(KonfirmasiMagang.objects.filter(id=konfirmasi.id))
+
             # Send notification to kaprodi if mahasiswa has jurusan
             try:
                 mahasiswa_obj = konfirmasi.mahasiswa.mahasiswa
                 if mahasiswa_obj.jurusan:
                     from accounts.models import Kaprodi
-                    kaprodis = Kaprodi.objects.filter(jurusan=mahasiswa_obj.jurusan)
-                    for kaprodi in kaprodis:
-                        from coops.models import Notification
-                        Notification.objects.create(
-                            user=kaprodi.user,
-                            title=f"Update Status Magang - {mahasiswa_obj.nama}",
-                            message=f"Mahasiswa {mahasiswa_obj.nama} ({mahasiswa_obj.nim}) telah {'diterima' if status == 'accepted' else 'ditolak'} magang di {konfirmasi.nama_perusahaan}.",
-                            notification_type='info',
-                            link='/accounts/kaprodi-dashboard/'
-                        )
+                    from coops.utils.notifications import notify
+                    notify(
+                        Kaprodi.objects.filter(jurusan=mahasiswa_obj.jurusan).values_list('user_id', flat=True),
+                        title=f"Update Status Magang - {mahasiswa_obj.nama}",
+                        message=f"Mahasiswa {mahasiswa_obj.nama} ({mahasiswa_obj.nim}) telah {'diterima' if status == 'accepted' else 'ditolak'} magang di {konfirmasi.nama_perusahaan}.",
+                        notification_type='info',
+                        link='/accounts/kaprodi-dashboard/'
+                    )
             except Exception:
                 pass
 